@@ -0,0 +1,185 @@
+# standard library
+import csv
+import io
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+# local Django
+from shift.services import minutes_to_hours
+
+# exports of the logged hours, written a chunk at a time so that the
+# response never holds more than a chunk of the rows
+
+EXPORT_HEADER = ('First Name', 'Last Name', 'Email', 'Organization', 'Event',
+                 'Job', 'Date', 'Start Time', 'End Time', 'Hours')
+
+# bytes collected before a chunk is sent
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+# characters XML 1.0 does not allow, left out of the spreadsheet cells
+INVALID_XML_CHARACTERS = re.compile(
+    '[\x00-\x08\x0b\x0c\x0e-\x1f\ufffe\uffff]')
+
+XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/'
+    'content-types">'
+    '<Default Extension="rels" ContentType="application/'
+    'vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" ContentType="application/'
+    'vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="'
+    'application/vnd.openxmlformats-officedocument.spreadsheetml.'
+    'worksheet+xml"/>'
+    '</Types>')
+
+XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/'
+    'relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/'
+    'officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>')
+
+XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/'
+    'main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/'
+    'relationships">'
+    '<sheets><sheet name="Hours" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>')
+
+XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/'
+    'relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/'
+    'officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '</Relationships>')
+
+XLSX_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/'
+    'main"><sheetData>')
+
+XLSX_SHEET_END = '</sheetData></worksheet>'
+
+
+def format_hours_row(row):
+    """
+    :param row: Tuple of the shift.services.LOGGED_HOURS_FIELDS values
+    :return: List of the values in the columns of EXPORT_HEADER, the times
+             as HH:MM and the hours rounded to two decimals
+    """
+    (first_name, last_name, email, organization, event, job, date,
+     start_time, end_time, minutes) = row
+    return [
+        first_name, last_name, email, organization or '', event, job,
+        date.isoformat(), start_time.strftime('%H:%M'),
+        end_time.strftime('%H:%M'), minutes_to_hours(minutes)
+    ]
+
+
+def stream_csv(row_list):
+    """
+    Yields the header and rows as CSV, in chunks of about
+    EXPORT_CHUNK_SIZE bytes
+
+    :param row_list: Iterable of logged hours rows
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_HEADER)
+    for row in row_list:
+        writer.writerow(format_hours_row(row))
+        if buffer.tell() >= EXPORT_CHUNK_SIZE:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode('utf-8')
+
+
+class ZipStream(io.RawIOBase):
+    """
+    Write only file that keeps what a ZipFile wrote until it is taken
+    with pop(). It cannot seek, so the ZipFile writes each entry in one
+    pass.
+    """
+
+    def __init__(self):
+        super(ZipStream, self).__init__()
+        self.chunk_list = []
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunk_list.append(bytes(data))
+        return len(data)
+
+    def pop(self):
+        data = b''.join(self.chunk_list)
+        self.chunk_list = []
+        return data
+
+
+def get_xlsx_cell(value):
+    if isinstance(value, (int, float)):
+        return '<c><v>{0}</v></c>'.format(value)
+    return '<c t="inlineStr"><is><t>{0}</t></is></c>'.format(
+        escape(INVALID_XML_CHARACTERS.sub('', value)))
+
+
+def get_xlsx_row(value_list):
+    return '<row>{0}</row>'.format(
+        ''.join(get_xlsx_cell(value) for value in value_list))
+
+
+def stream_xlsx(row_list):
+    """
+    Yields an XLSX workbook with one sheet of the header and rows. The
+    sheet is compressed as it is written, so chunks are sent while the
+    rows are still being read.
+
+    :param row_list: Iterable of logged hours rows
+    """
+    stream = ZipStream()
+    with zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED) as workbook:
+        for name, content in (('[Content_Types].xml', XLSX_CONTENT_TYPES),
+                              ('_rels/.rels', XLSX_ROOT_RELS),
+                              ('xl/workbook.xml', XLSX_WORKBOOK),
+                              ('xl/_rels/workbook.xml.rels',
+                               XLSX_WORKBOOK_RELS)):
+            workbook.writestr(name, content)
+
+        # large exports can pass the 2 GiB of a plain zip entry
+        with workbook.open('xl/worksheets/sheet1.xml', 'w',
+                           force_zip64=True) as sheet:
+            buffer = io.StringIO()
+            buffer.write(XLSX_SHEET_START)
+            buffer.write(get_xlsx_row(EXPORT_HEADER))
+            for row in row_list:
+                buffer.write(get_xlsx_row(format_hours_row(row)))
+                if buffer.tell() >= EXPORT_CHUNK_SIZE:
+                    sheet.write(buffer.getvalue().encode('utf-8'))
+                    buffer.seek(0)
+                    buffer.truncate()
+                    data = stream.pop()
+                    if data:
+                        yield data
+            buffer.write(XLSX_SHEET_END)
+            sheet.write(buffer.getvalue().encode('utf-8'))
+    yield stream.pop()
+
+
+# content type and writer of each export format
+EXPORT_FORMATS = {
+    'csv': ('text/csv', stream_csv),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.'
+             'spreadsheetml.sheet', stream_xlsx),
+}
@@ -1,5 +1,6 @@
 from django import forms
 from administrator.models import Administrator
+from organization.models import Organization
 
 
 class AdministratorForm(forms.ModelForm):
@@ -33,3 +34,29 @@ class ReportForm(forms.Form):
     start_date = forms.DateField(required=False)
     end_date = forms.DateField(required=False)
 
+
+class HoursExportForm(forms.Form):
+    event = forms.IntegerField(min_value=1, required=False)
+    job = forms.IntegerField(min_value=1, required=False)
+    organization = forms.IntegerField(min_value=1, required=False)
+    start_date = forms.DateField(required=False)
+    end_date = forms.DateField(required=False)
+    format = forms.ChoiceField(
+        choices=[('csv', 'CSV'), ('xlsx', 'Excel')], required=False)
+
+    def clean(self):
+        cleaned_data = super(HoursExportForm, self).clean()
+        start_date = cleaned_data.get('start_date')
+        end_date = cleaned_data.get('end_date')
+
+        if start_date and end_date and start_date > end_date:
+            msg = u"Start date must be before the end date"
+            self._errors['start_date'] = self.error_class([msg])
+
+        return cleaned_data
+
+
+class VolunteerImportForm(forms.Form):
+    csv_file = forms.FileField()
+    organization = forms.ModelChoiceField(
+        queryset=Organization.objects.order_by('name'), required=False)
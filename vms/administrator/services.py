@@ -0,0 +1,129 @@
+# standard library
+import hashlib
+import os
+import tempfile
+
+# third party
+from easy_pdf.rendering import render_to_pdf
+
+# Django
+from django.conf import settings
+from django.template.loader import render_to_string
+
+# local Django
+from administrator.models import Administrator
+from outbox.services import enqueue_mail
+from shift.services import (REPORT_LINE_FIELDS, get_report_by_id,
+                            get_report_lines)
+
+REPORT_PDF_DIR = 'reports'
+
+
+def get_report_pdf_digest(report, admin, report_list=None):
+    """
+    Hash of everything that ends up in the pdf of a report, so that a
+    cached pdf is only reused while the reported hours are unchanged
+
+    :param report: The report object
+    :param admin: The administrator who approved and signs the report, the
+                  same for every download and re-send
+    :param report_list: Rows of the report, read if not given
+    :return: Hex digest of the report content
+    """
+    if report_list is None:
+        report_list = get_report_lines(report)
+    content = hashlib.sha256()
+    content.update('{0}|{1}|{2}'.format(
+        report.total_hrs, report.date_submitted, admin.id).encode())
+    for row in report_list:
+        content.update('|'.join(
+            '{0}'.format(row[field]) for field in REPORT_LINE_FIELDS).encode())
+    return content.hexdigest()
+
+
+def get_report_pdf_path(report, admin, report_list=None):
+    """
+    :return: Path under MEDIA_ROOT where the pdf of the report is cached
+    """
+    return os.path.join(
+        settings.MEDIA_ROOT, REPORT_PDF_DIR, str(report.id),
+        '{0}.pdf'.format(
+            get_report_pdf_digest(report, admin, report_list)))
+
+
+def render_report_pdf(report, admin, report_list=None):
+    if report_list is None:
+        report_list = get_report_lines(report)
+    return render_to_pdf(
+        'administrator/pdf.html',
+        {
+            'report': report,
+            'admin': admin,
+            'report_list': report_list,
+        },
+    )
+
+
+def get_report_pdf(report, admin):
+    """
+    Returns the pdf of the report, rendering it only if no pdf with the
+    same content has been cached yet
+
+    :return: Content of the pdf as bytes
+    """
+    report_list = get_report_lines(report)
+    path = get_report_pdf_path(report, admin, report_list)
+    try:
+        with open(path, 'rb') as pdf_file:
+            return pdf_file.read()
+    except FileNotFoundError:
+        pass
+
+    pdf = render_report_pdf(report, admin, report_list)
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    # write to a temporary file first so that a concurrent reader never
+    # sees a partially written pdf
+    fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as temp_file:
+            temp_file.write(pdf)
+        os.replace(temp_path, path)
+    except Exception:
+        os.remove(temp_path)
+        raise
+    return pdf
+
+
+def render_approved_report(report_id, admin_id):
+    """
+    Renders the pdf attached to the approval mail of a report, called by
+    the outbox worker
+
+    :return: Tuple of (filename, content, mimetype)
+    """
+    report = get_report_by_id(report_id)
+    admin = Administrator.objects.get(id=admin_id)
+    return 'file.pdf', get_report_pdf(report, admin), 'application/pdf'
+
+
+def send_approved_report(report, admin):
+    """
+    Queues the approval mail of a report. Its pdf is rendered by the
+    deliver_outbox worker before the mail is sent, so queueing it in the
+    transaction of the approval makes sure the mail is not lost.
+    """
+    message = render_to_string(
+        'administrator/confirm_report.html',
+        {
+            'volunteer': report.volunteer,
+            'admin': admin,
+        }
+    )
+    return enqueue_mail(
+        "Report Approved", message,
+        "messanger@localhost.com", [report.volunteer.email],
+        attachment_renderer=(
+            'administrator.services.render_approved_report',
+            [report.id, admin.id])
+    )
@@ -0,0 +1,187 @@
+# standard library
+import csv
+import io
+import zipfile
+from datetime import time
+from unittest import mock
+
+# Django
+from django.test import TestCase
+from django.urls import reverse
+
+# local Django
+from administrator.export import stream_csv, stream_xlsx
+from shift.services import get_logged_hours_rows
+from shift.utils import (create_admin_with_details, create_event_with_details,
+                         create_job_with_details,
+                         create_organization_with_details,
+                         create_shift_with_details,
+                         create_volunteer_with_details, log_hours_with_details)
+
+
+class HoursExportTest(TestCase):
+    """
+    Tests the streaming csv and xlsx exports of the logged hours
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.event = create_event_with_details({
+            'name': "Export Event",
+            'start_date': "2050-05-10",
+            'end_date': "2050-06-16",
+            'description': 'event-description',
+            'address': 'event-address',
+            'venue': 'event-venue'
+        })
+        other_event = create_event_with_details({
+            'name': "Other Event",
+            'start_date': "2050-05-10",
+            'end_date': "2050-06-16",
+            'description': 'event-description',
+            'address': 'event-address',
+            'venue': 'event-venue'
+        })
+        cls.job = create_job_with_details({
+            'name': "Export Job",
+            'start_date': "2050-05-10",
+            'end_date': "2050-06-15",
+            'description': "job-description",
+            'event': cls.event
+        })
+        other_job = create_job_with_details({
+            'name': "Other Job",
+            'start_date': "2050-05-10",
+            'end_date': "2050-06-15",
+            'description': "job-description",
+            'event': other_event
+        })
+        shift_list = [
+            create_shift_with_details({
+                'date': date,
+                'start_time': "9:00",
+                'end_time': "15:00",
+                'max_volunteers': 5,
+                'job': job,
+                'address': 'shift-address',
+                'venue': 'shift-venue'
+            }) for date, job in (("2050-05-11", cls.job),
+                                 ("2050-05-20", cls.job),
+                                 ("2050-05-12", other_job))
+        ]
+        cls.organization = create_organization_with_details('Export Org')
+        volunteer = create_volunteer_with_details({
+            'username': 'exportvolunteer',
+            'first_name': "Export",
+            'last_name': "Volunteer",
+            'address': "Pallet Town",
+            'city': None,
+            'state': None,
+            'country': None,
+            'phone_number': "2374983247",
+            'email': "exportvolunteer@test.com"
+        }, cls.organization)
+        other_volunteer = create_volunteer_with_details({
+            'username': 'othervolunteer',
+            'first_name': "Other",
+            'last_name': "Volunteer",
+            'address': "Pallet Town",
+            'city': None,
+            'state': None,
+            'country': None,
+            'phone_number': "2374983247",
+            'email': "othervolunteer@test.com"
+        }, create_organization_with_details('Other Org'))
+        log_hours_with_details(volunteer, shift_list[0], time(9), time(12))
+        log_hours_with_details(volunteer, shift_list[1], time(9), time(10, 30))
+        log_hours_with_details(
+            other_volunteer, shift_list[2], time(22), time(1))
+        create_admin_with_details({
+            'username': 'exportadmin',
+            'password': 'exportadmin',
+            'first_name': 'Export',
+            'last_name': 'Admin',
+            'email': 'exportadmin@test.com',
+            'address': 'admin-address',
+            'city': None,
+            'state': None,
+            'country': None,
+            'phone_number': '9999999999',
+            'organization': 'Export Admin Org'
+        })
+
+    def get_csv(self, **params):
+        response = self.client.get(
+            reverse('administrator:export_hours'), params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return list(csv.reader(io.StringIO(
+            b''.join(response.streaming_content).decode('utf-8'))))
+
+    def test_rows(self):
+        row_list = list(stream_csv(get_logged_hours_rows()))
+        self.assertEqual(list(csv.reader(io.StringIO(
+            b''.join(row_list).decode('utf-8')))), [
+            ['First Name', 'Last Name', 'Email', 'Organization', 'Event',
+             'Job', 'Date', 'Start Time', 'End Time', 'Hours'],
+            ['Export', 'Volunteer', 'exportvolunteer@test.com', 'Export Org',
+             'Export Event', 'Export Job', '2050-05-11', '09:00', '12:00',
+             '3.0'],
+            ['Other', 'Volunteer', 'othervolunteer@test.com', 'Other Org',
+             'Other Event', 'Other Job', '2050-05-12', '22:00', '01:00',
+             '3.0'],
+            ['Export', 'Volunteer', 'exportvolunteer@test.com', 'Export Org',
+             'Export Event', 'Export Job', '2050-05-20', '09:00', '10:30',
+             '1.5'],
+        ])
+
+    def test_chunks(self):
+        with mock.patch('administrator.export.EXPORT_CHUNK_SIZE', 1):
+            self.assertEqual(len(list(stream_csv(get_logged_hours_rows()))), 3)
+
+    def test_filters(self):
+        self.client.login(username='exportadmin', password='exportadmin')
+        self.assertEqual(len(self.get_csv()), 4)
+        self.assertEqual(
+            [row[6] for row in self.get_csv(event=self.event.id)[1:]],
+            ['2050-05-11', '2050-05-20'])
+        self.assertEqual(
+            [row[6] for row in self.get_csv(
+                job=self.job.id, organization=self.organization.id,
+                start_date='2050-05-12', end_date='2050-05-31')[1:]],
+            ['2050-05-20'])
+        self.assertEqual(len(self.get_csv(end_date='2050-05-01')), 1)
+
+    def test_xlsx(self):
+        self.client.login(username='exportadmin', password='exportadmin')
+        response = self.client.get(
+            reverse('administrator:export_hours'),
+            {'format': 'xlsx', 'organization': self.organization.id})
+        self.assertIn('hours.xlsx', response['Content-Disposition'])
+        workbook = zipfile.ZipFile(
+            io.BytesIO(b''.join(response.streaming_content)))
+        self.assertIsNone(workbook.testzip())
+        sheet = workbook.read('xl/worksheets/sheet1.xml').decode('utf-8')
+        self.assertEqual(sheet.count('<row>'), 3)
+        self.assertIn('<t>Export Org</t>', sheet)
+        self.assertIn('<v>1.5</v>', sheet)
+        self.assertNotIn('Other Org', sheet)
+
+        # the sheet is sent in chunks while it is written
+        row = next(get_logged_hours_rows())
+        row_list = [
+            ('Export {0}'.format(i),) + row[1:] for i in range(20000)]
+        self.assertGreater(len(list(stream_xlsx(row_list))), 2)
+
+    def test_invalid_request(self):
+        url = reverse('administrator:export_hours')
+        self.client.login(username='exportvolunteer', password='volunteer')
+        response = self.client.get(url)
+        self.assertNotEqual(response.status_code, 200)
+
+        self.client.login(username='exportadmin', password='exportadmin')
+        self.assertEqual(self.client.get(
+            url, {'format': 'pdf'}).status_code, 400)
+        self.assertEqual(self.client.get(
+            url, {'start_date': '2050-05-12',
+                  'end_date': '2050-05-11'}).status_code, 400)
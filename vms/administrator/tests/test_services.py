@@ -0,0 +1,185 @@
+# standard library
+import os
+import shutil
+import tempfile
+from datetime import time
+from unittest import mock
+
+# Django
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+# local Django
+from administrator.services import (get_report_pdf, get_report_pdf_path,
+                                    send_approved_report)
+from outbox.models import OutgoingMail
+from outbox.services import deliver_pending_mails
+from shift.utils import (create_admin_with_details, create_event_with_details,
+                         create_job_with_details,
+                         create_organization_with_details,
+                         create_report_with_details, create_shift_with_details,
+                         create_volunteer_with_details, log_hours_with_details)
+
+
+class ReportPdfTest(TestCase):
+    """
+    Tests the rendering, caching and mailing of the pdf of a report
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        event = create_event_with_details({
+            'name': "Pdf Event",
+            'start_date': "2050-05-10",
+            'end_date': "2050-06-16",
+            'description': 'event-description',
+            'address': 'event-address',
+            'venue': 'event-venue'
+        })
+        job = create_job_with_details({
+            'name': "Pdf Job",
+            'start_date': "2050-05-10",
+            'end_date': "2050-06-15",
+            'description': "job-description",
+            'event': event
+        })
+        shift = create_shift_with_details({
+            'date': "2050-05-11",
+            'start_time': "9:00",
+            'end_time': "15:00",
+            'max_volunteers': 5,
+            'job': job,
+            'address': 'shift-address',
+            'venue': 'shift-venue'
+        })
+        cls.volunteer = create_volunteer_with_details({
+            'username': 'pdfvolunteer',
+            'first_name': "Pdf",
+            'last_name': "Volunteer",
+            'address': "Pallet Town",
+            'city': None,
+            'state': None,
+            'country': None,
+            'phone_number': "2374983247",
+            'email': "pdfvolunteer@test.com"
+        }, create_organization_with_details('Pdf Org'))
+        cls.admin = create_admin_with_details({
+            'username': 'pdfadmin',
+            'password': 'pdfadmin',
+            'first_name': 'Pdf',
+            'last_name': 'Admin',
+            'email': 'pdfadmin@test.com',
+            'address': 'admin-address',
+            'city': None,
+            'state': None,
+            'country': None,
+            'phone_number': '9999999999',
+            'organization': 'Pdf Admin Org'
+        })
+        cls.logged_shift = log_hours_with_details(
+            cls.volunteer, shift, time(9), time(12))
+        cls.report = create_report_with_details(
+            cls.volunteer, cls.logged_shift)
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        self.render_patch = mock.patch(
+            'administrator.services.render_to_pdf', return_value=b'%PDF-1.4')
+        self.render_to_pdf = self.render_patch.start()
+        mail.outbox = []
+
+    def tearDown(self):
+        self.render_patch.stop()
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def test_get_report_pdf_is_cached(self):
+        self.assertEqual(get_report_pdf(self.report, self.admin), b'%PDF-1.4')
+        self.assertEqual(get_report_pdf(self.report, self.admin), b'%PDF-1.4')
+        self.assertEqual(self.render_to_pdf.call_count, 1)
+
+        path = get_report_pdf_path(self.report, self.admin)
+        self.assertTrue(path.startswith(
+            os.path.join(self.media_root, 'reports', str(self.report.id))))
+        self.assertTrue(os.path.exists(path))
+
+    def test_get_report_pdf_after_hours_change(self):
+        old_path = get_report_pdf_path(self.report, self.admin)
+        get_report_pdf(self.report, self.admin)
+
+        self.report.lines.update(logged_end_time=time(13), duration=4)
+        self.assertNotEqual(
+            get_report_pdf_path(self.report, self.admin), old_path)
+        get_report_pdf(self.report, self.admin)
+        self.assertEqual(self.render_to_pdf.call_count, 2)
+
+    def test_send_approved_report(self):
+        send_approved_report(self.report, self.admin)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(OutgoingMail.objects.count(), 1)
+        # the pdf is rendered by the outbox worker
+        self.assertEqual(self.render_to_pdf.call_count, 0)
+
+        deliver_pending_mails(workers=1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ["pdfvolunteer@test.com"])
+        self.assertEqual(mail.outbox[0].attachments,
+                         [('file.pdf', b'%PDF-1.4', 'application/pdf')])
+
+        # a re-send reuses the cached pdf
+        send_approved_report(self.report, self.admin)
+        deliver_pending_mails(workers=1)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(self.render_to_pdf.call_count, 1)
+
+    def test_approve_queues_the_mail(self):
+        self.client.login(username='pdfadmin', password='pdfadmin')
+        response = self.client.get(
+            reverse('administrator:approve_report', args=[self.report.id]))
+        self.assertEqual(response.status_code, 302)
+        self.report.refresh_from_db()
+        self.assertEqual(self.report.confirm_status, 1)
+        self.assertEqual(self.report.approved_by, self.admin)
+        self.assertEqual(OutgoingMail.objects.count(), 1)
+
+        deliver_pending_mails(workers=1)
+        self.assertEqual(mail.outbox[0].subject, "Report Approved")
+        self.assertEqual(self.render_to_pdf.call_count, 1)
+
+    def test_download_report(self):
+        self.client.login(username='pdfadmin', password='pdfadmin')
+        url = reverse('administrator:download_report', args=[self.report.id])
+
+        # pending reports have no pdf yet
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        self.report.confirm_status = 1
+        self.report.approved_by = self.admin
+        self.report.save()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response.content, b'%PDF-1.4')
+
+        # another administrator gets the pdf signed by the approver
+        create_admin_with_details({
+            'username': 'otheradmin',
+            'password': 'otheradmin',
+            'first_name': 'Other',
+            'last_name': 'Admin',
+            'email': 'otheradmin@test.com',
+            'address': 'admin-address',
+            'city': None,
+            'state': None,
+            'country': None,
+            'phone_number': '9999999999',
+            'organization': 'Other Admin Org'
+        })
+        self.client.login(username='otheradmin', password='otheradmin')
+        self.assertEqual(self.client.get(url).content, b'%PDF-1.4')
+        self.assertEqual(self.render_to_pdf.call_count, 1)
+        self.assertEqual(
+            self.render_to_pdf.call_args[0][1]['admin'], self.admin)
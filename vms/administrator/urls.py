@@ -19,11 +19,22 @@ urlpatterns = [
         views.approve,
         name='approve_report'
     ),
+    url(
+        r'^report/download/(?P<report_id>\d+)$',
+        views.download_report,
+        name='download_report'
+    ),
     url(
         r'^report/reject/(?P<report_id>\d+)$',
         views.reject,
         name='reject_report'
     ),
+    url(r'^hours/export/$', views.export_hours, name='export_hours'),
+    url(
+        r'^volunteers/import/$',
+        views.import_volunteers,
+        name='import_volunteers'
+    ),
     url(r'^settings/$', views.settings, name='settings'),
     url(r'^edit/(?P<admin_id>\d+)$', AdminUpdateView.as_view(), name='edit'),
     url(r'^profile/(?P<admin_id>\d+)$', ProfileView.as_view(), name='profile'),
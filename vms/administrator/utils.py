@@ -2,16 +2,18 @@
 from functools import wraps
 
 # Django
+from django.contrib.auth.decorators import login_required
 from django.shortcuts import render
+from django.utils.decorators import method_decorator
 
-from administrator.models import Administrator
+# local Django
+from vms.roles import get_role
 
 
 def admin_required(func):
     @wraps(func)
     def wrapped_view(request, *args, **kwargs):
-        admin = hasattr(request.user, 'administrator')
-        if not admin:
+        if get_role(request).administrator is None:
             return render(request, 'vms/no_admin_rights.html', status=403)
         return func(request, *args, **kwargs)
 
@@ -21,19 +23,20 @@ def admin_required(func):
 def admin_id_check(func):
     @wraps(func)
     def wrapped_view(request, admin_id):
-        administrator = getattr(request.user, 'administrator',
-                                hasattr(request.user, 'administrator'))
-        if administrator is None:
+        if get_role(request).administrator is None:
             return render(request, 'vms/no_admin_rights.html', status=403)
-        elif not administrator:
-            try:
-                admin = Administrator.objects.get(id=admin_id)
-                if not int(admin.id) == administrator.id:
-                    return render(
-                        request, 'vms/no_admin_rights.html', status=403)
-            except Administrator.DoesNotExist:
-                return render(
-                    request, 'vms/no_admin_rights.html', status=403)
         return func(request, admin_id=admin_id)
 
     return wrapped_view
+
+
+class AdministratorLoginRequiredMixin(object):
+    """
+    Lets logged in administrators only use the view
+    """
+
+    @method_decorator(login_required)
+    @method_decorator(admin_required)
+    def dispatch(self, request, *args, **kwargs):
+        return super(AdministratorLoginRequiredMixin, self).dispatch(
+            request, *args, **kwargs)
@@ -1,31 +1,42 @@
+# standard library
+import io
+
 # third-party
 from braces.views import LoginRequiredMixin
-from cities_light.models import Country, Region, City
 
 # Django
 from django.contrib.auth.decorators import login_required
 from django.urls import reverse, reverse_lazy
-from django.core.exceptions import ObjectDoesNotExist
-from django.http import HttpResponseRedirect
+from django.db import transaction
+from django.http import (Http404, HttpResponse, HttpResponseBadRequest,
+                         HttpResponseRedirect, StreamingHttpResponse)
 from django.shortcuts import render
 from django.template.loader import render_to_string
 from django.utils.decorators import method_decorator
 from django.views.generic import ListView
 from django.views.generic.detail import DetailView
 from django.views.generic.edit import FormView, UpdateView
-from easy_pdf.rendering import render_to_pdf
-from django.core.mail.message import EmailMessage
-from django.core.mail import send_mail
 
 # local Django
-from administrator.forms import AdministratorForm
+from administrator.export import EXPORT_FORMATS
+from administrator.forms import (AdministratorForm, HoursExportForm,
+                                 VolunteerImportForm)
 from administrator.models import Administrator
-from administrator.utils import admin_required, admin_id_check
+from administrator.services import get_report_pdf, send_approved_report
+from administrator.utils import (AdministratorLoginRequiredMixin,
+                                 admin_id_check, admin_required)
+from outbox.services import enqueue_mail
 from shift.models import Report
-from shift.services import generate_report, get_report_by_id
+from event.services import get_events_ordered_by_name
+from shift.services import (get_logged_hours_rows, get_report_by_id,
+                            get_report_lines)
 from organization.services import (create_organization,
                                    get_organizations_ordered_by_name,
                                    get_organization_by_id)
+from vms.locations import get_location_index, resolve_posted_location
+from vms.pagination import paginate_request
+from volunteer.importer import (OPTIONAL_COLUMNS, REQUIRED_COLUMNS,
+                                VolunteerImporter, read_csv)
 
 
 class ReportListView(ListView, LoginRequiredMixin):
@@ -45,6 +56,21 @@ class ReportListView(ListView, LoginRequiredMixin):
         reports = Report.objects.filter(confirm_status=0)
         return reports
 
+    def get_context_data(self, **kwargs):
+        """
+        pages through the pending reports, oldest first
+
+        :return: report_list page
+        """
+        context = super(ReportListView, self).get_context_data(**kwargs)
+        context['report_list'] = paginate_request(
+            self.request,
+            self.get_queryset().select_related('volunteer__organization'),
+            ('date_submitted', 'id'))
+        context['event_list'] = get_events_ordered_by_name()
+        context['organization_list'] = get_organizations_ordered_by_name()
+        return context
+
 
 def reject(request, report_id):
     """
@@ -65,7 +91,7 @@ def reject(request, report_id):
             'admin': admin,
         }
     )
-    send_mail(
+    enqueue_mail(
         "Report Rejected", message,
         "messanger@localhost.com", [volunteer.email]
     )
@@ -74,40 +100,110 @@ def reject(request, report_id):
 
 def approve(request, report_id):
     """
-    approves the pending reports
+    approves the pending reports, the pdf is rendered and mailed to the
+    volunteer by the outbox worker
 
     :param report_id: The id of pending report
     :return: redirect to list of pending reports
     """
     report = get_report_by_id(report_id)
-    report.confirm_status = 1
-    report.save()
     admin = Administrator.objects.get(user=request.user)
-    volunteer_shift_list = report.volunteer_shifts.all()
-    report_list = generate_report(volunteer_shift_list)
-    volunteer = report.volunteer
-    post_pdf = render_to_pdf(
-        'administrator/pdf.html',
-        {
-            'report': report,
-            'admin': admin,
-            'report_list': report_list,
-        },
-    )
-    message = render_to_string(
-        'administrator/confirm_report.html',
+    # the mail is queued with the approval or not at all
+    with transaction.atomic():
+        report.confirm_status = 1
+        report.approved_by = admin
+        report.save()
+        send_approved_report(report, admin)
+    return HttpResponseRedirect('/administrator/report')
+
+
+@login_required
+@admin_required
+def download_report(request, report_id):
+    """
+    returns the pdf of an approved report, signed by the administrator who
+    approved it and rendered once per content
+
+    :param report_id: The id of approved report
+    :return: pdf of the report
+    """
+    report = get_report_by_id(report_id)
+    if report is None or report.confirm_status != 1:
+        raise Http404
+    admin = report.approved_by
+    if admin is None:
+        # approved before the approver was stored, or the approver was
+        # removed since
+        admin = Administrator.objects.get(user=request.user)
+    response = HttpResponse(
+        get_report_pdf(report, admin), content_type='application/pdf')
+    response['Content-Disposition'] = (
+        'attachment; filename="report-{0}.pdf"'.format(report.id))
+    return response
+
+
+@login_required
+@admin_required
+def export_hours(request):
+    """
+    streams the logged hours matching the event, job, organization and
+    shift dates in the query string, read from the database a chunk at a
+    time
+
+    :return: csv or xlsx file of the logged hours
+    """
+    form = HoursExportForm(request.GET)
+    if not form.is_valid():
+        return HttpResponseBadRequest(form.errors.as_text())
+    export_format = form.cleaned_data['format'] or 'csv'
+    content_type, stream = EXPORT_FORMATS[export_format]
+    row_list = get_logged_hours_rows(
+        form.cleaned_data['event'], form.cleaned_data['job'],
+        form.cleaned_data['organization'], form.cleaned_data['start_date'],
+        form.cleaned_data['end_date'])
+    response = StreamingHttpResponse(
+        stream(row_list), content_type=content_type)
+    response['Content-Disposition'] = (
+        'attachment; filename="hours.{0}"'.format(export_format))
+    return response
+
+
+@login_required
+@admin_required
+def import_volunteers(request):
+    """
+    imports the volunteers of an uploaded csv file, reading it a row at a
+    time
+
+    :return: the upload form, with the number of imported volunteers and
+             the rows with errors after an upload
+    """
+    importer = None
+    if request.method == 'POST':
+        form = VolunteerImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            # the passwords are hashed in this process, the
+            # import_volunteers command hashes large files in parallel
+            importer = VolunteerImporter(form.cleaned_data['organization'])
+            csv_file = io.TextIOWrapper(
+                form.cleaned_data['csv_file'].file, encoding='utf-8-sig',
+                newline='')
+            try:
+                importer.run(read_csv(csv_file))
+            except (UnicodeDecodeError, ValueError) as error:
+                form.add_error('csv_file', str(error))
+                importer = None
+    else:
+        form = VolunteerImportForm()
+    return render(
+        request, 'administrator/import_volunteers.html',
         {
-            'volunteer': volunteer,
-            'admin': admin,
+            'form': form,
+            'importer': importer,
+            'required_columns': REQUIRED_COLUMNS,
+            'optional_columns': OPTIONAL_COLUMNS,
         }
     )
-    msg = EmailMessage(
-        "Report Approved", message,
-        "messanger@localhost.com", [report.volunteer.email]
-    )
-    msg.attach('file.pdf', post_pdf, 'application/pdf')
-    msg.send()
-    return HttpResponseRedirect('/administrator/report')
 
 
 def show_report(request, report_id):
@@ -118,8 +214,7 @@ def show_report(request, report_id):
     :return: report of the volunteer
     """
     report = get_report_by_id(report_id)
-    volunteer_shift_list = report.volunteer_shifts.all()
-    report_list = generate_report(volunteer_shift_list)
+    report_list = get_report_lines(report)
     total_hours = report.total_hrs
     return render(
         request, 'administrator/view_report.html',
@@ -131,18 +226,6 @@ def show_report(request, report_id):
     )
 
 
-class AdministratorLoginRequiredMixin(object):
-    @method_decorator(login_required)
-    def dispatch(self, request, *args, **kwargs):
-        admin = hasattr(request.user, 'administrator')
-        if not admin:
-            return render(request, 'vms/no_admin_rights.html', status=403)
-        else:
-            return super(
-                AdministratorLoginRequiredMixin, self
-            ).dispatch(request, *args, **kwargs)
-
-
 @login_required
 @admin_required
 def settings(request):
@@ -169,17 +252,11 @@ class AdminUpdateView(AdministratorLoginRequiredMixin, UpdateView, FormView):
         context = super(AdminUpdateView, self).get_context_data(**kwargs)
         admin_id = self.kwargs['admin_id']
         admin = Administrator.objects.get(pk=admin_id)
-        country_list = Country.objects.all()
-        if admin.country:
-            country = admin.country
-            state_list = Region.objects.filter(country=country)
-            context['state_list'] = state_list
-        if admin.state:
-            state = admin.state
-            city_list = City.objects.filter(region=state)
-            context['city_list'] = city_list
+        index = get_location_index()
+        if admin.country_id:
+            context['state_list'] = index.get_states(admin.country_id)
         context['organization_list'] = self.organization_list
-        context['country_list'] = country_list
+        context['country_list'] = index.country_list
         return context
 
     def get_object(self, queryset=None):
@@ -191,24 +268,10 @@ class AdminUpdateView(AdministratorLoginRequiredMixin, UpdateView, FormView):
         admin_id = self.kwargs['admin_id']
         administrator = Administrator.objects.get(pk=admin_id)
         admin_to_edit = form.save(commit=False)
-        try:
-            country_name = self.request.POST.get('country')
-            country = Country.objects.get(name=country_name)
-        except ObjectDoesNotExist:
-            country = None
-        admin_to_edit.country = country
-        try:
-            state_name = self.request.POST.get('state')
-            state = Region.objects.get(name=state_name)
-        except ObjectDoesNotExist:
-            state = None
-        admin_to_edit.state = state
-        try:
-            city_name = self.request.POST.get('city')
-            city = City.objects.get(name=city_name)
-        except ObjectDoesNotExist:
-            city = None
-        admin_to_edit.city = city
+        place = resolve_posted_location(self.request.POST)
+        admin_to_edit.country = place.country
+        admin_to_edit.state = place.state
+        admin_to_edit.city = place.city
         organization_id = self.request.POST.get('organization_name')
         organization = get_organization_by_id(organization_id)
         if organization:
@@ -0,0 +1,17 @@
+# Django
+from django.apps import AppConfig
+from django.db.models.signals import post_delete, post_save
+
+
+def invalidate_event_feed(sender, **kwargs):
+    from event.feed import invalidate_event_feed
+    invalidate_event_feed()
+
+
+class EventConfig(AppConfig):
+    name = 'event'
+
+    def ready(self):
+        from event.models import Event
+        post_save.connect(invalidate_event_feed, sender=Event)
+        post_delete.connect(invalidate_event_feed, sender=Event)
@@ -0,0 +1,132 @@
+# standard library
+import hashlib
+import json
+import time
+
+# Django
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+# local Django
+from event.models import Event
+from vms.pagination import paginate
+
+# pages of the event feed of the vola api, read with a values() query and
+# kept in the cache until an event changes. settings.CACHES shares the
+# cache between the processes, so a change seen by one is seen by all.
+
+# columns of the feed, read with values
+EVENT_FEED_FIELDS = ('id', 'name', 'start_date', 'end_date', 'description',
+                     'address', 'city__name', 'state__name', 'country__name',
+                     'venue')
+
+# keyset ordering of the feed pages, see vms.pagination
+EVENT_FEED_ORDERING = ('start_date', 'id')
+
+# most events in a page of the feed, and the events in a page a cursor is
+# sent for without a page size
+EVENT_FEED_PAGE_SIZE = 1000
+
+# key of the version in the cache, changed on every save or delete of an
+# event so that no process uses the cached pages anymore
+VERSION_KEY = 'event.feed.version'
+
+# seconds a page stays in the cache, for changes the version does not
+# track, e.g. renamed cities or queryset updates
+EVENT_FEED_TIMEOUT = 60 * 60
+
+
+class FeedPage(object):
+
+    def __init__(self, content, next_cursor, version):
+        """
+        :param content: JSON list of the events of the page
+        :param next_cursor: Cursor of the next page, or None for the last
+        :param version: Feed version the page was read at
+        """
+        self.content = content
+        self.next_cursor = next_cursor
+        self.etag = hashlib.md5(content.encode()).hexdigest()
+        # time of the last change of an event, as a unix timestamp
+        self.last_modified = int(version)
+
+
+def get_feed_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, time.time(), None)
+        version = cache.get(VERSION_KEY) or time.time()
+    return version
+
+
+def invalidate_event_feed():
+    """
+    Makes every process read the feed pages again. Connected to the saves
+    and deletes of events.
+    """
+    # changed right away so that this transaction reads its own changes,
+    # and again after the commit so that no page cached from the rows
+    # before the commit is used
+    cache.set(VERSION_KEY, time.time(), None)
+    transaction.on_commit(lambda: cache.set(VERSION_KEY, time.time(), None))
+
+
+def get_event_data(event):
+    return {
+        'event_name': event['name'],
+        'start_date': event['start_date'],
+        'end_date': event['end_date'],
+        'description': event['description'],
+        'address': event['address'],
+        'city': event['city__name'],
+        'state': event['state__name'],
+        'country': event['country__name'],
+        'venue': event['venue'],
+    }
+
+
+def get_event_feed_page(start_date=None, since=None, cursor=None,
+                        page_size=None):
+    """
+    Returns a page of the events ordered by start date, from the cache if
+    no event changed since it was read. Without a cursor and a page size,
+    the page has all the events, as for the clients from before the feed
+    was paged.
+
+    :param start_date: Earliest start date of the events, or None
+    :param since: Earliest time of the last change of the events, to only
+                  fetch the events changed since an earlier fetch, or None
+    :param cursor: next_cursor of the previous page, or None
+    :param page_size: Events in a page, EVENT_FEED_PAGE_SIZE for None
+    :return: FeedPage
+    """
+    if cursor or page_size:
+        page_size = page_size or EVENT_FEED_PAGE_SIZE
+    version = get_feed_version()
+    key = 'event.feed.{0}'.format(hashlib.md5(json.dumps(
+        [version, start_date, since, cursor, page_size],
+        cls=DjangoJSONEncoder).encode()).hexdigest())
+    page = cache.get(key)
+    if page is not None:
+        return page
+
+    event_list = Event.objects.all()
+    if start_date:
+        event_list = event_list.filter(start_date__gte=start_date)
+    if since:
+        event_list = event_list.filter(modified__gte=since)
+    event_list = event_list.values(*EVENT_FEED_FIELDS)
+    if page_size is None:
+        event_list = event_list.order_by(*EVENT_FEED_ORDERING)
+        next_cursor = None
+    else:
+        event_list = paginate(
+            event_list, EVENT_FEED_ORDERING, cursor, page_size)
+        next_cursor = event_list.next_cursor
+    content = json.dumps(
+        [get_event_data(event) for event in event_list],
+        cls=DjangoJSONEncoder)
+    page = FeedPage(content, next_cursor, version)
+    cache.set(key, page, EVENT_FEED_TIMEOUT)
+    return page
@@ -1,8 +1,14 @@
+# standard library
+import datetime
+
 # Django
 from django import forms
 from django.forms import ModelForm
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 
 # local Django
+from event.feed import EVENT_FEED_PAGE_SIZE
 from event.models import Event
 
 
@@ -43,3 +49,31 @@ class SearchEventForm(forms.Form):
         regex=r'^[(A-Z)|(a-z)|(\s)|(\-)]+$', max_length=75, required=False)
     job = forms.CharField(required=False)
 
+
+class EventFeedForm(forms.Form):
+    date = forms.DateField(required=False)
+    # ISO 8601 date and time, or date, of an earlier fetch of the feed
+    since = forms.CharField(required=False)
+    # the feed is sent a page at a time only when one of these is given
+    cursor = forms.CharField(required=False)
+    page_size = forms.IntegerField(
+        required=False, min_value=1, max_value=EVENT_FEED_PAGE_SIZE)
+
+    def clean_since(self):
+        since = self.cleaned_data['since']
+        if not since:
+            return None
+        try:
+            value = parse_datetime(since)
+            if value is None:
+                day = parse_date(since)
+                if day is not None:
+                    value = datetime.datetime.combine(day, datetime.time())
+        except ValueError:
+            value = None
+        if value is None:
+            raise forms.ValidationError(
+                u"Enter an ISO 8601 date or date and time")
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value, timezone.utc)
+        return value
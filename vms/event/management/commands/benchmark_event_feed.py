@@ -0,0 +1,119 @@
+# standard library
+import time
+from datetime import date, timedelta
+
+# Django
+from cities_light.models import City, Country, Region
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+# local Django
+from event.feed import get_event_feed_page, invalidate_event_feed
+from event.models import Event
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ('Compares building the whole vola api event list, with three '
+            'location queries per event, with reading the paginated and '
+            'cached event feed. All rows are rolled back.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size', type=int, default=100000, dest='size',
+            help='Number of events to create')
+        parser.add_argument(
+            '--batch-size', type=int, default=5000, dest='batch_size',
+            help='Number of events inserted per query while seeding')
+
+    def handle(self, *args, **options):
+        if options['size'] < 1 or options['batch_size'] < 1:
+            raise CommandError('Size and batch size should be at least 1')
+
+        try:
+            with transaction.atomic():
+                self.run(options['size'], options['batch_size'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, size, batch_size):
+        self.create_events(size, batch_size)
+
+        self.stdout.write('{0:<28} {1:>12} {2:>10}'.format(
+            'read', 'time (ms)', 'queries'))
+        self.measure('whole list, one at a time', self.old_event_list)
+
+        invalidate_event_feed()
+        self.measure('whole feed, page by page', self.read_feed)
+        invalidate_event_feed()
+        self.measure('first page', get_event_feed_page)
+        self.measure('first page, cached', get_event_feed_page)
+        page = get_event_feed_page()
+        last_cursor = None
+        while page.next_cursor:
+            last_cursor = page.next_cursor
+            page = get_event_feed_page(cursor=last_cursor)
+        invalidate_event_feed()
+        self.measure('last page', get_event_feed_page, cursor=last_cursor)
+
+    def create_events(self, size, batch_size):
+        country = Country.objects.create(
+            name='Benchmark Country', code2='BC', code3='BCY',
+            continent='EU', tld='bc', phone='1', geoname_id=99999901)
+        state = Region.objects.create(
+            name='Benchmark State', country=country, geoname_id=99999902)
+        city = City.objects.create(
+            name='Benchmark City', region=state, country=country,
+            geoname_id=99999903)
+        start = date(2050, 1, 1)
+        for offset in range(0, size, batch_size):
+            Event.objects.bulk_create([
+                Event(name='Benchmark Event {0}'.format(i),
+                      start_date=start + timedelta(days=i % 365),
+                      end_date=start + timedelta(days=i % 365 + 1),
+                      address='address', venue='venue', city=city,
+                      state=state, country=country)
+                for i in range(offset, min(offset + batch_size, size))
+            ])
+
+    @staticmethod
+    def old_event_list():
+        # the list the vola api built before the feed
+        event_list = []
+        for event in Event.objects.all().order_by('start_date'):
+            event_list.append({
+                'event_name': event.name,
+                'start_date': event.start_date,
+                'end_date': event.end_date,
+                'description': event.description,
+                'address': event.address,
+                'city': event.city.name if event.city else None,
+                'state': event.state.name if event.state else None,
+                'country': event.country.name if event.country else None,
+                'venue': event.venue,
+            })
+        return event_list
+
+    @staticmethod
+    def read_feed():
+        page = get_event_feed_page()
+        while page.next_cursor:
+            page = get_event_feed_page(cursor=page.next_cursor)
+
+    def measure(self, name, function, **kwargs):
+        query_count = [0]
+
+        def count_query(execute, sql, params, many, context):
+            query_count[0] += 1
+            return execute(sql, params, many, context)
+
+        with connection.execute_wrapper(count_query):
+            start = time.perf_counter()
+            function(**kwargs)
+            elapsed = (time.perf_counter() - start) * 1000
+        self.stdout.write('{0:<28} {1:>12.2f} {2:>10}'.format(
+            name, elapsed, query_count[0]))
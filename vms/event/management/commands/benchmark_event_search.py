@@ -0,0 +1,127 @@
+# standard library
+import time
+from datetime import date, timedelta
+from statistics import median
+
+# Django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+# local Django
+from event.models import Event
+from event.services import search_events
+from job.models import Job
+from job.services import search_jobs
+
+WORD_LIST = ['Open', 'Source', 'Python', 'Sprint', 'Data', 'Garden',
+             'Harvest', 'Library', 'River', 'Cleanup', 'Coding', 'Marathon',
+             'Festival', 'Shelter', 'Literacy', 'Workshop', 'Meetup']
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ('Measures the event and job searches, compared with the plain '
+            'substring filters, while the catalog grows. All rows are '
+            'rolled back.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='10000,100000,500000', dest='sizes',
+            help='Comma separated numbers of events to measure at, each '
+                 'event has two jobs')
+        parser.add_argument(
+            '--repeat', type=int, default=5, dest='repeat',
+            help='Number of timed runs per query and size')
+        parser.add_argument(
+            '--batch-size', type=int, default=5000, dest='batch_size',
+            help='Number of events inserted per query while seeding')
+
+    def handle(self, *args, **options):
+        try:
+            size_list = sorted(
+                int(size) for size in options['sizes'].split(','))
+        except ValueError:
+            raise CommandError('Sizes should be comma separated numbers')
+        if options['repeat'] < 1 or options['batch_size'] < 1:
+            raise CommandError('Repeat and batch size should be at least 1')
+
+        try:
+            with transaction.atomic():
+                self.run(size_list, options['repeat'], options['batch_size'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, size_list, repeat, batch_size):
+        start = date(2050, 1, 1)
+        end = start + timedelta(days=30)
+
+        def old_event_search():
+            return Event.objects.filter(
+                name__icontains='harvest riv').order_by('name', 'id')[:50]
+
+        def event_search():
+            return search_events(
+                'harvest riv', None, None, None, None, None, None).order_by(
+                    'name', 'id')[:50]
+
+        def old_job_search():
+            return Job.objects.filter(
+                name__icontains='literacy work',
+                event__name__icontains='garden',
+                start_date__gte=start, start_date__lte=end).order_by(
+                    'name', 'id')[:50]
+
+        def job_search():
+            return search_jobs(
+                'literacy work', start, end, None, None, None, 'garden').order_by(
+                    'name', 'id')[:50]
+
+        self.stdout.write('{0:>10} {1:>16} {2:>16} {3:>16} {4:>16}'.format(
+            'events', 'event like (ms)', 'event trgm (ms)', 'job like (ms)',
+            'job trgm (ms)'))
+        count = Event.objects.count()
+        for size in size_list:
+            while count < size:
+                number = min(batch_size, size - count)
+                self.create_events(count, number, start)
+                count += number
+            self.stdout.write(
+                '{0:>10} {1:>16.2f} {2:>16.2f} {3:>16.2f} {4:>16.2f}'.format(
+                    size, self.measure(old_event_search, repeat),
+                    self.measure(event_search, repeat),
+                    self.measure(old_job_search, repeat),
+                    self.measure(job_search, repeat)))
+
+    @staticmethod
+    def get_name(i):
+        return '{0} {1} {2}'.format(
+            WORD_LIST[i % len(WORD_LIST)],
+            WORD_LIST[i // len(WORD_LIST) % len(WORD_LIST)], i)
+
+    def create_events(self, count, number, start):
+        Event.objects.bulk_create([
+            Event(name=self.get_name(i),
+                  start_date=start + timedelta(days=i % 365),
+                  end_date=start + timedelta(days=i % 365 + 1))
+            for i in range(count, count + number)
+        ])
+        event_list = Event.objects.filter(
+            start_date__gte=start).order_by('-id')[:number]
+        Job.objects.bulk_create([
+            Job(event=event, name=self.get_name(event.id * 2 + j),
+                start_date=event.start_date, end_date=event.end_date)
+            for event in event_list for j in range(2)
+        ])
+
+    @staticmethod
+    def measure(function, repeat):
+        timing_list = []
+        for i in range(repeat):
+            start = time.perf_counter()
+            list(function())
+            timing_list.append((time.perf_counter() - start) * 1000)
+        return median(timing_list)
@@ -0,0 +1,72 @@
+# standard library
+import time
+
+# Django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+# local Django
+from event.meetup import (MEETUP_IMPORT_BATCH_SIZE, MeetupError,
+                          fetch_meetups, import_meetups)
+
+
+class Command(BaseCommand):
+    help = ('Imports the upcoming meetups of the meetup service as events. '
+            'Meetups imported before update their events instead of being '
+            'created again.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date', dest='date',
+            help='Earliest start date of the meetups as YYYY-MM-DD, today '
+                 'if not given')
+        parser.add_argument(
+            '--url', dest='url',
+            help='Url of the meetup service, {0} if not given'.format(
+                settings.MEETUP_API_URL))
+        parser.add_argument(
+            '--timeout', type=float, dest='timeout',
+            help='Seconds to wait for the meetup service to connect and to '
+                 'answer')
+        parser.add_argument(
+            '--batch-size', type=int, default=MEETUP_IMPORT_BATCH_SIZE,
+            dest='batch_size',
+            help='Number of meetups looked up and saved together')
+        parser.add_argument(
+            '--loop', action='store_true', dest='loop',
+            help='Keep importing instead of exiting after one import')
+        parser.add_argument(
+            '--interval', type=float, default=60 * 60, dest='interval',
+            help='Seconds to wait between imports with --loop')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('Batch size should be at least 1')
+        date = None
+        if options['date']:
+            try:
+                date = parse_date(options['date'])
+            except ValueError:
+                date = None
+            if date is None:
+                raise CommandError('Date should be given as YYYY-MM-DD')
+
+        while True:
+            try:
+                meetup_list = fetch_meetups(
+                    date, options['url'], options['timeout'])
+            except MeetupError as error:
+                if not options['loop']:
+                    raise CommandError(error)
+                self.stderr.write(str(error))
+            else:
+                meetup_import = import_meetups(
+                    meetup_list, options['batch_size'])
+                for meetup, error in meetup_import.error_list:
+                    self.stderr.write('Not imported {0}: {1}'.format(
+                        meetup, error))
+                self.stdout.write('Imported {0}'.format(meetup_import))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
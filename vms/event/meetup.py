@@ -0,0 +1,243 @@
+# standard library
+import hashlib
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# third party
+import requests
+
+# Django
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import connection, connections, transaction
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+# local Django
+from event.feed import invalidate_event_feed
+from event.models import Event
+
+# meetups fetched from the meetup service are saved as events, matched on
+# their external id so that importing a meetup again updates its event
+
+# event fields set from a meetup
+MEETUP_FIELDS = ('name', 'start_date', 'end_date', 'description', 'address',
+                 'venue')
+
+# meetups looked up and saved together
+MEETUP_IMPORT_BATCH_SIZE = 500
+
+# event fields not checked by clean_fields, as meetups have no location
+UNCHECKED_FIELDS = ['city', 'state', 'country']
+
+logger = logging.getLogger(__name__)
+meetup_executor = None
+
+
+class MeetupError(Exception):
+    pass
+
+
+class MeetupImport(object):
+    """
+    Counts of a meetup import, with the meetups that were not saved
+    """
+
+    def __init__(self):
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.error_list = []
+        self.elapsed = 0
+
+    @property
+    def total(self):
+        return (self.created + self.updated + self.unchanged +
+                len(self.error_list))
+
+    @property
+    def rate(self):
+        return self.total / self.elapsed if self.elapsed else 0
+
+    def __str__(self):
+        return ('{0} meetups: {1} created, {2} updated, {3} unchanged, '
+                '{4} not valid in {5:.2f}s ({6:.1f} rows/s)'.format(
+                    self.total, self.created, self.updated, self.unchanged,
+                    len(self.error_list), self.elapsed, self.rate))
+
+
+def fetch_meetups(date=None, url=None, timeout=None):
+    """
+    Fetches the meetups starting on the date or later from the meetup
+    service
+
+    :param date: Earliest start date, today if None
+    :param timeout: Seconds to wait for the service to connect and to
+                    answer, or a tuple of both, the settings if None
+    :return: List of meetup dictionaries
+    :raise: MeetupError if the service cannot be reached or answers with
+            an error
+    """
+    if date is None:
+        date = timezone.now().date()
+    if timeout is None:
+        timeout = (settings.MEETUP_CONNECT_TIMEOUT,
+                   settings.MEETUP_READ_TIMEOUT)
+    try:
+        response = requests.post(
+            url or settings.MEETUP_API_URL, {'date': str(date)},
+            timeout=timeout)
+        response.raise_for_status()
+        meetup_list = response.json()
+    except (requests.RequestException, ValueError) as error:
+        raise MeetupError(
+            'Could not fetch the meetups: {0}'.format(error))
+    if not isinstance(meetup_list, list):
+        raise MeetupError('The meetup service did not answer with a list')
+    return meetup_list
+
+
+def get_external_id(meetup):
+    """
+    :return: The id of the meetup in the service, or a digest of its name
+             and start date for a service that sends no ids
+    """
+    if meetup.get('id'):
+        return 'meetup:{0}'.format(meetup['id'])
+    digest = hashlib.sha1('{0}|{1}'.format(
+        meetup.get('event_name'), meetup.get('start_date')).encode())
+    return 'meetup:{0}'.format(digest.hexdigest())
+
+
+def get_meetup_event(meetup):
+    """
+    :return: Unsaved event of the meetup
+    :raise: ValidationError if the meetup is not a valid event
+    """
+    event = Event(
+        external_id=get_external_id(meetup),
+        name=meetup.get('event_name') or '',
+        start_date=meetup.get('start_date'),
+        end_date=meetup.get('end_date') or meetup.get('start_date'),
+        description=meetup.get('description') or '',
+        address=meetup.get('address') or None,
+        venue=meetup.get('venue') or None)
+    event.clean_fields(exclude=UNCHECKED_FIELDS)
+    return event
+
+
+def update_events(change_list):
+    """
+    Saves the changed fields of the events with one UPDATE per batch, as
+    bulk_update does in later Django versions. Only the changed fields are
+    set, which keeps the CASE expressions of the UPDATE small. Sets the
+    time of the change, which the update does not do by itself.
+
+    :param change_list: List of (event, names of its changed fields)
+    """
+    if not change_list:
+        return
+    now = timezone.now()
+    batch_size = max(connection.ops.bulk_batch_size(
+        ['pk', 'pk'] + list(MEETUP_FIELDS),
+        [event for event, field_list in change_list]), 1)
+    for start in range(0, len(change_list), batch_size):
+        batch = change_list[start:start + batch_size]
+        values = {}
+        for field in MEETUP_FIELDS:
+            when_list = [
+                When(pk=event.pk, then=Value(getattr(event, field)))
+                for event, field_list in batch if field in field_list
+            ]
+            if when_list:
+                values[field] = Case(
+                    *when_list, default=F(field),
+                    output_field=Event._meta.get_field(field))
+        Event.objects.filter(
+            pk__in=[event.pk for event, field_list in batch]).update(
+                modified=now, **values)
+
+
+def import_meetup_batch(meetup_list, meetup_import):
+    event_by_external_id = {}
+    for meetup in meetup_list:
+        try:
+            event = get_meetup_event(meetup)
+        except (ValidationError, AttributeError) as error:
+            meetup_import.error_list.append((meetup, error))
+            continue
+        # a meetup sent twice is saved once, with its last values
+        event_by_external_id[event.external_id] = event
+
+    existing_by_external_id = Event.objects.in_bulk(
+        list(event_by_external_id), field_name='external_id')
+    created_list = []
+    change_list = []
+    for external_id, event in event_by_external_id.items():
+        existing = existing_by_external_id.get(external_id)
+        if existing is None:
+            created_list.append(event)
+            continue
+        field_list = [
+            field for field in MEETUP_FIELDS
+            if getattr(existing, field) != getattr(event, field)
+        ]
+        if field_list:
+            event.pk = existing.pk
+            change_list.append((event, field_list))
+        else:
+            meetup_import.unchanged += 1
+
+    with transaction.atomic():
+        Event.objects.bulk_create(created_list)
+        update_events(change_list)
+    meetup_import.created += len(created_list)
+    meetup_import.updated += len(change_list)
+
+
+def import_meetups(meetup_list, batch_size=MEETUP_IMPORT_BATCH_SIZE):
+    """
+    Creates the events of new meetups and updates the events of meetups
+    imported before, a batch at a time with bulk queries
+
+    :param meetup_list: Meetup dictionaries with an event_name, start_date
+                        and optionally an id, end_date, description,
+                        address and venue
+    :return: MeetupImport
+    """
+    meetup_import = MeetupImport()
+    start = time.perf_counter()
+    for offset in range(0, len(meetup_list), batch_size):
+        import_meetup_batch(
+            meetup_list[offset:offset + batch_size], meetup_import)
+    meetup_import.elapsed = time.perf_counter() - start
+    # bulk queries send no signals
+    if meetup_import.created or meetup_import.updated:
+        invalidate_event_feed()
+    return meetup_import
+
+
+def import_meetups_in_thread(date):
+    try:
+        meetup_import = import_meetups(fetch_meetups(date))
+        logger.info('Imported %s', meetup_import)
+    except Exception:
+        logger.exception('Could not import the meetups')
+    finally:
+        connections.close_all()
+
+
+def submit_meetup_import(date=None):
+    """
+    Fetches and imports the meetups in a background thread, so that the
+    request does not wait for the meetup service
+
+    :param date: Earliest start date of the meetups, today if None
+
+    :return: Future of the job
+    """
+    global meetup_executor
+    if meetup_executor is None:
+        meetup_executor = ThreadPoolExecutor(max_workers=1)
+    return meetup_executor.submit(import_meetups_in_thread, date)
@@ -37,6 +37,13 @@ class Event(models.Model):
         blank=True,
         null=True,
     )
+    # id of the event in the service it was imported from, e.g.
+    # meetup:<id> for the events of the meetup import
+    external_id = models.CharField(
+        max_length=100, unique=True, null=True, blank=True)
+    # time of the last change, for the events changed since a date in the
+    # feed of the vola api
+    modified = models.DateTimeField(auto_now=True, db_index=True)
 
     def __str__(self):
         return str(self.name)
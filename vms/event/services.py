@@ -3,10 +3,12 @@ from django.core.exceptions import ObjectDoesNotExist
 
 # local Django
 from event.models import Event
-from job.services import get_jobs_by_event_id, remove_empty_jobs_for_volunteer
+from job.models import Job
 from shift.models import Shift
-from shift.services import (get_volunteer_shifts_with_hours,
+from shift.services import (get_open_shifts_for_volunteer,
+                            get_volunteer_shifts_with_hours,
                             get_unlogged_shifts_by_volunteer_id)
+from vms.trigram import filter_contains
 
 
 def event_not_empty(event_id):
@@ -156,14 +158,24 @@ def get_signed_up_events_for_volunteer(volunteer_id):
     return event_list
 
 
-def remove_empty_events_for_volunteer(event_list, volunteer_id):
-    """ Removes all events from an event list without jobs or shifts """
-    new_event_list = []
-    for event in event_list:
-        job_list = get_jobs_by_event_id(event.id)
-        job_list = remove_empty_jobs_for_volunteer(job_list, volunteer_id)
-        if job_list:
-            new_event_list.append(event)
+def remove_empty_events_for_volunteer(event_list, volunteer_id,
+                                      from_date=None):
+    """
+    Removes all events from an event list without jobs or shifts
+    that are open for the volunteer
+
+    :param event_list: events to filter
+    :param volunteer_id: The id of the volunteer
+    :param from_date: only consider shifts on or after this date (optional)
+    :return: list of events with open shifts
+    """
+    shift_list = get_open_shifts_for_volunteer(
+        volunteer_id, from_date).filter(job__event__in=event_list)
+    open_event_ids = set(
+        shift_list.values_list('job__event_id', flat=True).distinct())
+    new_event_list = [
+        event for event in event_list if event.id in open_event_ids
+    ]
     return new_event_list
 
 
@@ -182,17 +194,22 @@ def search_events(name, start_date, end_date, city, state, country, job):
     """
     search_query = Event.objects.all()
     if name:
-        search_query = search_query.filter(name__icontains=name)
-    if start_date or end_date:
-        search_query = get_events_by_date(start_date, end_date)
+        search_query = filter_contains(search_query, 'name', name)
+    if start_date:
+        search_query = search_query.filter(start_date__gte=start_date)
+    if end_date:
+        search_query = search_query.filter(start_date__lte=end_date)
     if city:
-        search_query = search_query.filter(city__name__icontains=city)
+        search_query = filter_contains(search_query, 'city__name', city)
     if state:
-        search_query = search_query.filter(state__name__icontains=state)
+        search_query = filter_contains(search_query, 'state__name', state)
     if country:
-        search_query = search_query.filter(country__name__icontains=country)
+        search_query = filter_contains(search_query, 'country__name', country)
     if job:
-        search_query = search_query.filter(job__name__icontains=job)
+        # a subquery rather than a join, so that an event with several
+        # matching jobs is only found once
+        search_query = search_query.filter(id__in=filter_contains(
+            Job.objects.all(), 'name', job).values('event_id'))
     return search_query
 
 
@@ -1,12 +1,20 @@
-# third party
+# standard library
 import json
+from datetime import datetime
+from unittest import mock
+
+# third party
 from rest_framework.test import APITestCase
 
 # Django
+from django.db import connection
 from django.test.testcases import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from django.utils import timezone
 
 # local Django
+from event.models import Event
 from shift.utils import (create_country, create_state,
                          create_city, create_event_with_details,
                          create_second_state, create_second_country,
@@ -98,3 +106,68 @@ class ApiForVolaViewTestCase(APITestCase, TestCase):
             [self.expected_result_two]
         )
 
+    def test_api_pages(self):
+        """Test that the link header points at the next page"""
+        url = reverse('event:vola_api')
+        response = self.client.get(
+            url, {'date': '2010-01-01', 'page_size': 1})
+        self.assertEqual(json.loads(response.content),
+                         [self.expected_result_one])
+        next_url, rel = response['Link'].split('; ')
+        self.assertEqual(rel, 'rel="next"')
+        self.assertIn('date=2010-01-01', next_url)
+        response = self.client.get(next_url[1:-1])
+        self.assertEqual(json.loads(response.content),
+                         [self.expected_result_two])
+        self.assertFalse(response.has_header('Link'))
+
+        # without a page size all events are sent, as before the paging
+        with mock.patch('event.feed.EVENT_FEED_PAGE_SIZE', 1):
+            response = self.client.get(url, {'date': '2010-01-01'})
+        self.assertEqual(
+            json.loads(response.content),
+            [self.expected_result_one, self.expected_result_two])
+        self.assertFalse(response.has_header('Link'))
+        self.assertEqual(
+            self.client.get(url, {'page_size': 0}).status_code, 400)
+
+    def test_api_conditional_get(self):
+        """
+        Test that an unchanged feed is answered from the cache, and with
+        304 to a request with its etag
+        """
+        url = reverse('event:vola_api')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.has_header('Last-Modified'))
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(url).content, response.content)
+            not_modified = self.client.get(
+                url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        # only the cache is read, which is a table with the database cache
+        self.assertFalse([query for query in queries.captured_queries
+                          if 'event_event' in query['sql']])
+
+        self.event_2.name = 'eventr'
+        self.event_2.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)[1]['event_name'],
+                         'eventr')
+
+    def test_api_since(self):
+        """Test that since leaves out the events changed before it"""
+        Event.objects.filter(pk=self.event_2.pk).update(
+            modified=timezone.make_aware(datetime(2018, 1, 1)))
+        url = reverse('event:vola_api')
+        response = self.client.get(url, {'since': '2018-06-13T10:00:00'})
+        self.assertEqual(json.loads(response.content),
+                         [self.expected_result_one])
+        response = self.client.post(
+            url, {'since': '2017-12-31'}, format='json')
+        self.assertEqual(len(json.loads(response.content)), 2)
+
+        response = self.client.get(url, {'since': 'yesterday'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('since', json.loads(response.content))
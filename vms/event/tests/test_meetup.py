@@ -0,0 +1,161 @@
+# standard library
+import json
+import threading
+import time
+from datetime import date
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from io import StringIO
+from unittest import mock
+from urllib.parse import parse_qs
+
+# Django
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+# local Django
+from event.meetup import (MeetupError, fetch_meetups, get_external_id,
+                          import_meetups)
+from event.models import Event
+from shift.utils import create_admin_with_details
+
+MEETUP_LIST = [
+    {'id': 1, 'event_name': 'Python Meetup', 'start_date': '2050-05-10',
+     'venue': 'Library'},
+    {'id': 2, 'event_name': 'Django Sprint', 'start_date': '2050-05-11',
+     'end_date': '2050-05-12', 'description': 'Two days of sprints',
+     'address': 'Main Street', 'venue': 'Town Hall'},
+    {'event_name': 'Open Data Day', 'start_date': '2050-05-12',
+     'venue': 'Garden'},
+]
+
+
+class MeetupStubHandler(BaseHTTPRequestHandler):
+    """
+    Meetup service answering with the meetups of the server, after waiting
+    for its delay
+    """
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.server.posted_list.append(
+            parse_qs(self.rfile.read(length).decode()))
+        time.sleep(self.server.delay)
+        content = json.dumps(self.server.meetup_list).encode()
+        try:
+            self.send_response(self.server.status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+        except (BrokenPipeError, ConnectionResetError):
+            # the client timed out
+            pass
+
+    def log_message(self, *args):
+        pass
+
+
+class MeetupImportTest(TestCase):
+    """
+    Tests the meetup import against a local stub of the meetup service
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        super(MeetupImportTest, cls).setUpClass()
+        cls.server = HTTPServer(('127.0.0.1', 0), MeetupStubHandler)
+        cls.server.meetup_list = MEETUP_LIST
+        cls.server.posted_list = []
+        cls.server.delay = 0
+        cls.server.status = 200
+        cls.url = 'http://127.0.0.1:{0}/'.format(cls.server.server_port)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super(MeetupImportTest, cls).tearDownClass()
+
+    @classmethod
+    def setUpTestData(cls):
+        create_admin_with_details({
+            'username': 'meetupadmin',
+            'password': 'meetupadmin',
+            'first_name': 'Meetup',
+            'last_name': 'Admin',
+            'email': 'meetupadmin@test.com',
+            'address': 'admin-address',
+            'city': None,
+            'state': None,
+            'country': None,
+            'phone_number': '9999999999',
+            'organization': 'Meetup Org'
+        })
+
+    def setUp(self):
+        self.server.delay = 0
+        self.server.status = 200
+
+    def test_fetch_meetups(self):
+        self.assertEqual(
+            fetch_meetups(date(2050, 5, 1), self.url), MEETUP_LIST)
+        self.assertEqual(self.server.posted_list[-1], {'date': ['2050-05-01']})
+
+        self.server.delay = 0.5
+        with self.assertRaises(MeetupError):
+            fetch_meetups(url=self.url, timeout=0.1)
+        self.server.delay = 0
+        self.server.status = 500
+        with self.assertRaises(MeetupError):
+            fetch_meetups(url=self.url)
+
+    # the event feed version is set in a per process cache, so that only
+    # the queries of the import are counted
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}})
+    def test_import_meetups(self):
+        # the lookup and the insert, in the savepoint of the batch
+        with self.assertNumQueries(4):
+            meetup_import = import_meetups(MEETUP_LIST)
+        self.assertEqual((meetup_import.created, meetup_import.updated,
+                          meetup_import.unchanged), (3, 0, 0))
+        event = Event.objects.get(external_id='meetup:2')
+        self.assertEqual(
+            (event.name, event.start_date, event.end_date, event.address,
+             event.venue),
+            ('Django Sprint', date(2050, 5, 11), date(2050, 5, 12),
+             'Main Street', 'Town Hall'))
+        event = Event.objects.get(external_id='meetup:1')
+        self.assertEqual(event.end_date, event.start_date)
+        self.assertTrue(Event.objects.filter(
+            external_id=get_external_id(MEETUP_LIST[2])).exists())
+
+        # a second import finds the events instead of creating them again
+        changed_list = [dict(MEETUP_LIST[0], venue='Park')] + MEETUP_LIST[1:]
+        changed_list.append({'id': 4, 'event_name': 'Bad & Name',
+                             'start_date': '2050-05-13'})
+        meetup_import = import_meetups(changed_list, batch_size=2)
+        self.assertEqual((meetup_import.created, meetup_import.updated,
+                          meetup_import.unchanged), (0, 1, 2))
+        self.assertEqual(len(meetup_import.error_list), 1)
+        self.assertEqual(meetup_import.total, 4)
+        self.assertEqual(Event.objects.count(), 3)
+        self.assertEqual(
+            Event.objects.get(external_id='meetup:1').venue, 'Park')
+
+    def test_command(self):
+        out = StringIO()
+        call_command('import_meetups', url=self.url, date='2050-05-01',
+                     stdout=out)
+        self.assertIn('3 meetups: 3 created', out.getvalue())
+        self.assertIn('rows/s', out.getvalue())
+        self.assertEqual(Event.objects.count(), 3)
+
+    def test_view(self):
+        self.client.login(username='meetupadmin', password='meetupadmin')
+        with mock.patch('event.views.submit_meetup_import') as submit:
+            response = self.client.get(reverse('event:meetup'))
+        self.assertRedirects(response, reverse('event:list'))
+        submit.assert_called_once_with()
@@ -2,6 +2,10 @@
 import datetime
 import unittest
 
+# Django
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 # local Django
 from event.services import (event_not_empty, delete_event,
                             check_edit_event, get_event_by_id,
@@ -504,6 +508,27 @@ class EventWithVolunteerTest(unittest.TestCase):
         self.assertNotIn(self.e5, event_list)
         VolunteerShift.objects.all().delete()
 
+    def test_remove_empty_events_for_volunteer_queries(self):
+        """
+        Uses Events e1,e2,e3,e4,e5 and volunteer v1; the filter must cost
+        a fixed number of queries and honour the date of the shifts
+        """
+
+        event_list = [self.e1, self.e2, self.e3, self.e4, self.e5]
+        with CaptureQueriesContext(connection) as queries:
+            open_event_list = remove_empty_events_for_volunteer(
+                event_list, self.v1.id)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(open_event_list, [self.e1, self.e2, self.e4])
+
+        # all shifts of these events are in the past
+        open_event_list = remove_empty_events_for_volunteer(
+            event_list, self.v1.id, datetime.date(2012, 11, 1))
+        self.assertEqual(open_event_list, [self.e2])
+        open_event_list = remove_empty_events_for_volunteer(
+            event_list, self.v1.id, datetime.date.today())
+        self.assertEqual(open_event_list, [])
+
     def test_get_signed_up_events_for_volunteer(self):
         """ Uses events e1,e2, volunteers v1,v2,v3 and shift s1,s2,s3"""
 
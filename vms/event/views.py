@@ -1,7 +1,5 @@
 # standard library
 import datetime
-import json
-import requests
 
 # third party
 from braces.views import LoginRequiredMixin
@@ -9,45 +7,33 @@ from braces.views import LoginRequiredMixin
 # Django
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.core.exceptions import ObjectDoesNotExist
 from django.urls import reverse
 from django.urls import reverse_lazy
-from django.http import JsonResponse, HttpResponseRedirect
+from django.http import HttpResponse, HttpResponseRedirect, JsonResponse
 from rest_framework.views import APIView
 from django.shortcuts import render
-from django.utils.decorators import method_decorator
+from django.utils.cache import (get_conditional_response,
+                                patch_cache_control)
+from django.utils.http import http_date, quote_etag, urlencode
 from django.views.generic.edit import FormView, UpdateView
 from django.views.generic.edit import DeleteView
 from django.views.generic import DetailView
 
 # local Django
-from administrator.utils import admin_required
-from cities_light.models import Country, Region, City
-from event.forms import EventForm, SearchEventForm
+from administrator.utils import (AdministratorLoginRequiredMixin,
+                                 admin_required)
+from event.feed import get_event_feed_page
+from event.forms import EventFeedForm, EventForm, SearchEventForm
+from event.meetup import submit_meetup_import
 from event.models import Event
 from event.services import (check_edit_event, get_event_by_id,
                             get_events_ordered_by_name,
                             remove_empty_events_for_volunteer, search_events)
 from job.services import get_jobs_by_event_id
 from volunteer.utils import vol_id_check
+from vms.locations import get_location_index, resolve_posted_location
+from vms.pagination import paginate_request
 from vms.utils import check_correct_volunteer_shift_sign_up
-from shift.utils import create_event_with_details
-
-
-class AdministratorLoginRequiredMixin(object):
-    @method_decorator(login_required)
-    def dispatch(self, request, *args, **kwargs):
-        user = request.user
-        admin = None
-        try:
-            admin = user.administrator
-        except ObjectDoesNotExist:
-            pass
-        if not admin:
-            return render(request, 'vms/no_admin_rights.html')
-        else:
-            return super(AdministratorLoginRequiredMixin, self).dispatch(
-                request, *args, **kwargs)
 
 
 class EventCreateView(LoginRequiredMixin, AdministratorLoginRequiredMixin,
@@ -57,11 +43,11 @@ class EventCreateView(LoginRequiredMixin, AdministratorLoginRequiredMixin,
 
     def get_context_data(self, **kwargs):
         context = super(EventCreateView, self).get_context_data(**kwargs)
-        context['country_list'] = Country.objects.all()
+        context['country_list'] = get_location_index().country_list
         return context
 
     def form_valid(self, form):
-        country_list = Country.objects.all()
+        country_list = get_location_index().country_list
         start_date = form.cleaned_data['start_date']
         if start_date < (datetime.date.today() - datetime.timedelta(days=1)):
             messages.add_message(
@@ -73,24 +59,10 @@ class EventCreateView(LoginRequiredMixin, AdministratorLoginRequiredMixin,
             })
         else:
             event = form.save(commit=False)
-            try:
-                country_name = self.request.POST.get('country')
-                country = Country.objects.get(name=country_name)
-                event.country = country
-            except ObjectDoesNotExist:
-                country_name = None
-            try:
-                state_name = self.request.POST.get('state')
-                state = Region.objects.get(name=state_name)
-                event.state = state
-            except ObjectDoesNotExist:
-                state_name = None
-            try:
-                city_name = self.request.POST.get('city')
-                city = City.objects.get(name=city_name)
-                event.city = city
-            except ObjectDoesNotExist:
-                city_name = None
+            place = resolve_posted_location(self.request.POST)
+            event.country = place.country
+            event.state = place.state
+            event.city = place.city
             event.save()
             return HttpResponseRedirect(reverse('event:list'))
 
@@ -154,17 +126,12 @@ class EventUpdateView(LoginRequiredMixin, AdministratorLoginRequiredMixin,
         job_obj = get_jobs_by_event_id(self.kwargs['event_id'])
         context['job_list'] = job_obj.values_list('start_date',
                                                   'end_date').distinct()
-        context['country_list'] = Country.objects.all()
+        index = get_location_index()
+        context['country_list'] = index.country_list
         event_id = self.kwargs['event_id']
         event = get_event_by_id(event_id)
-        if event.country:
-            country = event.country
-            state_list = Region.objects.filter(country=country)
-            context['state_list'] = state_list
-        if event.state:
-            state = event.state
-            city_list = City.objects.filter(region=state)
-            context['city_list'] = city_list
+        if event.country_id:
+            context['state_list'] = index.get_states(event.country_id)
         return context
 
     def post(self, request, *args, **kwargs):
@@ -195,24 +162,11 @@ class EventUpdateView(LoginRequiredMixin, AdministratorLoginRequiredMixin,
                     })
                 else:
                     event_to_edit = form.save(commit=False)
-                    try:
-                        country_name = self.request.POST.get('country')
-                        country = Country.objects.get(name=country_name)
-                    except ObjectDoesNotExist:
-                        country = None
-                    event_to_edit.country = country
-                    try:
-                        state_name = self.request.POST.get('state')
-                        state = Region.objects.get(name=state_name)
-                    except ObjectDoesNotExist:
-                        state = None
-                    event_to_edit.state = state
-                    try:
-                        city_name = self.request.POST.get('city')
-                        city = City.objects.get(name=city_name)
-                    except ObjectDoesNotExist:
-                        city = None
-                    event_to_edit.city = city
+                    place = resolve_posted_location(
+                        self.request.POST)
+                    event_to_edit.country = place.country
+                    event_to_edit.state = place.state
+                    event_to_edit.city = place.city
                     event_to_edit.save()
                     return HttpResponseRedirect(reverse('event:list'))
             else:
@@ -248,7 +202,8 @@ def list_sign_up(request, volunteer_id):
         form = SearchEventForm()
         search_result_list = get_events_ordered_by_name()
     event_list = remove_empty_events_for_volunteer(search_result_list,
-                                                   volunteer_id)
+                                                   volunteer_id,
+                                                   datetime.date.today())
     return render(
         request, 'event/list_sign_up.html', {
             'form': form,
@@ -284,6 +239,8 @@ def list_events(request):
     else:
         form = SearchEventForm()
 
+    search_result_list = paginate_request(
+        request, search_result_list, ('name', 'id'))
     return render(
         request, 'event/list.html', {
             'form': form,
@@ -292,64 +249,71 @@ def list_events(request):
         })
 
 
+# seconds for which clients may reuse a page of the event feed before
+# checking it again with the etag
+EVENT_FEED_MAX_AGE = 60
+
+
 class ApiForVolaView(APIView):
+    """
+    Feed of the events ordered by start date. Takes the earliest start
+    date as date and the earliest time of the last change as since, as
+    query parameters of a GET or data of a POST. With a page_size, the
+    feed is sent a page at a time and the link header of a page points at
+    the next one; without, all events are sent at once.
+    """
 
     @classmethod
-    def return_event_data(cls, events):
-        """function to return all or filtered event data"""
-        event_list = list()
-        for event in events:
-            event_data = dict()
-            event_data['event_name'] = event.name
-            event_data['start_date'] = event.start_date
-            event_data['end_date'] = event.end_date
-            event_data['description'] = event.description
-            event_data['address'] = event.address
-            event_data['city'] = event.city.name if event.city else None
-            event_data['state'] = event.state.name if event.state else None
-            event_data['country'] = \
-                event.country.name if event.country else None
-            event_data['venue'] = event.venue
-            event_list.append(event_data)
-        return JsonResponse(event_list, safe=False)
+    def return_event_data(cls, request, data):
+        form = EventFeedForm(data)
+        if not form.is_valid():
+            return JsonResponse(form.errors, status=400)
+        page = get_event_feed_page(
+            form.cleaned_data['date'], form.cleaned_data['since'],
+            form.cleaned_data['cursor'] or None,
+            form.cleaned_data['page_size'])
+
+        if request.method == 'GET':
+            response = get_conditional_response(
+                request, etag=quote_etag(page.etag),
+                last_modified=page.last_modified)
+            if response is not None:
+                return response
+        response = HttpResponse(
+            page.content, content_type='application/json')
+        response['ETag'] = quote_etag(page.etag)
+        response['Last-Modified'] = http_date(page.last_modified)
+        patch_cache_control(response, max_age=EVENT_FEED_MAX_AGE)
+        if page.next_cursor:
+            params = [
+                (key, value) for key, value in data.items()
+                if key != 'cursor'
+            ]
+            params.append(('cursor', page.next_cursor))
+            response['Link'] = '<{0}?{1}>; rel="next"'.format(
+                request.build_absolute_uri(reverse('event:vola_api')),
+                urlencode(params))
+        return response
 
     @classmethod
     def get(cls, request):
-        # fetching all meetups
-        events = Event.objects.all().order_by('start_date')
-        api_for_vola_view = ApiForVolaView()
-        return api_for_vola_view.return_event_data(events)
+        return cls.return_event_data(request, request.query_params)
 
     @classmethod
     def post(cls, request):
-        date = request.data['date']
-        # fetching all events whose start date is
-        # greater than or equal to the date posted
-        events = Event.objects.filter(
-            start_date__gte=date
-        ).order_by('start_date')
-        api_for_vola_view = ApiForVolaView()
-        return api_for_vola_view.return_event_data(events)
+        # the events whose start date is greater than or equal to the
+        # date posted
+        return cls.return_event_data(request, request.data)
 
 
+@login_required
+@admin_required
 def get_meetup(request):
-    date = str(datetime.datetime.today().date())
-    data = {'date': date}
-    response = requests.post(
-        'http://127.0.0.1:8000/meetup/api/v1/request_meetup_data/',
-        data
-    )
-    if response.status_code == 200:
-        json_data = json.loads(response.text)
-        for meetup in json_data:
-            start_date = meetup['start_date']
-            venue = meetup['venue']
-            name = meetup['event_name']
-            end_date = start_date
-            event_details = [name, start_date, end_date]
-            event = create_event_with_details(event_details)
-            event.venue = venue
-            event.save()
-        return HttpResponseRedirect(reverse('event:list'))
-    else:
-        return render(request, 'vms/no_connection.html')
+    """
+    Starts the import of the upcoming meetups as events in the background
+    """
+    submit_meetup_import()
+    messages.add_message(
+        request, messages.INFO,
+        'The upcoming meetups are being imported as events.')
+    return HttpResponseRedirect(reverse('event:list'))
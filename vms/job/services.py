@@ -3,9 +3,10 @@ from django.core.exceptions import ObjectDoesNotExist
 
 # local Django
 from job.models import Job
-from shift.services import (get_shifts_with_open_slots_for_volunteer,
+from shift.services import (get_open_shifts_for_volunteer,
                             get_volunteer_shifts_with_hours,
                             get_unlogged_shifts_by_volunteer_id)
+from vms.trigram import filter_contains
 
 
 def job_not_empty(job_id):
@@ -136,14 +137,19 @@ def get_signed_up_jobs_for_volunteer(volunteer_id):
     return job_list
 
 
-def remove_empty_jobs_for_volunteer(job_list, volunteer_id):
-    """ Removes all jobs from a job list without shifts """
-    new_job_list = []
-    for job in job_list:
-        shift_list = get_shifts_with_open_slots_for_volunteer(
-            job.id, volunteer_id)
-        if shift_list:
-            new_job_list.append(job)
+def remove_empty_jobs_for_volunteer(job_list, volunteer_id, from_date=None):
+    """
+    Removes all jobs from a job list without open shifts for the volunteer
+
+    :param job_list: jobs to filter
+    :param volunteer_id: The id of the volunteer
+    :param from_date: only consider shifts on or after this date (optional)
+    :return: list of jobs with open shifts
+    """
+    shift_list = get_open_shifts_for_volunteer(
+        volunteer_id, from_date).filter(job__in=job_list)
+    open_job_ids = set(shift_list.values_list('job_id', flat=True).distinct())
+    new_job_list = [job for job in job_list if job.id in open_job_ids]
     return new_job_list
 
 
@@ -162,18 +168,20 @@ def search_jobs(name, start_date, end_date, city, state, country, event):
 
     search_query = Job.objects.all()
     if name:
-        search_query = search_query.filter(name__icontains=name)
-    if start_date or end_date:
-        search_query = get_jobs_by_date(start_date, end_date)
+        search_query = filter_contains(search_query, 'name', name)
+    if start_date:
+        search_query = search_query.filter(start_date__gte=start_date)
+    if end_date:
+        search_query = search_query.filter(start_date__lte=end_date)
     if city:
-        search_query = search_query.filter(event__city__name__icontains=city)
+        search_query = filter_contains(search_query, 'event__city__name', city)
     if state:
-        search_query = search_query.filter(event__state__name__icontains=state)
+        search_query = filter_contains(
+            search_query, 'event__state__name', state)
     if country:
-        search_query = search_query.filter(
-            event__country__name__icontains=country
-        )
+        search_query = filter_contains(
+            search_query, 'event__country__name', country)
     if event:
-        search_query = search_query.filter(event__name__icontains=event)
+        search_query = filter_contains(search_query, 'event__name', event)
     return search_query
 
@@ -2,6 +2,10 @@
 import datetime
 import unittest
 
+# Django
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
 # local Django
 from job.services import (delete_job, check_edit_job, get_job_by_id,
                           get_jobs_by_event_id, get_jobs_ordered_by_title,
@@ -481,3 +485,19 @@ class JobWithShiftTests(unittest.TestCase):
         self.assertNotIn(self.j2, job_list)
         self.assertNotIn(self.j3, job_list)
         self.assertNotIn(self.j4, job_list)
+
+    def test_remove_empty_jobs_for_volunteer_queries(self):
+        """ Uses jobs j1,j2,j3,j4 and volunteer v1 """
+
+        job_list = [self.j1, self.j2, self.j3, self.j4]
+        with CaptureQueriesContext(connection) as queries:
+            open_job_list = remove_empty_jobs_for_volunteer(
+                job_list, self.v1.id)
+        self.assertEqual(len(queries), 1)
+        self.assertIn(self.j1, open_job_list)
+        self.assertNotIn(self.j2, open_job_list)
+
+        # all shifts of these jobs are in the past
+        open_job_list = remove_empty_jobs_for_volunteer(
+            job_list, self.v1.id, datetime.date.today())
+        self.assertEqual(open_job_list, [])
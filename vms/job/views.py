@@ -1,3 +1,6 @@
+# standard library
+from datetime import date
+
 # third party
 from braces.views import LoginRequiredMixin
 
@@ -9,33 +12,17 @@ from django.http import Http404, HttpResponseRedirect
 from django.shortcuts import render
 from django.views.generic import DetailView
 from django.views.generic.edit import FormView, UpdateView, DeleteView
-from django.utils.decorators import method_decorator
-from django.core.exceptions import ObjectDoesNotExist
 
 
 # local Django
+from administrator.utils import AdministratorLoginRequiredMixin
 from event.services import get_events_ordered_by_name, get_event_by_id
 from job.forms import JobForm, SearchJobForm
 from job.models import Job
 from job.services import (get_job_by_id, get_jobs_ordered_by_title,
                           check_edit_job, remove_empty_jobs_for_volunteer,
                           search_jobs, get_jobs_by_event_id)
-
-
-class AdministratorLoginRequiredMixin(object):
-    @method_decorator(login_required)
-    def dispatch(self, request, *args, **kwargs):
-        user = request.user
-        admin = None
-        try:
-            admin = user.administrator
-        except ObjectDoesNotExist:
-            pass
-        if not admin:
-            return render(request, 'vms/no_admin_rights.html')
-        else:
-            return super(AdministratorLoginRequiredMixin, self).dispatch(
-                request, *args, **kwargs)
+from vms.pagination import paginate_request
 
 
 class CreateJobView(LoginRequiredMixin, AdministratorLoginRequiredMixin,
@@ -182,7 +169,8 @@ def list_sign_up(request, event_id, volunteer_id):
             search_result_list = get_jobs_by_event_id(event_id)
         job_list = remove_empty_jobs_for_volunteer(
             search_result_list,
-            volunteer_id
+            volunteer_id,
+            date.today()
         )
         return render(
             request, 'job/list_sign_up.html', {
@@ -200,7 +188,9 @@ class JobListView(AdministratorLoginRequiredMixin, FormView):
     form_class = SearchJobForm
 
     def get(self, request, *args, **kwargs):
-        search_result_list = get_jobs_ordered_by_title()
+        search_result_list = paginate_request(
+            request, get_jobs_ordered_by_title().select_related('event'),
+            ('name', 'id'))
         return render(
             request,
             'job/list.html',
@@ -224,6 +214,9 @@ class JobListView(AdministratorLoginRequiredMixin, FormView):
                 name, start_date, end_date,
                 city, state, country, event
             )
+        search_result_list = paginate_request(
+            request, search_result_list.select_related('event'),
+            ('name', 'id'))
         return render(
             request,
             'job/list.html',
@@ -2,37 +2,21 @@
 from braces.views import LoginRequiredMixin
 
 # Django
-from django.contrib.auth.decorators import login_required
 from django.core.mail import send_mail
 from django.urls import reverse, reverse_lazy
 from django.http import HttpResponseRedirect
 from django.shortcuts import render
 from django.views.generic import ListView
 from django.views.generic.edit import FormView, UpdateView, DeleteView
-from django.utils.decorators import method_decorator
 
 # local Django
 from administrator.models import Administrator
+from administrator.utils import AdministratorLoginRequiredMixin
 from organization.forms import OrganizationForm
 from organization.models import Organization
-from organization.services import get_organization_by_id, ObjectDoesNotExist
+from organization.services import get_organization_by_id
 from volunteer.models import Volunteer
-
-
-class AdministratorLoginRequiredMixin(object):
-    @method_decorator(login_required)
-    def dispatch(self, request, *args, **kwargs):
-        user = request.user
-        admin = None
-        try:
-            admin = user.administrator
-        except ObjectDoesNotExist:
-            pass
-        if not admin:
-            return render(request, 'vms/no_admin_rights.html')
-        else:
-            return super(AdministratorLoginRequiredMixin, self).dispatch(
-                request, *args, **kwargs)
+from vms.pagination import paginate_request
 
 
 class OrganizationCreateView(LoginRequiredMixin,
@@ -89,6 +73,23 @@ class OrganizationListView(LoginRequiredMixin, ListView):
         organizations = Organization.objects.order_by('name')
         return organizations
 
+    def get_context_data(self, **kwargs):
+        """
+        splits the organizations into a page of pending and a page of
+        approved ones, each with its own cursor
+
+        :return: pending_organization_list and organization_list pages
+        """
+        context = super(OrganizationListView, self).get_context_data(**kwargs)
+        organizations = self.get_queryset()
+        context['pending_organization_list'] = paginate_request(
+            self.request, organizations.filter(approved_status=0),
+            ('name', 'id'), cursor_param='pending_cursor')
+        context['organization_list'] = paginate_request(
+            self.request, organizations.filter(approved_status=1),
+            ('name', 'id'))
+        return context
+
 
 def approve(request, organization_id):
     """
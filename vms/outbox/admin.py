@@ -0,0 +1,14 @@
+# Django
+from django.contrib import admin
+
+# local Django
+from outbox.models import OutgoingMail
+
+
+class OutgoingMailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'recipients', 'status', 'attempts',
+                    'created_at', 'sent_at')
+    list_filter = ('status', )
+
+
+admin.site.register(OutgoingMail, OutgoingMailAdmin)
@@ -0,0 +1,67 @@
+# standard library
+import time
+
+# Django
+from django.core.management.base import BaseCommand, CommandError
+
+# local Django
+from outbox.services import deliver_pending_mails, get_outbox_stats
+
+
+class Command(BaseCommand):
+    help = 'Sends the mails queued in the outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=4, dest='workers',
+            help='Number of threads sending mails in parallel')
+        parser.add_argument(
+            '--batch-size', type=int, default=100, dest='batch_size',
+            help='Number of mails claimed per round')
+        parser.add_argument(
+            '--loop', action='store_true', dest='loop',
+            help='Keep polling the outbox instead of exiting once it is empty')
+        parser.add_argument(
+            '--interval', type=float, default=5, dest='interval',
+            help='Seconds to wait between polls when the outbox is empty')
+        parser.add_argument(
+            '--stats', action='store_true', dest='stats',
+            help='Only print the queue depth and delivery latency')
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1:
+            raise CommandError('Workers should be at least 1')
+        if options['batch_size'] < 1:
+            raise CommandError('Batch size should be at least 1')
+
+        if not options['stats']:
+            while True:
+                start = time.time()
+                sent, failed = deliver_pending_mails(
+                    options['batch_size'], options['workers'])
+                if sent or failed:
+                    elapsed = time.time() - start
+                    rate = sent / elapsed if elapsed else 0
+                    self.stdout.write(
+                        'Sent {0} mails, {1} failed in {2:.2f}s '
+                        '({3:.1f} mails/s)'.format(sent, failed, elapsed, rate))
+                elif not options['loop']:
+                    break
+                else:
+                    time.sleep(options['interval'])
+        self.write_stats()
+
+    def write_stats(self):
+        stats = get_outbox_stats()
+        self.stdout.write(
+            'Queue depth: {0}, failed: {1}, oldest queued: {2}, '
+            'average latency: {3}'.format(
+                stats['queue_depth'], stats['failed'],
+                self.format_seconds(stats['oldest_queued_age']),
+                self.format_seconds(stats['average_latency'])))
+
+    @staticmethod
+    def format_seconds(seconds):
+        if seconds is None:
+            return '-'
+        return '{0:.1f}s'.format(seconds)
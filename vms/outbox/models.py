@@ -0,0 +1,45 @@
+# Django
+from django.db import models
+from django.utils import timezone
+
+
+class OutgoingMail(models.Model):
+    PENDING = 0
+    SENDING = 1
+    SENT = 2
+    FAILED = 3
+    STATUS_CHOICES = ((PENDING, "Pending"),
+                      (SENDING, "Sending"),
+                      (SENT, "Sent"),
+                      (FAILED, "Failed"),)
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    from_email = models.CharField(max_length=254)
+    # recipients are stored as a comma separated list of addresses
+    recipients = models.TextField()
+    attachment = models.FileField(upload_to='outbox/', max_length=255, blank=True)
+    attachment_name = models.CharField(max_length=100, blank=True)
+    attachment_mimetype = models.CharField(max_length=100, blank=True)
+    # dotted path of a function the worker calls with the JSON list of
+    # arguments to make the attachment, for files too slow to render in
+    # the request
+    attachment_renderer = models.CharField(max_length=255, blank=True)
+    attachment_arguments = models.TextField(blank=True)
+    status = models.IntegerField(choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.IntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    # a pending mail is due once this time has passed, a mail that is
+    # being sent can be claimed again once its lease runs out
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['status', 'next_attempt_at'])]
+
+    def get_recipient_list(self):
+        return [email for email in self.recipients.split(',') if email]
+
+    def __str__(self):
+        return '{0} - {1}'.format(self.subject, self.recipients)
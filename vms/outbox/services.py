@@ -0,0 +1,229 @@
+# standard library
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+# Django
+from django.core.files.base import ContentFile
+from django.core.mail import EmailMessage, get_connection
+from django.db import connections, transaction
+from django.db.models import Count, Min
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+# local Django
+from outbox.models import OutgoingMail
+
+# a mail that still fails after this many attempts is marked as failed
+MAX_ATTEMPTS = 5
+# delay before the first retry, doubled after every failed attempt
+RETRY_DELAY = timedelta(minutes=1)
+# time a worker may hold a claimed mail before another worker can take it
+CLAIM_LEASE = timedelta(minutes=10)
+
+
+def enqueue_mail(subject, body, from_email, recipient_list, attachment=None,
+                 attachment_renderer=None):
+    """
+    Stores a mail in the outbox so that it is sent by the deliver_outbox
+    command instead of during the request
+
+    :param recipient_list: List of email addresses
+    :param attachment: Optional tuple of (filename, content, mimetype)
+    :param attachment_renderer: Optional tuple of (dotted path, arguments)
+                                of a function returning the attachment
+                                tuple, called by the worker before the
+                                mail is sent
+    :return: The queued OutgoingMail
+    """
+    mail = OutgoingMail(
+        subject=subject,
+        body=body,
+        from_email=from_email,
+        recipients=','.join(recipient_list))
+    if attachment:
+        save_attachment(mail, attachment)
+    elif attachment_renderer:
+        path, arguments = attachment_renderer
+        mail.attachment_renderer = path
+        mail.attachment_arguments = json.dumps(list(arguments))
+    mail.save()
+    return mail
+
+
+def save_attachment(mail, attachment):
+    filename, content, mimetype = attachment
+    mail.attachment.save(filename, ContentFile(content), save=False)
+    mail.attachment_name = filename
+    mail.attachment_mimetype = mimetype
+
+
+def render_attachment(mail):
+    """
+    Makes the attachment of a mail queued with a renderer and stores it, so
+    that a retry sends the same file
+    """
+    renderer = import_string(mail.attachment_renderer)
+    save_attachment(
+        mail, renderer(*json.loads(mail.attachment_arguments)))
+    OutgoingMail.objects.filter(pk=mail.pk).update(
+        attachment=mail.attachment.name,
+        attachment_name=mail.attachment_name,
+        attachment_mimetype=mail.attachment_mimetype)
+
+
+def get_retry_delay(attempts):
+    """
+    Exponential backoff for a mail that failed the given number of times
+    """
+    return RETRY_DELAY * (2 ** (attempts - 1))
+
+
+def claim_mails(batch_size=100, now=None):
+    """
+    Marks up to batch_size due mails as being sent and returns them. Rows
+    locked by another worker are skipped on databases that support it.
+
+    :return: List of claimed OutgoingMail objects
+    """
+    if now is None:
+        now = timezone.now()
+    with transaction.atomic():
+        due_mails = OutgoingMail.objects.select_for_update(
+            skip_locked=True).filter(
+                status__in=[OutgoingMail.PENDING, OutgoingMail.SENDING],
+                next_attempt_at__lte=now)
+        mail_list = list(
+            due_mails.order_by('next_attempt_at', 'id')[:batch_size])
+        OutgoingMail.objects.filter(
+            id__in=[mail.id for mail in mail_list]).update(
+                status=OutgoingMail.SENDING,
+                next_attempt_at=now + CLAIM_LEASE)
+    return mail_list
+
+
+def build_message(mail, connection=None):
+    message = EmailMessage(
+        mail.subject, mail.body, mail.from_email,
+        mail.get_recipient_list(), connection=connection)
+    if mail.attachment:
+        with mail.attachment.open('rb') as attachment:
+            message.attach(mail.attachment_name, attachment.read(),
+                           mail.attachment_mimetype or None)
+    return message
+
+
+def deliver_mail(mail, connection):
+    """
+    Sends one claimed mail over an open connection, rendering its
+    attachment first if it was queued with a renderer, and records the
+    outcome
+
+    :return: True if the mail was sent, False otherwise
+    """
+    attempts = mail.attempts + 1
+    try:
+        if mail.attachment_renderer and not mail.attachment:
+            render_attachment(mail)
+        build_message(mail, connection).send()
+    except Exception as error:
+        now = timezone.now()
+        if attempts >= MAX_ATTEMPTS:
+            status = OutgoingMail.FAILED
+        else:
+            status = OutgoingMail.PENDING
+        OutgoingMail.objects.filter(pk=mail.pk).update(
+            status=status,
+            attempts=attempts,
+            last_error=repr(error),
+            next_attempt_at=now + get_retry_delay(attempts))
+        return False
+
+    if mail.attachment:
+        mail.attachment.delete(save=False)
+    OutgoingMail.objects.filter(pk=mail.pk).update(
+        status=OutgoingMail.SENT,
+        attempts=attempts,
+        last_error='',
+        attachment='',
+        sent_at=timezone.now())
+    return True
+
+
+def deliver_batch(mail_list):
+    """
+    Sends the mails over a single SMTP connection
+
+    :return: Number of mails that were sent
+    """
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception:
+        # every mail retries the connection and records its own error
+        pass
+    try:
+        return sum(deliver_mail(mail, connection) for mail in mail_list)
+    finally:
+        connection.close()
+
+
+def deliver_batch_in_thread(mail_list):
+    try:
+        return deliver_batch(mail_list)
+    finally:
+        connections.close_all()
+
+
+def deliver_pending_mails(batch_size=100, workers=4):
+    """
+    Claims the due mails and sends them from a pool of worker threads,
+    each of which reuses one connection for its share of the mails
+
+    :return: Tuple of (sent, failed) mail counts
+    """
+    mail_list = claim_mails(batch_size)
+    if not mail_list:
+        return 0, 0
+    workers = max(1, min(workers, len(mail_list)))
+    if workers == 1:
+        sent = deliver_batch(mail_list)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            sent = sum(executor.map(
+                deliver_batch_in_thread,
+                [mail_list[i::workers] for i in range(workers)]))
+    return sent, len(mail_list) - sent
+
+
+def get_outbox_stats(now=None, latency_sample=100):
+    """
+    Queue depth and delivery latency of the outbox
+
+    :return: Dictionary with the number of queued and failed mails, the age
+             of the oldest queued mail and the average delivery latency of
+             the latest sent mails, both in seconds
+    """
+    if now is None:
+        now = timezone.now()
+    queue = OutgoingMail.objects.filter(
+        status__in=[OutgoingMail.PENDING, OutgoingMail.SENDING]).aggregate(
+            depth=Count('id'), oldest=Min('created_at'))
+    failed = OutgoingMail.objects.filter(status=OutgoingMail.FAILED).count()
+    latency_list = [
+        (sent_at - created_at).total_seconds()
+        for created_at, sent_at in OutgoingMail.objects.filter(
+            status=OutgoingMail.SENT).order_by('-sent_at').values_list(
+                'created_at', 'sent_at')[:latency_sample]
+    ]
+    stats = {
+        'queue_depth': queue['depth'],
+        'failed': failed,
+        'oldest_queued_age': None,
+        'average_latency': None,
+    }
+    if queue['oldest']:
+        stats['oldest_queued_age'] = (now - queue['oldest']).total_seconds()
+    if latency_list:
+        stats['average_latency'] = sum(latency_list) / len(latency_list)
+    return stats
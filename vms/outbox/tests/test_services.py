@@ -0,0 +1,178 @@
+# standard library
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+# Django
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+# local Django
+from outbox.models import OutgoingMail
+from outbox.services import (MAX_ATTEMPTS, claim_mails, deliver_pending_mails,
+                             enqueue_mail, get_outbox_stats)
+
+
+def render_test_attachment(name):
+    return '{0}.pdf'.format(name), b'%PDF', 'application/pdf'
+
+
+class OutboxServicesTest(TestCase):
+    """
+    Tests the queueing and the delivery of the mails in the outbox
+    """
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        self.settings_override.enable()
+        mail.outbox = []
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media_root)
+
+    def test_enqueue_mail(self):
+        queued = enqueue_mail(
+            "Shift Assigned", "message", "messanger@localhost.com",
+            ["yoshi@test.com", "mario@test.com"],
+            attachment=('file.pdf', b'%PDF', 'application/pdf'))
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(queued.status, OutgoingMail.PENDING)
+        self.assertEqual(queued.get_recipient_list(),
+                         ["yoshi@test.com", "mario@test.com"])
+        with queued.attachment.open('rb') as attachment:
+            self.assertEqual(attachment.read(), b'%PDF')
+
+    def test_deliver_pending_mails(self):
+        enqueue_mail("Shift Assigned", "message", "messanger@localhost.com",
+                     ["yoshi@test.com"])
+        enqueue_mail("Report Approved", "message", "messanger@localhost.com",
+                     ["mario@test.com"],
+                     attachment=('file.pdf', b'%PDF', 'application/pdf'))
+
+        with mock.patch('outbox.services.get_connection',
+                        wraps=mail.get_connection) as get_connection:
+            self.assertEqual(deliver_pending_mails(workers=1), (2, 0))
+        # both mails were sent over the same connection
+        get_connection.assert_called_once_with()
+
+        self.assertEqual(len(mail.outbox), 2)
+        approved = [msg for msg in mail.outbox
+                    if msg.subject == "Report Approved"][0]
+        self.assertEqual(approved.to, ["mario@test.com"])
+        self.assertEqual(approved.attachments,
+                         [('file.pdf', b'%PDF', 'application/pdf')])
+        self.assertEqual(
+            OutgoingMail.objects.filter(status=OutgoingMail.SENT).count(), 2)
+        self.assertFalse(
+            OutgoingMail.objects.filter(sent_at__isnull=True).exists())
+
+        # sent mails are not delivered again
+        self.assertEqual(deliver_pending_mails(workers=1), (0, 0))
+        self.assertEqual(len(mail.outbox), 2)
+
+    def test_failed_delivery_is_retried_with_backoff(self):
+        queued = enqueue_mail("Shift Cancelled", "message",
+                              "messanger@localhost.com", ["yoshi@test.com"])
+
+        with mock.patch('outbox.services.EmailMessage.send',
+                        side_effect=OSError('connection refused')):
+            self.assertEqual(deliver_pending_mails(workers=1), (0, 1))
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, OutgoingMail.PENDING)
+        self.assertEqual(queued.attempts, 1)
+        self.assertIn('connection refused', queued.last_error)
+        self.assertGreater(queued.next_attempt_at, timezone.now())
+
+        # the mail is not due again until its backoff has passed
+        self.assertEqual(deliver_pending_mails(workers=1), (0, 0))
+
+        OutgoingMail.objects.filter(pk=queued.pk).update(
+            attempts=MAX_ATTEMPTS - 1, next_attempt_at=timezone.now())
+        with mock.patch('outbox.services.EmailMessage.send',
+                        side_effect=OSError('connection refused')):
+            self.assertEqual(deliver_pending_mails(workers=1), (0, 1))
+        queued.refresh_from_db()
+        self.assertEqual(queued.status, OutgoingMail.FAILED)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_rendered_attachment(self):
+        queued = enqueue_mail(
+            "Report Approved", "message", "messanger@localhost.com",
+            ["mario@test.com"], attachment_renderer=(
+                'outbox.tests.test_services.render_test_attachment',
+                ['report']))
+        self.assertFalse(queued.attachment)
+
+        # the rendered file is kept for the retry
+        with mock.patch('outbox.services.EmailMessage.send',
+                        side_effect=OSError('connection refused')):
+            self.assertEqual(deliver_pending_mails(workers=1), (0, 1))
+        queued.refresh_from_db()
+        self.assertEqual(queued.attachment_name, 'report.pdf')
+
+        OutgoingMail.objects.filter(pk=queued.pk).update(
+            next_attempt_at=timezone.now())
+        with mock.patch('outbox.tests.test_services.render_test_attachment',
+                        side_effect=AssertionError) as renderer:
+            self.assertEqual(deliver_pending_mails(workers=1), (1, 0))
+        renderer.assert_not_called()
+        self.assertEqual(mail.outbox[0].attachments,
+                         [('report.pdf', b'%PDF', 'application/pdf')])
+
+    def test_claim_mails(self):
+        first = enqueue_mail("First", "message", "messanger@localhost.com",
+                             ["yoshi@test.com"])
+        second = enqueue_mail("Second", "message", "messanger@localhost.com",
+                              ["yoshi@test.com"])
+
+        self.assertEqual(claim_mails(batch_size=1), [first])
+        first.refresh_from_db()
+        self.assertEqual(first.status, OutgoingMail.SENDING)
+
+        # a claimed mail is left alone until its lease runs out
+        self.assertEqual(claim_mails(), [second])
+        self.assertEqual(claim_mails(), [])
+        self.assertEqual(
+            claim_mails(now=timezone.now() + timedelta(hours=1)),
+            [first, second])
+
+    def test_get_outbox_stats(self):
+        now = timezone.now()
+        stats = get_outbox_stats(now)
+        self.assertEqual(stats['queue_depth'], 0)
+        self.assertIsNone(stats['oldest_queued_age'])
+        self.assertIsNone(stats['average_latency'])
+
+        OutgoingMail.objects.create(
+            subject="Queued", body="message", recipients="yoshi@test.com",
+            created_at=now - timedelta(seconds=30))
+        OutgoingMail.objects.create(
+            subject="Sent", body="message", recipients="yoshi@test.com",
+            status=OutgoingMail.SENT, created_at=now - timedelta(seconds=20),
+            sent_at=now - timedelta(seconds=10))
+        OutgoingMail.objects.create(
+            subject="Failed", body="message", recipients="yoshi@test.com",
+            status=OutgoingMail.FAILED)
+
+        stats = get_outbox_stats(now)
+        self.assertEqual(stats['queue_depth'], 1)
+        self.assertEqual(stats['failed'], 1)
+        self.assertEqual(stats['oldest_queued_age'], 30)
+        self.assertEqual(stats['average_latency'], 10)
+
+    def test_deliver_outbox_command(self):
+        enqueue_mail("Shift Assigned", "message", "messanger@localhost.com",
+                     ["yoshi@test.com"])
+        out = StringIO()
+        call_command('deliver_outbox', workers=1, stdout=out)
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertIn('Sent 1 mails, 0 failed', out.getvalue())
+        self.assertIn('Queue depth: 0, failed: 0', out.getvalue())
@@ -4,7 +4,7 @@ class VolunteerProfilePageLocators(object):
     PROFILE_LAST_NAME = '//input[@name = "last_name"]'
     PROFILE_EMAIL = '//input[@name = "email"]'
     PROFILE_ADDRESS = '//input[@name = "address"]'
-    PROFILE_CITY = '//select[@name = "city"]'
+    PROFILE_CITY = '//input[@name = "city"]'
     PROFILE_STATE = '//select[@name = "state"]'
     PROFILE_COUNTRY = '//select[@name = "country"]'
     PROFILE_PHONE = '//input[@name = "phone_number"]'
@@ -30,7 +30,7 @@ class VolunteerProfilePage(BasePage):
             new_details['country']
         )
         self.send_value_to_xpath(elements.PROFILE_STATE, new_details['state'])
-        self.send_value_to_xpath(elements.PROFILE_CITY, new_details['city'])
+        self.fill_field(elements.PROFILE_CITY, new_details['city'])
         self.fill_field(elements.PROFILE_PHONE, new_details['phone_number'])
         self.element_by_xpath(self.elements.SELECT_NONE_ORGANIZATION).click()
         self.fill_field(
@@ -1,3 +1,6 @@
+# standard library
+from functools import lru_cache
+
 # third party
 import phonenumbers
 
@@ -12,3 +15,18 @@ def validate_phone(my_country, my_phone):
     parsed_number = phonenumbers.parse(my_phone, country_code)
     return (phonenumbers.is_valid_number(parsed_number) and
             phonenumbers.is_possible_number(parsed_number))
+
+
+@lru_cache(maxsize=10000)
+def is_valid_phone(country_code, phone):
+    """
+    The check of validate_phone from the country code, remembered for
+    repeated numbers, e.g. the shared office number of an organization in
+    a bulk import. A number that cannot be parsed is not valid.
+    """
+    try:
+        parsed_number = phonenumbers.parse(phone, country_code)
+    except phonenumbers.NumberParseException:
+        return False
+    return (phonenumbers.is_valid_number(parsed_number) and
+            phonenumbers.is_possible_number(parsed_number))
@@ -3,8 +3,8 @@ from django.conf.urls import url
 
 # local Django
 from registration.views import (activate, AdministratorSignupView,
-                                VolunteerSignupView, load_cities,
-                                load_states, check_states)
+                                VolunteerSignupView, autocomplete_cities,
+                                load_cities, load_states, check_states)
 app_name = 'registration'
 
 urlpatterns = [
@@ -21,6 +21,8 @@ urlpatterns = [
         name='activate'),
     url(r'^check_states/$', check_states, name='check_states'),
     url(r'^load_cities/$', load_cities, name='load_cities'),
+    url(r'^autocomplete_cities/$', autocomplete_cities,
+        name='autocomplete_cities'),
     url(r'^load_states/$', load_states, name='load_states'),
 ]
 
@@ -4,12 +4,15 @@ from functools import wraps
 # Django
 from django.shortcuts import render
 
+# local Django
+from vms.roles import get_role
+
 
 def volunteer_denied(func):
     @wraps(func)
     def wrapper(request, *args, **kwargs):
         if request.user.is_authenticated:
-            if not hasattr(request.user, 'administrator'):
+            if get_role(request).administrator is None:
                 return render(request, 'vms/no_admin_rights.html', status=403)
         return func(request, *args, **kwargs)
 
@@ -3,7 +3,6 @@
 # Django
 from django.contrib.auth.models import User
 from django.contrib.sites.shortcuts import get_current_site
-from django.core.exceptions import ObjectDoesNotExist
 from django.core.mail import EmailMessage
 from django.http import JsonResponse
 from django.http import HttpResponseBadRequest
@@ -12,11 +11,12 @@ from django.template.loader import render_to_string
 from django.utils.encoding import force_bytes, force_text
 from django.utils.decorators import method_decorator
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import etag
 from django.views.generic import TemplateView
 
 # local Django
 from administrator.forms import AdministratorForm
-from cities_light.models import City, Region, Country
 from organization.models import Organization
 from organization.services import (create_organization,
                                    get_organizations_ordered_by_name,
@@ -27,6 +27,8 @@ from registration.utils import volunteer_denied, match_password
 from registration.tokens import account_activation_token
 from volunteer.forms import VolunteerForm
 from volunteer.validation import validate_file
+from vms.locations import (CITY_SUGGESTION_LIMIT, get_location_index,
+                           resolve_posted_location)
 
 
 class AdministratorSignupView(TemplateView):
@@ -40,10 +42,13 @@ class AdministratorSignupView(TemplateView):
     admin user, he/she is allowed to register others as an admin user.
     """
     registered = False
-    country_list = Country.objects.all()
     phone_error = False
     match_error = False
 
+    @property
+    def country_list(self):
+        return get_location_index().country_list
+
     @method_decorator(volunteer_denied)
     def dispatch(self, *args, **kwargs):
         return super(AdministratorSignupView, self).dispatch(*args, **kwargs)
@@ -65,7 +70,7 @@ class AdministratorSignupView(TemplateView):
 
     def post(self, request):
         organization_list = get_organizations_ordered_by_name()
-        country_list = Country.objects.all()
+        country_list = self.country_list
 
         if request.method == 'POST':
             user_form = UserForm(request.POST, prefix="usr")
@@ -88,23 +93,8 @@ class AdministratorSignupView(TemplateView):
                             'organization_list': organization_list,
                             'country_list': self.country_list,
                         })
-                try:
-                    admin_country_name = request.POST.get('country')
-                    admin_country = Country.objects.get(name=admin_country_name)
-                except ObjectDoesNotExist:
-                    admin_country = None
-
-                try:
-                    admin_state_name = request.POST.get('state')
-                    admin_state = Region.objects.get(name=admin_state_name)
-                except ObjectDoesNotExist:
-                    admin_state = None
-
-                try:
-                    admin_city_name = request.POST.get('city')
-                    admin_city = City.objects.get(name=admin_city_name)
-                except ObjectDoesNotExist:
-                    admin_city = None
+                admin_country, admin_state, admin_city = resolve_posted_location(
+                    request.POST)
 
                 admin_phone = request.POST.get('admin-phone_number')
                 if (admin_country and admin_phone):
@@ -176,10 +166,13 @@ class AdministratorSignupView(TemplateView):
 
 class VolunteerSignupView(TemplateView):
     registered = False
-    country_list = Country.objects.all()
     phone_error = False
     match_error = False
 
+    @property
+    def country_list(self):
+        return get_location_index().country_list
+
     def get(self, request):
         organization_list = get_organizations_ordered_by_name()
         user_form = UserForm(prefix="usr")
@@ -197,7 +190,7 @@ class VolunteerSignupView(TemplateView):
 
     def post(self, request):
         organization_list = get_organizations_ordered_by_name()
-        country_list = Country.objects.all()
+        country_list = self.country_list
 
         if request.method == 'POST':
             user_form = UserForm(request.POST, prefix="usr")
@@ -218,23 +211,8 @@ class VolunteerSignupView(TemplateView):
                             'match_error': self.match_error,
                             'organization_list': organization_list,
                         })
-                try:
-                    vol_country_name = request.POST.get('country')
-                    vol_country = Country.objects.get(name=vol_country_name)
-                except ObjectDoesNotExist:
-                    vol_country = None
-
-                try:
-                    vol_state_name = request.POST.get('state')
-                    vol_state = Region.objects.get(name=vol_state_name)
-                except ObjectDoesNotExist:
-                    vol_state = None
-
-                try:
-                    vol_city_name = request.POST.get('city')
-                    vol_city = City.objects.get(name=vol_city_name)
-                except ObjectDoesNotExist:
-                    vol_city = None
+                vol_country, vol_state, vol_city = resolve_posted_location(
+                    request.POST)
 
                 vol_phone = request.POST.get('vol-phone_number')
                 if (vol_country and vol_phone):
@@ -339,25 +317,58 @@ def activate(request, uidb64, token):
         return HttpResponseBadRequest('Activation link is invalid!')
 
 
+# seconds for which browsers may reuse the location dropdown responses
+# before checking them again with the etag
+LOCATION_MAX_AGE = 60 * 60
+
+# most cities a single autocomplete request can ask for
+MAX_CITY_SUGGESTIONS = 50
+
+
+def get_location_etag(request):
+    return get_location_index().etag
+
+
+def get_location_params(request):
+    """
+    :return: Tuple of the location index and the ids of the country and
+             state in the request, the state id None for all states
+    """
+    index = get_location_index()
+    country_id = index.get_country_id(request.GET.get('country'))
+    state = request.GET.get('state')
+    state_id = None
+    if state and state != '0':
+        # an unknown state has no cities rather than those of all states
+        state_id = index.get_state_id(country_id, state) or -1
+    return index, country_id, state_id
+
+
+@cache_control(max_age=LOCATION_MAX_AGE)
+@etag(get_location_etag)
 def check_states(request):
     """
     Check if states exist in a country
 
     :return: 1 if states exist, otherwise 0
     """
-    country_name = request.GET.get('country')
-    statecheck = Region.objects.filter(country__name=country_name).exists()
+    index = get_location_index()
+    country_id = index.get_country_id(request.GET.get('country'))
+    statecheck = bool(index.get_states(country_id))
     return JsonResponse(statecheck, safe=False)
 
 
+@cache_control(max_age=LOCATION_MAX_AGE)
+@etag(get_location_etag)
 def load_states(request):
     """
     Renders the options of states dropdown list
 
     :return: states belonging to the selected country
     """
-    country_name = request.GET.get('country')
-    states = Region.objects.filter(country__name=country_name).order_by('name')
+    index = get_location_index()
+    country_id = index.get_country_id(request.GET.get('country'))
+    states = index.get_states(country_id)
     return render(
         request,
         'registration/state_dropdown_list_options.html',
@@ -365,26 +376,44 @@ def load_states(request):
     )
 
 
+@cache_control(max_age=LOCATION_MAX_AGE)
+@etag(get_location_etag)
 def load_cities(request):
     """
     Renders the options of cities dropdown
 
     :return: cities belonging to the selected country and state
     """
-    country_name = request.GET.get('country')
-    state_name = request.GET.get('state')
-    if state_name is '0':
-        cities = City.objects.filter(
-            country__name=country_name
-        ).order_by('name')
-    else:
-        cities = City.objects.filter(
-            country__name=country_name,
-            region__name=state_name
-        ).order_by('name')
+    index, country_id, state_id = get_location_params(request)
+    cities = index.get_cities(country_id, state_id)
     return render(
         request,
         'registration/city_dropdown_list_options.html',
         {'cities': cities}
     )
 
+
+@cache_control(max_age=LOCATION_MAX_AGE)
+@etag(get_location_etag)
+def autocomplete_cities(request):
+    """
+    Suggests the cities of the selected country and state whose name starts
+    with the typed text
+
+    :return: JSON with a list of cities, each with id, name and state
+    """
+    index, country_id, state_id = get_location_params(request)
+    try:
+        limit = min(int(request.GET.get('limit', CITY_SUGGESTION_LIMIT)),
+                    MAX_CITY_SUGGESTIONS)
+    except ValueError:
+        limit = CITY_SUGGESTION_LIMIT
+    suggestion_list = index.suggest_cities(
+        request.GET.get('q', ''), country_id, state_id, limit)
+    return JsonResponse({
+        'cities': [{
+            'id': city.id,
+            'name': city.name,
+            'state': state
+        } for city, state in suggestion_list]
+    })
@@ -2,7 +2,8 @@
 from django.contrib import admin
 
 # local Django
-from shift.models import Shift, VolunteerShift, EditRequest, Report
+from shift.models import (Shift, VolunteerShift, EditRequest, Report,
+                          ReportLine)
 
 
 class ShiftAdmin(admin.ModelAdmin):
@@ -32,3 +33,12 @@ class ReportAdmin(admin.ModelAdmin):
 
 admin.site.register(Report, ReportAdmin)
 
+
+class ReportLineAdmin(admin.ModelAdmin):
+    list_display = ('report', 'first_name', 'last_name', 'event_name',
+                    'job_name', 'date', 'duration')
+    # the change form would otherwise list every report and volunteer shift
+    raw_id_fields = ('report', 'volunteer_shift')
+
+
+admin.site.register(ReportLine, ReportLineAdmin)
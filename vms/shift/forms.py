@@ -5,6 +5,7 @@ from django.forms import ModelForm
 
 # local Django
 from shift.models import Shift, EditRequest
+from shift.services import MAX_RECURRING_SHIFTS, get_recurring_dates
 
 
 class HoursForm(forms.Form):
@@ -35,6 +36,84 @@ class ShiftForm(ModelForm):
         return self.cleaned_data
 
 
+class RecurringShiftForm(forms.Form):
+    """
+    Shifts on the chosen weekdays of a date range, one per time block and
+    day, e.g. "09:00-12:00, 13:00-17:00"
+    """
+    WEEKDAY_CHOICES = [
+        (0, 'Monday'), (1, 'Tuesday'), (2, 'Wednesday'), (3, 'Thursday'),
+        (4, 'Friday'), (5, 'Saturday'), (6, 'Sunday')
+    ]
+
+    start_date = forms.DateField()
+    end_date = forms.DateField()
+    weekdays = forms.TypedMultipleChoiceField(
+        choices=WEEKDAY_CHOICES, coerce=int,
+        widget=forms.CheckboxSelectMultiple)
+    time_blocks = forms.CharField(max_length=500)
+    max_volunteers = forms.IntegerField(min_value=1, max_value=5000)
+    address = forms.RegexField(
+        regex=r'^[(A-Z)|(a-z)|(0-9)|(\s)|(\-)|(\')|(,)]+$', max_length=75,
+        required=False)
+    venue = forms.RegexField(
+        regex=r'^[(A-Z)|(a-z)|(\s)|(\-)|(\')]+$', max_length=30,
+        required=False)
+
+    def __init__(self, job, *args, **kwargs):
+        super(RecurringShiftForm, self).__init__(*args, **kwargs)
+        self.job = job
+
+    def clean_time_blocks(self):
+        time_block_list = []
+        time_field = forms.TimeField()
+        for block in self.cleaned_data['time_blocks'].split(','):
+            start_time, dash, end_time = block.partition('-')
+            if not dash:
+                raise forms.ValidationError(
+                    u"Time blocks should look like 09:00-12:00")
+            start_time = time_field.clean(start_time.strip())
+            end_time = time_field.clean(end_time.strip())
+            # shifts are bound to end on the same date
+            if start_time >= end_time:
+                raise forms.ValidationError(
+                    u"Start time must be before the end time")
+            if (start_time, end_time) not in time_block_list:
+                time_block_list.append((start_time, end_time))
+        return time_block_list
+
+    def clean(self):
+        cleaned_data = super(RecurringShiftForm, self).clean()
+        start_date = cleaned_data.get('start_date')
+        end_date = cleaned_data.get('end_date')
+
+        if start_date and end_date:
+            if start_date > end_date:
+                msg = u"Start date must be before the end date"
+                self._errors['start_date'] = self.error_class([msg])
+            elif (start_date < self.job.start_date or
+                    end_date > self.job.end_date):
+                msg = u"Shift dates should lie within Job dates"
+                self._errors['start_date'] = self.error_class([msg])
+
+        weekday_list = cleaned_data.get('weekdays')
+        time_block_list = cleaned_data.get('time_blocks')
+        if not self._errors and weekday_list and time_block_list:
+            date_list = get_recurring_dates(
+                start_date, end_date, weekday_list)
+            count = len(date_list) * len(time_block_list)
+            if not count:
+                msg = u"No date in the range falls on the chosen weekdays"
+                self._errors['weekdays'] = self.error_class([msg])
+            elif count > MAX_RECURRING_SHIFTS:
+                msg = u"At most {0} shifts can be created at once".format(
+                    MAX_RECURRING_SHIFTS)
+                self._errors['weekdays'] = self.error_class([msg])
+            cleaned_data['dates'] = date_list
+
+        return cleaned_data
+
+
 class EditForm(ModelForm):
     class Meta:
         model = EditRequest
@@ -0,0 +1,79 @@
+# standard library
+import time
+from datetime import date, time as time_of_day, timedelta
+
+# Django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+# local Django
+from event.models import Event
+from job.models import Job
+from shift.models import Shift
+from shift.services import create_recurring_shifts, get_recurring_dates
+
+# time blocks of each benchmark day
+TIME_BLOCK_LIST = [
+    (time_of_day(hour), time_of_day(hour + 1)) for hour in range(8, 18)
+]
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ('Compares creating shifts one at a time, as the shift form does, '
+            'with creating them from a recurring pattern. All rows are '
+            'rolled back.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=1000, dest='days',
+            help='Number of days with {0} shifts each to create each '
+                 'way'.format(len(TIME_BLOCK_LIST)))
+
+    def handle(self, *args, **options):
+        if options['days'] < 1:
+            raise CommandError('Days should be at least 1')
+
+        try:
+            with transaction.atomic():
+                self.run(options['days'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, day_count):
+        start_date = date.today()
+        end_date = start_date + timedelta(days=day_count - 1)
+        event = Event.objects.create(
+            name='Benchmark Event', start_date=start_date, end_date=end_date)
+        job_list = [
+            Job.objects.create(
+                event=event, name='Benchmark Job', start_date=start_date,
+                end_date=end_date) for i in range(2)
+        ]
+        date_list = get_recurring_dates(start_date, end_date, range(7))
+
+        self.stdout.write('{0:>10} {1:>18} {2:>18}'.format(
+            'shifts', 'one by one (ms)', 'recurring (ms)'))
+        start = time.perf_counter()
+        for day in date_list:
+            for start_time, end_time in TIME_BLOCK_LIST:
+                # each form submission saves one shift in its own
+                # transaction
+                with transaction.atomic():
+                    Shift.objects.create(
+                        job=job_list[0], date=day, start_time=start_time,
+                        end_time=end_time, max_volunteers=5,
+                        address=event.address, venue=event.venue)
+        one_by_one = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        count = create_recurring_shifts(
+            job_list[1], date_list, TIME_BLOCK_LIST, 5)
+        recurring = (time.perf_counter() - start) * 1000
+
+        self.stdout.write('{0:>10} {1:>18.2f} {2:>18.2f}'.format(
+            count, one_by_one, recurring))
@@ -0,0 +1,121 @@
+# standard library
+import time
+from datetime import date, timedelta
+from statistics import median
+
+# Django
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+# local Django
+from event.models import Event
+from job.models import Job
+from shift.models import Shift, VolunteerShift
+from shift.services import (get_future_shifts_by_volunteer_id,
+                            get_unlogged_shifts_by_volunteer_id)
+from volunteer.models import Volunteer
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ('Measures the upcoming and unlogged shift queries of a volunteer '
+            'while the shift table grows. All rows are rolled back.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='1000,10000,100000,1000000', dest='sizes',
+            help='Comma separated shift table sizes to measure at')
+        parser.add_argument(
+            '--repeat', type=int, default=5, dest='repeat',
+            help='Number of timed runs per query and size')
+        parser.add_argument(
+            '--batch-size', type=int, default=10000, dest='batch_size',
+            help='Number of shifts inserted per query while seeding')
+
+    def handle(self, *args, **options):
+        try:
+            size_list = sorted(
+                int(size) for size in options['sizes'].split(','))
+        except ValueError:
+            raise CommandError('Sizes should be comma separated numbers')
+        if options['repeat'] < 1 or options['batch_size'] < 1:
+            raise CommandError('Repeat and batch size should be at least 1')
+
+        try:
+            with transaction.atomic():
+                self.run(size_list, options['repeat'], options['batch_size'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, size_list, repeat, batch_size):
+        today = date.today()
+        event = Event.objects.create(
+            name='Benchmark Event', start_date=today - timedelta(days=365),
+            end_date=today + timedelta(days=365))
+        job_list = [
+            Job.objects.create(
+                event=event, name='Benchmark Job', start_date=event.start_date,
+                end_date=event.end_date) for i in range(100)
+        ]
+        volunteer, other = [
+            Volunteer.objects.create(
+                user=User.objects.create_user(username=username),
+                first_name='Benchmark', last_name='Volunteer',
+                address='address', phone_number='9999999999',
+                email='{0}@benchmark.test'.format(username))
+            for username in ('benchmark-volunteer', 'benchmark-other')
+        ]
+
+        self.stdout.write('{0:>10} {1:>14} {2:>14}'.format(
+            'shifts', 'future (ms)', 'unlogged (ms)'))
+        count = Shift.objects.count()
+        for size in size_list:
+            while count < size:
+                number = min(batch_size, size - count)
+                Shift.objects.bulk_create([
+                    Shift(job=job_list[i % len(job_list)],
+                          date=today + timedelta(days=(count + i) % 730 - 365),
+                          start_time='09:00', end_time='15:00',
+                          max_volunteers=5) for i in range(number)
+                ])
+                count += number
+            self.sign_up(volunteer, other, today)
+            self.stdout.write('{0:>10} {1:>14.2f} {2:>14.2f}'.format(
+                size,
+                self.measure(get_future_shifts_by_volunteer_id,
+                             volunteer.id, repeat),
+                self.measure(get_unlogged_shifts_by_volunteer_id,
+                             volunteer.id, repeat)))
+
+    @staticmethod
+    def sign_up(volunteer, other, today):
+        """
+        Keeps the volunteer signed up for a fixed number of shifts around
+        today while another volunteer signs up for every shift of today
+        """
+        VolunteerShift.objects.filter(
+            volunteer__in=[volunteer, other]).delete()
+        shift_id_list = list(Shift.objects.filter(
+            date__gte=today - timedelta(days=10),
+            date__lte=today + timedelta(days=10)).values_list(
+                'id', flat=True)[:40])
+        VolunteerShift.objects.bulk_create(
+            [VolunteerShift(volunteer=volunteer, shift_id=shift_id)
+             for shift_id in shift_id_list] +
+            [VolunteerShift(volunteer=other, shift_id=shift_id)
+             for shift_id in Shift.objects.filter(date=today).values_list(
+                 'id', flat=True)])
+
+    @staticmethod
+    def measure(function, v_id, repeat):
+        timing_list = []
+        for i in range(repeat):
+            start = time.perf_counter()
+            list(function(v_id))
+            timing_list.append((time.perf_counter() - start) * 1000)
+        return median(timing_list)
@@ -0,0 +1,45 @@
+# standard library
+import time
+from datetime import datetime
+
+# Django
+from django.core.management.base import BaseCommand, CommandError
+
+# local Django
+from shift.services import send_reminder
+
+
+class Command(BaseCommand):
+    help = 'Sends the reminder mails of the shifts that are due today'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run', action='store_true', dest='dry_run',
+            help='Render the due reminders without sending them')
+        parser.add_argument(
+            '--batch-size', type=int, default=100, dest='batch_size',
+            help='Number of mails sent per batch')
+        parser.add_argument(
+            '--date', dest='date',
+            help='Send the reminders due on this date (YYYY-MM-DD)')
+
+    def handle(self, *args, **options):
+        today = None
+        if options['date']:
+            try:
+                today = datetime.strptime(options['date'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('Date should be in YYYY-MM-DD format')
+        if options['batch_size'] < 1:
+            raise CommandError('Batch size should be at least 1')
+
+        start = time.time()
+        notifications_number = send_reminder(
+            today, options['batch_size'], options['dry_run'])
+        elapsed = time.time() - start
+        rate = notifications_number / elapsed if elapsed else 0
+
+        verb = 'Rendered' if options['dry_run'] else 'Sent'
+        self.stdout.write(
+            '{0} {1} reminders in {2:.2f}s ({3:.1f} mails/s)'.format(
+                verb, notifications_number, elapsed, rate))
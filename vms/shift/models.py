@@ -44,6 +44,14 @@ class Shift(models.Model):
     # for the many-to-many relationship between Volunteer and Shift
     volunteers = models.ManyToManyField(Volunteer, through='VolunteerShift')
 
+    class Meta:
+        indexes = [
+            # shifts of a job from a given date on
+            models.Index(fields=['job', 'date'], name='shift_job_date_idx'),
+            # upcoming shifts across jobs
+            models.Index(fields=['date'], name='shift_date_idx'),
+        ]
+
     def __str__(self):
         return '{0} - {1}'.format(self.job.name, self.date)
 
@@ -62,6 +70,18 @@ class VolunteerShift(models.Model):
                       (True, "Reported"),)
     report_status = models.BooleanField(choices=STATUS_CHOICES, default=False)
 
+    class Meta:
+        # a volunteer can sign up for a shift only once
+        unique_together = (('volunteer', 'shift'), )
+        indexes = [
+            # logged and unlogged shifts of a volunteer
+            models.Index(fields=['volunteer', 'start_time', 'end_time'],
+                         name='volshift_vol_logged_idx'),
+            # shifts of a volunteer that are not in a report yet
+            models.Index(fields=['volunteer', 'report_status'],
+                         name='volshift_vol_reported_idx'),
+        ]
+
     def __str__(self):
         return '{0} - {1}'.format(self.shift, self.volunteer.first_name)
 
@@ -85,6 +105,42 @@ class Report(models.Model):
     confirm_status = models.IntegerField(default=0)
     date_submitted = models.DateField(default=timezone.now)
     volunteer = models.ForeignKey(Volunteer, on_delete=models.CASCADE)
+    # administrator who approved the report and signs its pdf
+    approved_by = models.ForeignKey(
+        'administrator.Administrator', null=True, blank=True,
+        on_delete=models.SET_NULL)
+
+    class Meta:
+        indexes = [
+            # pending, approved and rejected reports of a volunteer
+            models.Index(fields=['confirm_status', 'volunteer'],
+                         name='report_status_vol_idx'),
+        ]
 
     def get_volunteer_shifts(self):
         return self.volunteer_shifts.all()
+
+
+class ReportLine(models.Model):
+    """
+    Row of a report as it was computed when the report was created, so
+    that showing, approving and exporting a report does not need to join
+    the volunteer shifts again
+    """
+    # Report to ReportLine is a one-to-many relationship
+    report = models.ForeignKey(
+        Report, related_name='lines', on_delete=models.CASCADE)
+    volunteer_shift = models.ForeignKey(
+        VolunteerShift, null=True, blank=True, on_delete=models.SET_NULL)
+    first_name = models.CharField(max_length=30)
+    last_name = models.CharField(max_length=30)
+    organization = models.CharField(max_length=75, null=True, blank=True)
+    event_name = models.CharField(max_length=75)
+    job_name = models.CharField(max_length=75)
+    date = models.DateField()
+    logged_start_time = models.TimeField(null=True, blank=True)
+    logged_end_time = models.TimeField(null=True, blank=True)
+    duration = models.DecimalField(max_digits=6, decimal_places=2)
+
+    def __str__(self):
+        return '{0} - {1}'.format(self.report_id, self.event_name)
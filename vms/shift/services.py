@@ -1,17 +1,20 @@
 # standard library
-from datetime import date, timedelta
+from datetime import timedelta
 
 # Django
 from django.core.exceptions import ObjectDoesNotExist
-from django.core.mail import send_mail
-from django.db.models import Q
+from django.core.mail import get_connection, send_mass_mail
+from django.db import IntegrityError, transaction
+from django.db.models import (Case, Count, DateField, Exists, F, Func,
+                              IntegerField, OuterRef, Q, Sum, Value, When)
+from django.db.models.functions import ExtractHour, ExtractMinute
 from django.utils import timezone
 
 # local Django
-from shift.models import Report
+from shift.models import Report, ReportLine
 from shift.models import Shift, VolunteerShift
 from volunteer.models import Volunteer
-from volunteer.services import get_volunteer_by_id, get_all_volunteers
+from volunteer.services import get_volunteer_by_id
 
 
 def add_shift_hours(v_id, s_id, start_time, end_time):
@@ -47,6 +50,112 @@ def calculate_total_report_hours(report_list):
     return total_hours
 
 
+def get_logged_minutes():
+    """
+    Expression for the minutes between the logged start and end time of a
+    volunteer shift, computed like calculate_duration: seconds are ignored
+    and an end time before the start time is taken to be on the next day
+    """
+    minutes = (
+        ExtractHour('end_time') * 60 + ExtractMinute('end_time') -
+        ExtractHour('start_time') * 60 - ExtractMinute('start_time'))
+    return Case(
+        When(end_time__lt=F('start_time'), then=minutes + 24 * 60),
+        default=minutes,
+        output_field=IntegerField())
+
+
+def minutes_to_hours(minutes):
+    return round(float(minutes or 0) / 60, 2)
+
+
+def get_logged_volunteer_shifts(**filters):
+    """
+    Volunteer shifts with logged hours, each annotated with its duration
+    in minutes as logged_minutes
+
+    :param filters: Lookups applied to the volunteer shifts, e.g.
+                    volunteer_id, shift__job__event_id or report
+    """
+    return VolunteerShift.objects.filter(
+        start_time__isnull=False, end_time__isnull=False,
+        **filters).annotate(logged_minutes=get_logged_minutes())
+
+
+def get_total_hours(**filters):
+    """
+    Sums the logged hours of the matching volunteer shifts in one query.
+    Totals are rounded once, from the logged minutes, not from the rounded
+    hours of each shift.
+
+    :param filters: Lookups applied to the volunteer shifts, e.g.
+                    report=report_id for the hours of a report
+    :return: Total hours rounded to two decimals
+    """
+    total = VolunteerShift.objects.filter(
+        start_time__isnull=False, end_time__isnull=False,
+        **filters).aggregate(minutes=Sum(get_logged_minutes()))
+    return minutes_to_hours(total['minutes'])
+
+
+def get_total_hours_by(group_by, **filters):
+    """
+    Sums the logged hours of the matching volunteer shifts per value of
+    group_by in one query
+
+    :param group_by: Field to group on, e.g. volunteer_id,
+                     shift__job__event_id or volunteer__organization_id
+    :return: Dictionary mapping each value of group_by to its total hours
+    """
+    total_list = VolunteerShift.objects.filter(
+        start_time__isnull=False, end_time__isnull=False,
+        **filters).values(group_by).annotate(
+            minutes=Sum(get_logged_minutes())).order_by(group_by)
+    return {
+        total[group_by]: minutes_to_hours(total['minutes'])
+        for total in total_list
+    }
+
+
+# columns of an hours export, read with values_list
+LOGGED_HOURS_FIELDS = ('volunteer__first_name', 'volunteer__last_name',
+                       'volunteer__email', 'volunteer__organization__name',
+                       'shift__job__event__name', 'shift__job__name',
+                       'shift__date', 'start_time', 'end_time',
+                       'logged_minutes')
+
+# rows fetched from the database cursor at a time while exporting
+LOGGED_HOURS_CHUNK_SIZE = 2000
+
+
+def get_logged_hours_rows(event_id=None, job_id=None, organization_id=None,
+                          start_date=None, end_date=None,
+                          chunk_size=LOGGED_HOURS_CHUNK_SIZE):
+    """
+    Streams the logged hours matching all given filters, oldest shift
+    first, without keeping the rows in memory. A server-side cursor is
+    used on Postgres.
+
+    :param start_date: First shift date included, or None
+    :param end_date: Last shift date included, or None
+    :return: Iterator of tuples with the LOGGED_HOURS_FIELDS values
+    """
+    filters = {}
+    if event_id:
+        filters['shift__job__event_id'] = event_id
+    if job_id:
+        filters['shift__job_id'] = job_id
+    if organization_id:
+        filters['volunteer__organization_id'] = organization_id
+    if start_date:
+        filters['shift__date__gte'] = start_date
+    if end_date:
+        filters['shift__date__lte'] = end_date
+    return get_logged_volunteer_shifts(**filters).order_by(
+        'shift__date', 'start_time', 'id').values_list(
+            *LOGGED_HOURS_FIELDS).iterator(chunk_size=chunk_size)
+
+
 def cancel_shift_registration(v_id, s_id):
 
     if s_id and v_id:
@@ -83,53 +192,120 @@ def get_report_by_id(report_id):
     return result
 
 
-def send_reminder():
+class AddDays(Func):
+    """
+    Date a number of days after a date, e.g. the date of the shifts a
+    volunteer is reminded of today
+    """
+    # a date plus an integer is a date on Postgres
+    template = '(%(expressions)s)'
+    arg_joiner = ' + '
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return super(AddDays, self).as_sql(
+            compiler, connection, template="date(%(expressions)s || ' days')",
+            arg_joiner=", '+' || ", **extra_context)
+
+
+def get_due_reminders(today=None):
+    """
+    Returns the volunteer shifts for which a reminder is due today,
+    that is whose shift takes place exactly reminder_days days after
+    today, with the volunteer, job, event and location joined in
+
+    :param today: the date reminders are sent on (default: today)
+    :return: queryset of volunteer shifts
+    """
+    if not today:
+        today = timezone.now().date()
+
+    volunteer_shift_list = VolunteerShift.objects.filter(
+        volunteer__reminder_days__gt=0,
+        shift__date=AddDays(
+            Value(today, output_field=DateField()),
+            F('volunteer__reminder_days'), output_field=DateField()))
+    volunteer_shift_list = volunteer_shift_list.select_related(
+        'volunteer', 'shift__job__event', 'shift__city', 'shift__state',
+        'shift__country')
+
+    return volunteer_shift_list.order_by('shift__date', 'shift__start_time')
+
+
+def get_reminder_message(volunteer_shift):
+    """
+    Renders the reminder mail of a volunteer shift
+
+    :return: (subject, message, from_email, recipient_list)
+    """
+    volunteer = volunteer_shift.volunteer
+    shift = volunteer_shift.shift
+    days = volunteer.reminder_days
+    if days == 1:
+        email_word = " tomorrow."
+    else:
+        email_word = " in " + str(days) + " days."
+    subject = "The Systers - VMS Volunteer Shift Reminder Mail"
+    message = "Dear " + volunteer.first_name + \
+        ",\n\nThis is your reminder that you " \
+        "have registered for the " + \
+        shift.job.name + " job at the " + shift.job.event.name + \
+        " event on " + str(shift.date) + \
+        ".\nThe shift you signed up starts" + \
+        email_word + \
+        "\n\nShift Start Time: " + str(shift.start_time) + \
+        "\nShift End Time: " + str(shift.end_time) + \
+        "\n\nAddress: " + (shift.address or '') + \
+        "\nVenue: " + (shift.venue or '') + \
+        "\nCity: " + (shift.city.name if shift.city else '') + \
+        "\nState: " + (shift.state.name if shift.state else '') + \
+        "\nCountry: " + (shift.country.name if shift.country else '') + \
+        "\n\nThank you for registering!"
+    return (subject, message, 'noreply@systers.org', [volunteer.email])
+
+
+def send_reminder(today=None, batch_size=100, dry_run=False):
     """
     Send reminder email for all shifts and volunteers
     days = 7 - one week reminder
     days = 1 - one day reminder
     A volunteer can specify days in the profile
+    The due reminders are fetched in one query and sent in batches
+    of batch_size through a single mail connection.
+    With dry_run the reminders are rendered and counted but not sent.
     !This function should be run on the server once a day!
     """
     notifications_number = 0
-    for volunteer in get_all_volunteers():
-        days = volunteer.reminder_days
-        if days == 1:
-            email_word = " tomorrow."
-        else:
-            email_word = " in " + str(days) + " days."
-        v_id = volunteer.id
-        shift_list = get_future_shifts_by_volunteer_id(v_id)
-        subject = "The Systers - VMS Volunteer Shift Reminder Mail"
-        for shift in shift_list:
-            date_shift = shift.date
-            days_before_shift = date_shift - date.today()
-            if days_before_shift.days == days:
-                message = "Dear " + volunteer.first_name + \
-                    ",\n\nThis is your reminder that you " \
-                    "have registered for the " + \
-                    shift.job.name + " job at the " + shift.job.event.name + \
-                    " event on " + str(shift.date) + \
-                    ".\nThe shift you signed up starts" + \
-                    email_word + \
-                    "\n\nShift Start Time: " + str(shift.start_time) + \
-                    "\nShift End Time: " + str(shift.end_time) + \
-                    "\n\nAddress: " + shift.address + \
-                    "\nVenue: " + shift.venue + \
-                    "\nCity: " + shift.city.name + \
-                    "\nState: " + shift.state.name + \
-                    "\nCountry: " + shift.country.name + \
-                    "\n\nThank you for registering!"
-                send_mail(
-                    subject,
-                    message,
-                    'noreply@systers.org', [volunteer.email],
-                    fail_silently=False)
-                notifications_number += 1
-                # print(message)
+    connection = None
+    if not dry_run:
+        connection = get_connection()
+        connection.open()
+
+    try:
+        batch = []
+        for volunteer_shift in get_due_reminders(today).iterator():
+            batch.append(get_reminder_message(volunteer_shift))
+            if len(batch) >= batch_size:
+                notifications_number += send_reminder_batch(batch, connection)
+                batch = []
+        if batch:
+            notifications_number += send_reminder_batch(batch, connection)
+    finally:
+        if connection:
+            connection.close()
+
     return notifications_number
 
 
+def send_reminder_batch(batch, connection):
+    """
+    Sends a batch of rendered reminders over an open connection;
+    without a connection the batch is only counted
+    """
+    if connection is None:
+        return len(batch)
+    return send_mass_mail(batch, fail_silently=False, connection=connection)
+
+
 def clear_shift_hours(v_id, s_id):
 
     result = True
@@ -176,6 +352,12 @@ def edit_shift_hours(v_id, s_id, start_time, end_time):
         raise ObjectDoesNotExist
 
 
+# fields of a report row, in the order they are shown
+REPORT_LINE_FIELDS = ('first_name', 'last_name', 'organization', 'event_name',
+                      'job_name', 'date', 'logged_start_time',
+                      'logged_end_time', 'duration')
+
+
 def generate_report(volunteer_shift_list):
 
     report_list = []
@@ -209,6 +391,62 @@ def generate_report(volunteer_shift_list):
     return report_list
 
 
+def create_report(volunteer, volunteer_shift_list):
+    """
+    Creates a report of the volunteer shifts and stores its rows as
+    report lines
+
+    :param volunteer: The volunteer who requested the report
+    :param volunteer_shift_list: The logged volunteer shifts to report
+    :return: Tuple of the report and its rows as dictionaries
+    """
+    volunteer_shift_list = list(volunteer_shift_list)
+    report_list = generate_report(volunteer_shift_list)
+    total_hours = get_total_hours(
+        id__in=[volunteer_shift.id for volunteer_shift in volunteer_shift_list])
+    with transaction.atomic():
+        report = Report.objects.create(
+            total_hrs=total_hours, volunteer=volunteer)
+        report.volunteer_shifts.add(*volunteer_shift_list)
+        create_report_lines(report, volunteer_shift_list, report_list)
+    return report, report_list
+
+
+def create_report_lines(report, volunteer_shift_list, report_list=None):
+    """
+    Stores the rows of the report in one insert
+
+    :param volunteer_shift_list: List of the reported volunteer shifts
+    :param report_list: Rows already computed by generate_report
+    """
+    if report_list is None:
+        report_list = generate_report(volunteer_shift_list)
+    ReportLine.objects.bulk_create([
+        ReportLine(report=report, volunteer_shift=volunteer_shift, **row)
+        for volunteer_shift, row in zip(volunteer_shift_list, report_list)
+    ])
+
+
+def get_report_lines(report):
+    """
+    Returns the rows of the report in the same format as generate_report.
+    Reports created before rows were stored get their rows stored now.
+
+    :param report: The report object
+    :return: List of dictionaries, one per logged shift
+    """
+    report_list = list(
+        report.lines.order_by('id').values(*REPORT_LINE_FIELDS))
+    if not report_list:
+        volunteer_shift_list = list(
+            report.volunteer_shifts.select_related(
+                'volunteer__organization', 'shift__job__event'))
+        create_report_lines(report, volunteer_shift_list)
+        report_list = list(
+            report.lines.order_by('id').values(*REPORT_LINE_FIELDS))
+    return report_list
+
+
 def get_all_volunteer_shifts_with_hours():
 
     volunteer_shift_list = VolunteerShift.objects.all()
@@ -224,6 +462,67 @@ def get_all_volunteer_shifts_with_hours():
     return volunteer_shift_list
 
 
+# most shifts created from one recurring pattern
+MAX_RECURRING_SHIFTS = 20000
+
+# shifts inserted per query while creating recurring shifts
+RECURRING_SHIFT_BATCH_SIZE = 1000
+
+
+def get_recurring_dates(start_date, end_date, weekday_list):
+    """
+    :param weekday_list: Weekdays to keep, Monday being 0
+    :return: List of the dates from start_date to end_date, both included,
+             that fall on one of the weekdays
+    """
+    date_list = []
+    day = start_date
+    while day <= end_date:
+        if day.weekday() in weekday_list:
+            date_list.append(day)
+        day += timedelta(days=1)
+    return date_list
+
+
+def create_recurring_shifts(job, date_list, time_block_list, max_volunteers,
+                            address=None, venue=None):
+    """
+    Creates a shift of the job for each date and time block with bulk
+    inserts in one transaction. The dates are expected to lie within the
+    job dates, which the form checks once for the whole range. Shifts the
+    job already has at the same date and times are not created again, so
+    a repeated submission adds nothing. The shifts are at the location of
+    the event unless another address or venue is given.
+
+    :param time_block_list: List of (start time, end time) tuples
+    :return: Number of shifts created
+    """
+    if not date_list or not time_block_list:
+        return 0
+    event = job.event
+    with transaction.atomic():
+        existing = set(Shift.objects.filter(
+            job=job, date__gte=min(date_list),
+            date__lte=max(date_list)).values_list(
+                'date', 'start_time', 'end_time'))
+        shift_list = [
+            Shift(job=job, date=day, start_time=start_time,
+                  end_time=end_time, max_volunteers=max_volunteers,
+                  address=address or event.address,
+                  venue=venue or event.venue, city_id=event.city_id,
+                  state_id=event.state_id, country_id=event.country_id)
+            for day in date_list
+            for start_time, end_time in time_block_list
+            if (day, start_time, end_time) not in existing
+        ]
+        # sliced here, as a batch_size would not be capped to the query
+        # parameter limit of SQLite by this Django version
+        for start in range(0, len(shift_list), RECURRING_SHIFT_BATCH_SIZE):
+            Shift.objects.bulk_create(
+                shift_list[start:start + RECURRING_SHIFT_BATCH_SIZE])
+    return len(shift_list)
+
+
 def get_shift_by_id(shift_id):
 
     is_valid = True
@@ -260,23 +559,39 @@ def get_shift_slots_remaining(s_id):
     return num_slots_remaining
 
 
-def get_shifts_with_open_slots(j_id):
+def get_shifts_with_slots_remaining(j_id, v_id=None):
+    """
+    Returns the shifts of a job ordered by date, annotated in a single
+    query with the number of slots remaining and, if a volunteer is given,
+    whether that volunteer has signed up for the shift
+
+    :param j_id: The id of the job
+    :param v_id: The id of the volunteer (optional)
+    :return: queryset of dicts with id, date, start_time, end_time,
+             slots_remaining and, for a volunteer, signed_up
+    """
+    shift_list = Shift.objects.filter(job_id=j_id).annotate(
+        slots_remaining=F('max_volunteers') - Count('volunteershift'))
 
-    shift_list_by_date = get_shifts_ordered_by_date(j_id)
-    shift_list = []
+    fields = ['id', 'date', 'start_time', 'end_time', 'slots_remaining']
 
-    for shift in shift_list_by_date:
-        slots_remaining = get_shift_slots_remaining(shift.id)
-        if slots_remaining > 0:
-            shift_map = dict()
-            shift_map["id"] = shift.id
-            shift_map["date"] = shift.date
-            shift_map["start_time"] = shift.start_time
-            shift_map["end_time"] = shift.end_time
-            shift_map["slots_remaining"] = slots_remaining
-            shift_list.append(shift_map)
+    if v_id:
+        signed_up = VolunteerShift.objects.filter(
+            shift_id=OuterRef('pk'), volunteer_id=v_id)
+        shift_list = shift_list.annotate(signed_up=Exists(signed_up))
+        fields.append('signed_up')
 
-    return shift_list
+    shift_list = shift_list.order_by('date', 'id')
+
+    return shift_list.values(*fields)
+
+
+def get_shifts_with_open_slots(j_id):
+
+    shift_list = get_shifts_with_slots_remaining(j_id)
+    shift_list = shift_list.filter(slots_remaining__gt=0)
+
+    return list(shift_list)
 
 
 def get_shifts_with_open_slots_for_volunteer(j_id, v_id):
@@ -284,56 +599,74 @@ def get_shifts_with_open_slots_for_volunteer(j_id, v_id):
     Returns shifts with open slots
     all except those for which the volunteer has signed up.
     """
-    shift_list_by_date = get_shifts_ordered_by_date(j_id)
-    shift_list = []
+    shift_list = get_shifts_with_slots_remaining(j_id, v_id)
+    shift_list = shift_list.filter(slots_remaining__gt=0, signed_up=False)
+    shift_list = shift_list.values('id', 'date', 'start_time', 'end_time',
+                                   'slots_remaining')
+
+    return list(shift_list)
+
+
+def get_open_shifts_for_volunteer(v_id, from_date=None):
+    """
+    Returns all shifts that still have open slots and that the volunteer
+    has not signed up for, as a single queryset
+
+    :param v_id: The id of the volunteer
+    :param from_date: only shifts on or after this date (optional)
+    :return: queryset of shifts
+    """
+    signed_up = VolunteerShift.objects.filter(
+        shift_id=OuterRef('pk'), volunteer_id=v_id)
+    shift_list = Shift.objects.annotate(
+        slots_remaining=F('max_volunteers') - Count('volunteershift'),
+        signed_up=Exists(signed_up))
+    shift_list = shift_list.filter(slots_remaining__gt=0, signed_up=False)
 
-    for shift in shift_list_by_date:
-        slots_remaining = get_shift_slots_remaining(shift.id)
-        if slots_remaining > 0 and not is_signed_up(v_id, shift.id):
-            shift_map = dict()
-            shift_map["id"] = shift.id
-            shift_map["date"] = shift.date
-            shift_map["start_time"] = shift.start_time
-            shift_map["end_time"] = shift.end_time
-            shift_map["slots_remaining"] = slots_remaining
-            shift_list.append(shift_map)
+    if from_date:
+        shift_list = shift_list.filter(date__gte=from_date)
 
     return shift_list
 
 
 def get_future_shifts_by_volunteer_id(v_id):
+    """
+    Returns the shifts the volunteer signed up for that take place today
+    or later, ordered by date, with the job, event and location joined
+
+    :param v_id: The id of the volunteer
+    :return: queryset of shifts
+    """
     shift_signed_up_list = Shift.objects.filter(
-        Q(volunteershift__volunteer_id=v_id) &
-        Q(date__gte=timezone.now().date()) |
-        Q(date=timezone.now().date(), start_time__gte=timezone.now().time())
-    )
-    shift_signed_up_list = shift_signed_up_list.order_by('date')
+        volunteershift__volunteer_id=v_id,
+        date__gte=timezone.now().date())
+    shift_signed_up_list = shift_signed_up_list.select_related(
+        'job__event', 'city', 'state', 'country').order_by('date')
 
     return shift_signed_up_list
 
 
 def get_unlogged_shifts_by_volunteer_id(v_id):
+    """
+    Returns the shifts the volunteer signed up for that took place today
+    or earlier and have no logged hours yet, ordered by date, with the
+    job, event and location joined
 
-    # get shifts that the volunteer signed up for and
-    # that have not been logged yet (in terms of logged start and end times)
+    :param v_id: The id of the volunteer
+    :return: queryset of shifts
+    """
+    # all conditions on the volunteer shift go in a single filter call so
+    # that they apply to the same sign-up, a volunteer signs up for a
+    # shift only once so the join does not repeat shifts
     shift_signed_up_list = Shift.objects.filter(
-        Q(
-            volunteershift__volunteer_id=v_id,
-            volunteershift__start_time__isnull=True,
-            volunteershift__end_time__isnull=True) &
-        Q(date__lte=timezone.now().date()) |
-        Q(date=timezone.now().date(), start_time__lte=timezone.now().time())
-    )
-
-    # this filtering is buggy when done this way, why?
-    # it shows the same shift multiple times if
-    # multiple volunteers are signed up for the same shift)
-    # shift_signed_up_list = shift_signed_up_list.filter(
-    # volunteershift__start_time__isnull=True,
-    # volunteershift__end_time__isnull=True)
+        volunteershift__volunteer_id=v_id,
+        volunteershift__start_time__isnull=True,
+        volunteershift__end_time__isnull=True,
+        date__lte=timezone.now().date())
 
     # order the list by date in ascending order
-    shift_signed_up_list = shift_signed_up_list.order_by('date')
+    shift_signed_up_list = shift_signed_up_list.select_related(
+        'job__event', 'city', 'state', 'country').order_by('date')
 
     return shift_signed_up_list
 
@@ -357,7 +690,8 @@ def get_volunteer_shift_by_id(v_id, s_id):
 
 def get_volunteer_shifts(v_id, event_name, job_name, start_date, end_date):
 
-    volunteer_shift_list = get_volunteer_shifts_with_hours(v_id)
+    volunteer_shift_list = get_volunteer_shifts_with_hours(
+        v_id).select_related('volunteer__organization', 'shift__job__event')
     volunteer_shift_list = volunteer_shift_list.filter(
         Q(report_status=False) &
         Q(shift__date__lte=timezone.now().date()) |
@@ -399,6 +733,54 @@ def get_volunteer_shifts_with_hours(v_id):
     return volunteer_shift_list
 
 
+def get_volunteer_dashboard(v_id):
+    """
+    Loads all shifts the volunteer signed up for in one query, with the
+    job, event and location joined, and splits them up like
+    get_future_shifts_by_volunteer_id, get_unlogged_shifts_by_volunteer_id
+    and get_volunteer_shifts_with_hours
+
+    :param v_id: The id of the volunteer
+    :return: Dictionary with the upcoming and unlogged shifts by date, the
+             volunteer shifts with logged hours latest first and the total
+             logged hours
+    """
+    today = timezone.now().date()
+    volunteer_shift_list = VolunteerShift.objects.filter(
+        volunteer_id=v_id).select_related(
+            'shift__job__event', 'shift__city', 'shift__state',
+            'shift__country').annotate(
+                logged_minutes=get_logged_minutes()).order_by(
+                    'shift__date', 'shift__start_time')
+
+    upcoming_shift_list = []
+    unlogged_shift_list = []
+    logged_volunteer_shift_list = []
+    logged_minutes = 0
+    for volunteer_shift in volunteer_shift_list:
+        shift = volunteer_shift.shift
+        if shift.date >= today:
+            upcoming_shift_list.append(shift)
+        if volunteer_shift.start_time is None:
+            if volunteer_shift.end_time is None and shift.date <= today:
+                unlogged_shift_list.append(shift)
+        elif volunteer_shift.end_time is not None:
+            logged_volunteer_shift_list.append(volunteer_shift)
+            logged_minutes += volunteer_shift.logged_minutes
+
+    logged_volunteer_shift_list.sort(
+        key=lambda volunteer_shift: (
+            volunteer_shift.shift.date, volunteer_shift.start_time,
+            volunteer_shift.end_time),
+        reverse=True)
+    return {
+        'upcoming_shift_list': upcoming_shift_list,
+        'unlogged_shift_list': unlogged_shift_list,
+        'logged_volunteer_shift_list': logged_volunteer_shift_list,
+        'total_hours': minutes_to_hours(logged_minutes),
+    }
+
+
 def get_volunteers_by_shift_id(s_id):
 
     volunteer_list = None
@@ -439,29 +821,44 @@ def is_signed_up(v_id, s_id):
 
 
 def register(v_id, s_id):
+    """
+    Signs a volunteer up for a shift
+
+    The shift row is locked for the duration of the transaction so that
+    concurrent sign-ups for the same shift are serialized and the number
+    of volunteers can never exceed max_volunteers. The unique constraint
+    on (volunteer, shift) rejects a duplicate sign-up from a concurrent
+    request of the same volunteer.
+    """
 
     result = "IS_VALID"
     ERROR_CODE_ALREADY_SIGNED_UP = "ERROR_CODE_ALREADY_SIGNED_UP"
     ERROR_CODE_NO_SLOTS_REMAINING = "ERROR_CODE_NO_SLOTS_REMAINING"
 
-    # a volunteer must not be allowed to register
-    # for a shift that they are already registered for
-    signed_up = is_signed_up(v_id, s_id)
-
-    if not signed_up:
-        volunteer_obj = get_volunteer_by_id(v_id)
-        shift_obj = get_shift_by_id(s_id)
-        if volunteer_obj and shift_obj:
-            num_slots_remaining = get_shift_slots_remaining(s_id)
-            if num_slots_remaining > 0:
-                registration_obj = VolunteerShift(
-                    volunteer=volunteer_obj, shift=shift_obj)
-                registration_obj.save()
+    with transaction.atomic():
+        # a volunteer must not be allowed to register
+        # for a shift that they are already registered for
+        signed_up = is_signed_up(v_id, s_id)
+
+        if not signed_up:
+            volunteer_obj = get_volunteer_by_id(v_id)
+            shift_obj = Shift.objects.select_for_update().filter(
+                pk=s_id).first()
+            if volunteer_obj and shift_obj:
+                num_slots_taken = VolunteerShift.objects.filter(
+                    shift_id=s_id).count()
+                if num_slots_taken < shift_obj.max_volunteers:
+                    try:
+                        with transaction.atomic():
+                            VolunteerShift.objects.create(
+                                volunteer=volunteer_obj, shift=shift_obj)
+                    except IntegrityError:
+                        result = ERROR_CODE_ALREADY_SIGNED_UP
+                else:
+                    result = ERROR_CODE_NO_SLOTS_REMAINING
             else:
-                result = ERROR_CODE_NO_SLOTS_REMAINING
+                raise ObjectDoesNotExist
         else:
-            raise ObjectDoesNotExist
-    else:
-        result = ERROR_CODE_ALREADY_SIGNED_UP
+            result = ERROR_CODE_ALREADY_SIGNED_UP
 
     return result
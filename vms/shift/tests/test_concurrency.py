@@ -0,0 +1,128 @@
+# standard library
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+# Django
+from django.db import connection, connections
+
+# local Django
+from shift.models import VolunteerShift
+from shift.services import register
+from shift.utils import (clear_objects, create_event_with_details,
+                         create_job_with_details,
+                         create_organization_with_details,
+                         create_shift_with_details,
+                         create_volunteer_with_details)
+
+
+def setUpModule():
+    """
+    Creates a popular shift with few slots and many volunteers who
+    try to sign up for it at the same time
+    """
+
+    global j1, volunteer_list
+
+    event_1 = {
+        'name': "Popular Event",
+        'start_date': "2050-05-10",
+        'end_date': "2050-06-16",
+        'description': 'event-description',
+        'address': 'event-address',
+        'venue': 'event-venue'
+    }
+    e1 = create_event_with_details(event_1)
+
+    job_1 = {
+        'name': "Greeter",
+        'start_date': "2050-05-10",
+        'end_date': "2050-06-15",
+        'description': "A greeter job",
+        'event': e1
+    }
+    j1 = create_job_with_details(job_1)
+
+    org_obj = create_organization_with_details('Crowd')
+    volunteer_list = []
+    for i in range(30):
+        volunteer = {
+            'username': 'crowd{0}'.format(i),
+            'first_name': "Crowd",
+            'last_name': "Member",
+            'address': "Pallet Town",
+            'city': None,
+            'state': None,
+            'country': None,
+            'phone_number': "2374983247",
+            'email': "crowd{0}@test.com".format(i)
+        }
+        volunteer_list.append(
+            create_volunteer_with_details(volunteer, org_obj))
+
+
+def tearDownModule():
+    # Destroys all objects created
+    clear_objects()
+
+
+@unittest.skipUnless(
+    connection.features.has_select_for_update,
+    'Concurrent sign-ups need a database with row level locking')
+class ConcurrentRegisterTest(unittest.TestCase):
+    """
+    Registers volunteers for the same shift from many threads, each with
+    its own database connection, and checks that the shift is never
+    overbooked
+    """
+
+    def setUp(self):
+        shift_1 = {
+            'date': "2050-06-15",
+            'start_time': "9:00",
+            'end_time': "15:00",
+            'max_volunteers': 5,
+            'job': j1,
+            'address': 'shift-address',
+            'venue': 'shift-venue'
+        }
+        self.s1 = create_shift_with_details(shift_1)
+
+    def tearDown(self):
+        VolunteerShift.objects.all().delete()
+        self.s1.delete()
+
+    @staticmethod
+    def register_in_thread(v_id, s_id):
+        try:
+            return register(v_id, s_id)
+        finally:
+            connections.close_all()
+
+    def register_concurrently(self, volunteer_ids):
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            futures = [
+                executor.submit(self.register_in_thread, v_id, self.s1.id)
+                for v_id in volunteer_ids
+            ]
+            return [future.result() for future in futures]
+
+    def test_register_does_not_overbook(self):
+        result_list = self.register_concurrently(
+            [volunteer.id for volunteer in volunteer_list])
+
+        self.assertEqual(result_list.count("IS_VALID"), 5)
+        self.assertEqual(
+            result_list.count("ERROR_CODE_NO_SLOTS_REMAINING"), 25)
+        self.assertEqual(
+            VolunteerShift.objects.filter(shift_id=self.s1.id).count(), 5)
+
+    def test_register_same_volunteer_once(self):
+        v_id = volunteer_list[0].id
+        result_list = self.register_concurrently([v_id] * 10)
+
+        self.assertEqual(result_list.count("IS_VALID"), 1)
+        self.assertEqual(
+            result_list.count("ERROR_CODE_ALREADY_SIGNED_UP"), 9)
+        self.assertEqual(
+            VolunteerShift.objects.filter(
+                shift_id=self.s1.id, volunteer_id=v_id).count(), 1)
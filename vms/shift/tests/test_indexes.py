@@ -0,0 +1,121 @@
+# standard library
+from datetime import date, time, timedelta
+
+# Django
+from django.db import connection
+from django.test import TestCase
+
+# local Django
+from shift.models import Report, Shift, VolunteerShift
+from shift.utils import (create_event_with_details, create_job_with_details,
+                         create_organization_with_details,
+                         create_volunteer_with_details)
+
+
+def explain(queryset):
+    """
+    Returns the query plan of the queryset as a single string
+    """
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+        else:
+            # the seeded tables are small enough for a sequential scan to
+            # look cheaper, so make the planner show which index it can use
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('EXPLAIN ' + sql, params)
+        return '\n'.join(str(row) for row in cursor.fetchall())
+
+
+class IndexUsageTest(TestCase):
+    """
+    Checks on seeded data that the hot shift, volunteer shift and report
+    lookups are answered from the indexes declared on the models
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        event = create_event_with_details({
+            'name': "Indexed Event",
+            'start_date': "2012-9-1",
+            'end_date': "2012-12-30",
+            'description': "event-description",
+            'address': 'event-address',
+            'venue': 'event-venue'
+        })
+        job_list = [
+            create_job_with_details({
+                'name': "Indexed Job {0}".format(i),
+                'start_date': "2012-9-1",
+                'end_date': "2012-12-30",
+                'description': "job-description",
+                'event': event
+            }) for i in range(5)
+        ]
+        Shift.objects.bulk_create([
+            Shift(date=date(2012, 9, 1) + timedelta(days=day),
+                  start_time=time(9), end_time=time(15), max_volunteers=10,
+                  job=job) for job in job_list for day in range(60)
+        ])
+        shift_list = list(Shift.objects.order_by('id'))
+        org = create_organization_with_details('Indexed Org')
+        cls.volunteer_list = [
+            create_volunteer_with_details({
+                'username': 'indexed{0}'.format(i),
+                'first_name': "Indexed",
+                'last_name': "Volunteer",
+                'address': "Mario Land",
+                'city': None,
+                'state': None,
+                'country': None,
+                'phone_number': "2374983247",
+                'email': "indexed{0}@nintendo.com".format(i)
+            }, org) for i in range(10)
+        ]
+        VolunteerShift.objects.bulk_create([
+            VolunteerShift(volunteer=volunteer, shift=shift)
+            for volunteer in cls.volunteer_list
+            for shift in shift_list[::10]
+        ])
+        Report.objects.bulk_create([
+            Report(volunteer=volunteer, total_hrs=1, confirm_status=i % 3)
+            for i, volunteer in enumerate(cls.volunteer_list * 5)
+        ])
+        cls.job = job_list[0]
+        cls.shift = shift_list[0]
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = explain(queryset)
+        self.assertIn(index_name, plan)
+
+    def test_shift_indexes(self):
+        today = date(2012, 10, 1)
+        self.assertUsesIndex(
+            Shift.objects.filter(job_id=self.job.id, date__gte=today),
+            'shift_job_date_idx')
+        self.assertUsesIndex(
+            Shift.objects.filter(date__gte=today), 'shift_date_idx')
+
+    def test_volunteer_shift_indexes(self):
+        volunteer = self.volunteer_list[0]
+        self.assertUsesIndex(
+            VolunteerShift.objects.filter(
+                volunteer_id=volunteer.id, start_time__isnull=True,
+                end_time__isnull=True),
+            'volshift_vol_logged_idx')
+        self.assertUsesIndex(
+            VolunteerShift.objects.filter(
+                volunteer_id=volunteer.id, report_status=False),
+            'volshift_vol_reported_idx')
+
+        plan = explain(VolunteerShift.objects.filter(
+            volunteer_id=volunteer.id, shift_id=self.shift.id))
+        self.assertRegex(plan, '(?i)index')
+        self.assertNotRegex(plan, '(?i)scan table|seq scan')
+
+    def test_report_index(self):
+        self.assertUsesIndex(
+            Report.objects.filter(
+                confirm_status=0, volunteer=self.volunteer_list[0]),
+            'report_status_vol_idx')
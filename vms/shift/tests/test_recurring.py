@@ -0,0 +1,139 @@
+# standard library
+from datetime import date, time
+
+# Django
+from django.test import TestCase
+from django.urls import reverse
+
+# local Django
+from job.models import Job
+from shift.forms import RecurringShiftForm
+from shift.models import Shift
+from shift.services import create_recurring_shifts, get_recurring_dates
+from shift.utils import (create_admin_with_details, create_event_with_details,
+                         create_job_with_details)
+
+
+class RecurringShiftTest(TestCase):
+    """
+    Tests the creation of the shifts of a job from a recurring pattern
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        event = create_event_with_details({
+            'name': "Recurring Event",
+            'start_date': "2050-05-02",
+            'end_date': "2050-06-30",
+            'description': 'event-description',
+            'address': 'event-address',
+            'venue': 'event-venue'
+        })
+        cls.job = create_job_with_details({
+            'name': "Recurring Job",
+            'start_date': "2050-05-02",
+            'end_date': "2050-05-29",
+            'description': "job-description",
+            'event': event
+        })
+        create_admin_with_details({
+            'username': 'recurringadmin',
+            'password': 'recurringadmin',
+            'first_name': 'Recurring',
+            'last_name': 'Admin',
+            'email': 'recurringadmin@test.com',
+            'address': 'admin-address',
+            'city': None,
+            'state': None,
+            'country': None,
+            'phone_number': '9999999999',
+            'organization': 'Recurring Org'
+        })
+
+    def get_form(self, **data):
+        form_data = {
+            'start_date': '2050-05-02',
+            'end_date': '2050-05-15',
+            'weekdays': ['0', '2'],
+            'time_blocks': '09:00-12:00, 13:00-17:00',
+            'max_volunteers': '5',
+        }
+        form_data.update(data)
+        return RecurringShiftForm(Job.objects.get(pk=self.job.pk), form_data)
+
+    def test_get_recurring_dates(self):
+        # 2050-05-02 is a Monday
+        self.assertEqual(
+            get_recurring_dates(date(2050, 5, 2), date(2050, 5, 15), [0, 2]),
+            [date(2050, 5, 2), date(2050, 5, 4), date(2050, 5, 9),
+             date(2050, 5, 11)])
+        self.assertEqual(
+            get_recurring_dates(date(2050, 5, 3), date(2050, 5, 3), [0]), [])
+
+    def test_form(self):
+        form = self.get_form()
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data['time_blocks'],
+                         [(time(9), time(12)), (time(13), time(17))])
+        self.assertEqual(len(form.cleaned_data['dates']), 4)
+
+        # the whole range has to lie within the job dates
+        self.assertIn('start_date',
+                      self.get_form(end_date='2050-05-30').errors)
+        self.assertIn('start_date', self.get_form(
+            start_date='2050-05-10', end_date='2050-05-09').errors)
+        self.assertIn('time_blocks',
+                      self.get_form(time_blocks='12:00-09:00').errors)
+        self.assertIn('time_blocks', self.get_form(time_blocks='9').errors)
+        self.assertIn('weekdays', self.get_form(
+            start_date='2050-05-03', end_date='2050-05-03').errors)
+
+    def test_create_recurring_shifts(self):
+        date_list = get_recurring_dates(
+            date(2050, 5, 2), date(2050, 5, 15), [0, 2])
+        time_block_list = [(time(9), time(12)), (time(13), time(17))]
+        job = Job.objects.select_related('event').get(pk=self.job.pk)
+        with self.assertNumQueries(4):
+            self.assertEqual(create_recurring_shifts(
+                job, date_list, time_block_list, 5), 8)
+        shift = Shift.objects.filter(job=self.job).order_by(
+            'date', 'start_time').first()
+        self.assertEqual(
+            (shift.date, shift.start_time, shift.end_time,
+             shift.max_volunteers, shift.address, shift.venue),
+            (date(2050, 5, 2), time(9), time(12), 5, 'event-address',
+             'event-venue'))
+
+        # shifts the job has already are not created again
+        self.assertEqual(create_recurring_shifts(
+            job, date_list, time_block_list + [(time(18), time(19))], 5,
+            venue='Other Venue'), 4)
+        self.assertEqual(Shift.objects.filter(job=self.job).count(), 12)
+        self.assertEqual(
+            Shift.objects.filter(venue='Other Venue').count(), 4)
+
+    def test_view(self):
+        self.client.login(username='recurringadmin', password='recurringadmin')
+        url = reverse('shift:create_recurring', args=[self.job.id])
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        response = self.client.post(url, {
+            'start_date': '2050-05-02',
+            'end_date': '2050-05-29',
+            'weekdays': ['5', '6'],
+            'time_blocks': '10:00-14:00',
+            'max_volunteers': '3',
+        })
+        self.assertRedirects(
+            response, reverse('shift:list_shifts', args=[self.job.id]))
+        self.assertEqual(Shift.objects.filter(job=self.job).count(), 8)
+
+        response = self.client.post(url, {
+            'start_date': '2050-05-02',
+            'end_date': '2050-06-29',
+            'weekdays': ['5'],
+            'time_blocks': '10:00-14:00',
+            'max_volunteers': '3',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Shift.objects.filter(job=self.job).count(), 8)
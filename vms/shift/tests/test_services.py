@@ -2,19 +2,28 @@
 import datetime
 import unittest
 from datetime import date, timedelta
+from io import StringIO
+from unittest import mock
 
 # Django
+from django.core import mail
 from django.core.exceptions import ObjectDoesNotExist
+from django.core.mail import get_connection
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.test import TestCase
 
 # local Django
-from shift.models import VolunteerShift
+from shift.models import ReportLine, VolunteerShift
 from shift.services import (add_shift_hours, cancel_shift_registration,
                             calculate_total_report_hours, calculate_duration,
                             clear_shift_hours, delete_shift, edit_shift_hours,
                             generate_report, get_shifts_with_open_slots,
                             get_future_shifts_by_volunteer_id, get_shift_by_id,
                             get_shifts_by_job_id, get_shifts_ordered_by_date,
-                            get_shift_slots_remaining, send_reminder,
+                            get_shift_slots_remaining, get_due_reminders,
+                            send_reminder,
                             get_unlogged_shifts_by_volunteer_id,
                             get_volunteer_shift_by_id, get_volunteer_shifts,
                             get_volunteer_shifts_with_hours,
@@ -22,7 +31,11 @@ from shift.services import (add_shift_hours, cancel_shift_registration,
                             get_logged_volunteers_by_shift_id, is_signed_up,
                             get_all_volunteer_shifts_with_hours,
                             get_shifts_with_open_slots_for_volunteer,
-                            get_report_by_id)
+                            get_shifts_with_slots_remaining,
+                            get_report_by_id, create_report,
+                            get_report_lines, get_logged_volunteer_shifts,
+                            get_total_hours, get_total_hours_by,
+                            get_volunteer_dashboard)
 from shift.utils import (create_report_with_details, create_event_with_details,
                          create_organization_with_details, clear_objects,
                          create_job_with_details, get_report_list,
@@ -1033,6 +1046,44 @@ class ShiftReminderTest(unittest.TestCase):
 
         self.assertEqual(result, 2)
 
+        # the due reminders are fetched with all relations in one query
+        mail.outbox = []
+        with CaptureQueriesContext(connection) as queries:
+            result = send_reminder(dry_run=True)
+        self.assertEqual(result, 2)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(len(mail.outbox), 0)
+
+        # reminders are sent in batches over a single connection
+        with mock.patch('shift.services.get_connection',
+                        wraps=get_connection) as connection_mock:
+            result = send_reminder(batch_size=1)
+        self.assertEqual(result, 2)
+        self.assertEqual(connection_mock.call_count, 1)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(
+            sorted(msg.to[0] for msg in mail.outbox),
+            [self.v2.email, self.v1.email])
+        message = [msg for msg in mail.outbox if msg.to[0] == self.v1.email]
+        self.assertIn('starts tomorrow.', message[0].body)
+        self.assertIn('City: Roorkee', message[0].body)
+
+        # nothing is due on other days
+        self.assertEqual(send_reminder(date.today() + timedelta(1)), 0)
+
+        # the shifts are matched to the reminder days of each volunteer in
+        # a single query, whatever the number of distinct reminder days
+        with CaptureQueriesContext(connection) as queries:
+            due = [(vs.volunteer_id, vs.shift_id)
+                   for vs in get_due_reminders()]
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(
+            due, [(self.v1.id, self.s3.id), (self.v2.id, self.s2.id)])
+
+        out = StringIO()
+        call_command('send_reminders', '--dry-run', stdout=out)
+        self.assertIn('Rendered 2 reminders', out.getvalue())
+
 
 class DeleteShiftTest(unittest.TestCase):
     @classmethod
@@ -1104,3 +1155,409 @@ class DeleteShiftTest(unittest.TestCase):
         register(self.v1.id, self.s2.id)
         self.assertFalse(delete_shift(self.s2.id))
 
+
+class ShiftSlotsQueryCountTest(TestCase):
+    """
+    Checks that the open slot computation for the shifts of a job
+    costs a constant number of queries regardless of the number of shifts
+    """
+
+    def setUp(self):
+        volunteer_1 = {
+            'username': 'Slots',
+            'first_name': "Slots",
+            'last_name': "Counter",
+            'address': "Mario Land",
+            'city': None,
+            'state': None,
+            'country': None,
+            'phone_number': "2374983247",
+            'email': "slots@nintendo.com"
+        }
+        volunteer_2 = {
+            'username': 'Other',
+            'first_name': "Other",
+            'last_name': "Counter",
+            'address': "Mario Land",
+            'city': None,
+            'state': None,
+            'country': None,
+            'phone_number': "2374983247",
+            'email': "other@nintendo.com"
+        }
+        org_obj = create_organization_with_details('SlotsOrg')
+        self.v1 = create_volunteer_with_details(volunteer_1, org_obj)
+        self.v2 = create_volunteer_with_details(volunteer_2, org_obj)
+        job = {
+            'name': "Slots Job",
+            'start_date': "2012-9-1",
+            'end_date': "2012-10-30",
+            'description': "A job with many shifts",
+            'event': e1
+        }
+        self.job = create_job_with_details(job)
+
+    def create_shifts(self, count):
+        shift_list = []
+        for day in range(count):
+            shift = {
+                'date': date(2012, 9, 1) + timedelta(days=day),
+                'start_time': "9:00",
+                'end_time': "15:00",
+                'max_volunteers': 2,
+                'job': self.job,
+                'address': 'shift-address',
+                'venue': 'shift-venue'
+            }
+            shift_list.append(create_shift_with_details(shift))
+        return shift_list
+
+    def test_get_shifts_with_slots_remaining(self):
+        shift_1, shift_2, shift_3 = self.create_shifts(3)
+        register(self.v1.id, shift_1.id)
+        register(self.v2.id, shift_1.id)
+        register(self.v1.id, shift_2.id)
+
+        shift_list = list(
+            get_shifts_with_slots_remaining(self.job.id, self.v2.id))
+
+        self.assertEqual(
+            [shift['id'] for shift in shift_list],
+            [shift_1.id, shift_2.id, shift_3.id])
+        self.assertEqual(
+            [shift['slots_remaining'] for shift in shift_list], [0, 1, 2])
+        self.assertEqual(
+            [shift['signed_up'] for shift in shift_list],
+            [True, False, False])
+
+        shift_list = get_shifts_with_slots_remaining(self.job.id)
+        self.assertNotIn('signed_up', shift_list[0])
+
+    def test_open_slots_query_count_is_constant(self):
+        self.create_shifts(3)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(get_shifts_with_open_slots(self.job.id)), 3)
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                len(get_shifts_with_open_slots_for_volunteer(
+                    self.job.id, self.v1.id)), 3)
+
+        shift_list = self.create_shifts(60)
+        for shift in shift_list[:30]:
+            register(self.v1.id, shift.id)
+        with self.assertNumQueries(1):
+            self.assertEqual(len(get_shifts_with_open_slots(self.job.id)), 63)
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                len(get_shifts_with_open_slots_for_volunteer(
+                    self.job.id, self.v1.id)), 33)
+
+
+class ReportLinesTest(TestCase):
+    """
+    Checks that the rows of a report are stored when it is created and
+    read back in a single query
+    """
+
+    def setUp(self):
+        volunteer_1 = {
+            'username': 'Lines',
+            'first_name': "Report",
+            'last_name': "Lines",
+            'address': "Mario Land",
+            'city': None,
+            'state': None,
+            'country': None,
+            'phone_number': "2374983247",
+            'email': "lines@nintendo.com"
+        }
+        org_obj = create_organization_with_details('LinesOrg')
+        self.v1 = create_volunteer_with_details(volunteer_1, org_obj)
+        job = {
+            'name': "Lines Job",
+            'start_date': "2012-9-1",
+            'end_date': "2012-10-30",
+            'description': "A job with logged hours",
+            'event': e1
+        }
+        job = create_job_with_details(job)
+        self.logged_shift_list = []
+        for day in range(5):
+            shift = {
+                'date': date(2012, 9, 1) + timedelta(days=day),
+                'start_time': "9:00",
+                'end_time': "15:00",
+                'max_volunteers': 2,
+                'job': job,
+                'address': 'shift-address',
+                'venue': 'shift-venue'
+            }
+            self.logged_shift_list.append(log_hours_with_details(
+                self.v1, create_shift_with_details(shift),
+                datetime.time(9), datetime.time(10 + day)))
+
+    def test_create_report(self):
+        volunteer_shift_list = VolunteerShift.objects.filter(
+            volunteer=self.v1).order_by('shift__date')
+        report, report_list = create_report(self.v1, volunteer_shift_list)
+
+        self.assertEqual(report.total_hrs, 15)
+        self.assertEqual(
+            set(report.volunteer_shifts.all()), set(self.logged_shift_list))
+        self.assertEqual(report.lines.count(), 5)
+        self.assertEqual(
+            [row['duration'] for row in report_list], [1, 2, 3, 4, 5])
+
+        with self.assertNumQueries(1):
+            line_list = get_report_lines(report)
+        self.assertEqual(line_list, report_list)
+        self.assertEqual(line_list[0]['event_name'], e1.name)
+        self.assertEqual(line_list[0]['job_name'], "Lines Job")
+        self.assertEqual(line_list[0]['organization'], "LinesOrg")
+
+    def test_get_report_lines_of_older_report(self):
+        report = create_report_with_details(self.v1, self.logged_shift_list[0])
+        self.assertFalse(ReportLine.objects.filter(report=report).exists())
+
+        line_list = get_report_lines(report)
+        self.assertEqual(len(line_list), 1)
+        self.assertEqual(line_list[0]['duration'], 1)
+        # the rows are stored on first read
+        with self.assertNumQueries(1):
+            self.assertEqual(get_report_lines(report), line_list)
+
+
+class TotalHoursTest(TestCase):
+    """
+    Checks that logged hours are added up in the database in a single
+    query and agree with calculate_duration
+    """
+
+    def setUp(self):
+        org_1 = create_organization_with_details('HoursOrg')
+        org_2 = create_organization_with_details('OtherHoursOrg')
+        self.v1 = create_volunteer_with_details({
+            'username': 'Hours',
+            'first_name': "Hours",
+            'last_name': "Counter",
+            'address': "Mario Land",
+            'city': None,
+            'state': None,
+            'country': None,
+            'phone_number': "2374983247",
+            'email': "hours@nintendo.com"
+        }, org_1)
+        self.v2 = create_volunteer_with_details({
+            'username': 'OtherHours',
+            'first_name': "Other",
+            'last_name': "Counter",
+            'address': "Mario Land",
+            'city': None,
+            'state': None,
+            'country': None,
+            'phone_number': "2374983247",
+            'email': "otherhours@nintendo.com"
+        }, org_2)
+        self.event = create_event_with_details({
+            'name': "Hours Event",
+            'start_date': "2012-9-1",
+            'end_date': "2012-10-30",
+            'description': "event-description",
+            'address': 'event-address',
+            'venue': 'event-venue'
+        })
+        self.job = job = create_job_with_details({
+            'name': "Hours Job",
+            'start_date': "2012-9-1",
+            'end_date': "2012-10-30",
+            'description': "A job with logged hours",
+            'event': self.event
+        })
+        shift_list = []
+        for day in range(3):
+            shift_list.append(create_shift_with_details({
+                'date': date(2012, 9, 1) + timedelta(days=day),
+                'start_time': "9:00",
+                'end_time': "15:00",
+                'max_volunteers': 2,
+                'job': job,
+                'address': 'shift-address',
+                'venue': 'shift-venue'
+            }))
+        self.logged_list = [
+            (self.v1, shift_list[0], datetime.time(9), datetime.time(12, 30)),
+            (self.v1, shift_list[1], datetime.time(9, 15),
+             datetime.time(10, 35, 59)),
+            # logged past midnight
+            (self.v1, shift_list[2], datetime.time(22), datetime.time(1)),
+            (self.v2, shift_list[0], datetime.time(10), datetime.time(11)),
+        ]
+        for volunteer, shift, start, end in self.logged_list:
+            log_hours_with_details(volunteer, shift, start, end)
+        # signed up without logged hours
+        register(self.v2.id, shift_list[1].id)
+
+    def test_get_logged_volunteer_shifts(self):
+        minute_list = sorted(
+            get_logged_volunteer_shifts().values_list(
+                'logged_minutes', flat=True))
+        self.assertEqual(minute_list, [60, 80, 180, 210])
+
+    def test_get_total_hours(self):
+        expected = sum(
+            calculate_duration(start, end)
+            for volunteer, shift, start, end in self.logged_list
+            if volunteer == self.v1)
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                get_total_hours(volunteer_id=self.v1.id), round(expected, 2))
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                get_total_hours(shift__job__event_id=self.event.id), 8.83)
+        self.assertEqual(get_total_hours(volunteer_id=-1), 0)
+
+        report, report_list = create_report(
+            self.v1, get_logged_volunteer_shifts(volunteer_id=self.v1.id))
+        self.assertEqual(get_total_hours(report=report), 7.83)
+
+    def test_report_total_is_rounded_once(self):
+        for day in range(3):
+            shift = create_shift_with_details({
+                'date': date(2012, 10, 1) + timedelta(days=day),
+                'start_time': "9:00",
+                'end_time': "15:00",
+                'max_volunteers': 2,
+                'job': self.job,
+                'address': 'shift-address',
+                'venue': 'shift-venue'
+            })
+            log_hours_with_details(
+                self.v2, shift, datetime.time(9), datetime.time(9, 20))
+
+        report, report_list = create_report(
+            self.v2, get_logged_volunteer_shifts(
+                volunteer_id=self.v2.id, shift__date__gte=date(2012, 10, 1)))
+        # each row shows 0.33 hours, the total is one hour
+        self.assertEqual(
+            [row['duration'] for row in report_list], [0.33, 0.33, 0.33])
+        report.refresh_from_db()
+        self.assertEqual(report.total_hrs, 1)
+        self.assertEqual(get_total_hours(report=report), 1)
+
+    def test_get_total_hours_by(self):
+        with self.assertNumQueries(1):
+            hours = get_total_hours_by(
+                'volunteer__organization__name',
+                shift__job__event_id=self.event.id)
+        self.assertEqual(hours, {'HoursOrg': 7.83, 'OtherHoursOrg': 1.0})
+
+        hours = get_total_hours_by('volunteer_id')
+        self.assertEqual(hours, {self.v1.id: 7.83, self.v2.id: 1.0})
+
+
+class VolunteerShiftListTest(TestCase):
+    """
+    Checks that the upcoming and unlogged shifts of a volunteer do not
+    include shifts other volunteers signed up for
+    """
+
+    def setUp(self):
+        org_obj = create_organization_with_details('ListOrg')
+        self.v1 = create_volunteer_with_details({
+            'username': 'ListOne',
+            'first_name': "List",
+            'last_name': "One",
+            'address': "Mario Land",
+            'city': None,
+            'state': None,
+            'country': None,
+            'phone_number': "2374983247",
+            'email': "listone@nintendo.com"
+        }, org_obj)
+        self.v2 = create_volunteer_with_details({
+            'username': 'ListTwo',
+            'first_name': "List",
+            'last_name': "Two",
+            'address': "Mario Land",
+            'city': None,
+            'state': None,
+            'country': None,
+            'phone_number': "2374983247",
+            'email': "listtwo@nintendo.com"
+        }, org_obj)
+        today = date.today()
+        job = create_job_with_details({
+            'name': "List Job",
+            'start_date': today - timedelta(days=10),
+            'end_date': today + timedelta(days=10),
+            'description': "A job with shifts around today",
+            'event': e1
+        })
+        self.shift_list = []
+        for day, start_time in ((-2, "00:00"), (0, "00:00"), (0, "00:00"),
+                                (0, "23:59"), (2, "00:00")):
+            self.shift_list.append(create_shift_with_details({
+                'date': today + timedelta(days=day),
+                'start_time': start_time,
+                'end_time': "23:59",
+                'max_volunteers': 2,
+                'job': job,
+                'address': 'shift-address',
+                'venue': 'shift-venue'
+            }))
+        past, today_1, today_2, today_3, future = self.shift_list
+        for shift in (past, today_1, future):
+            register(self.v1.id, shift.id)
+        # only the other volunteer signed up for these
+        register(self.v2.id, today_2.id)
+        register(self.v2.id, today_3.id)
+
+    def test_get_future_shifts_by_volunteer_id(self):
+        past, today_1, today_2, today_3, future = self.shift_list
+        with self.assertNumQueries(1):
+            shift_list = list(get_future_shifts_by_volunteer_id(self.v1.id))
+            event_name_list = [shift.job.event.name for shift in shift_list]
+        self.assertEqual(shift_list, [today_1, future])
+        self.assertEqual(event_name_list, [e1.name, e1.name])
+
+    def test_get_unlogged_shifts_by_volunteer_id(self):
+        past, today_1, today_2, today_3, future = self.shift_list
+        add_shift_hours(self.v2.id, today_2.id, datetime.time(9),
+                        datetime.time(10))
+        with self.assertNumQueries(1):
+            shift_list = list(get_unlogged_shifts_by_volunteer_id(self.v1.id))
+            event_name_list = [shift.job.event.name for shift in shift_list]
+        self.assertEqual(shift_list, [past, today_1])
+        self.assertEqual(event_name_list, [e1.name, e1.name])
+
+        add_shift_hours(self.v1.id, past.id, datetime.time(9),
+                        datetime.time(10))
+        self.assertEqual(
+            list(get_unlogged_shifts_by_volunteer_id(self.v1.id)), [today_1])
+        self.assertEqual(
+            list(get_unlogged_shifts_by_volunteer_id(self.v2.id)), [today_3])
+
+    def test_get_volunteer_dashboard(self):
+        past, today_1, today_2, today_3, future = self.shift_list
+        add_shift_hours(self.v1.id, past.id, datetime.time(22),
+                        datetime.time(1, 30))
+        add_shift_hours(self.v2.id, today_2.id, datetime.time(9),
+                        datetime.time(10))
+        with self.assertNumQueries(1):
+            dashboard = get_volunteer_dashboard(self.v1.id)
+            event_name_list = [
+                shift.job.event.name
+                for shift in dashboard['upcoming_shift_list']
+            ]
+        self.assertEqual(dashboard['upcoming_shift_list'], [today_1, future])
+        self.assertEqual(event_name_list, [e1.name, e1.name])
+        self.assertEqual(dashboard['unlogged_shift_list'], [today_1])
+        self.assertEqual(
+            dashboard['logged_volunteer_shift_list'],
+            list(get_volunteer_shifts_with_hours(self.v1.id)))
+        self.assertEqual(dashboard['total_hours'], 3.5)
+
+        dashboard = get_volunteer_dashboard(self.v2.id)
+        self.assertEqual(dashboard['upcoming_shift_list'], [today_2, today_3])
+        self.assertEqual(dashboard['unlogged_shift_list'], [today_3])
+        self.assertEqual(dashboard['total_hours'], 1.0)
@@ -4,7 +4,8 @@ from django.conf.urls import url
 # local Django
 from shift import views
 from shift.views import (AddHoursView, AddHoursManagerView,
-                         ShiftCreateView, ShiftDeleteView,
+                         RecurringShiftCreateView, ShiftCreateView,
+                         ShiftDeleteView,
                          EditHoursView, ShiftUpdateView, ClearHoursManager,
                          EditHoursManagerView, EditRequestManagerView,
                          JobListView, ShiftListView, ManageVolunteerShiftView,
@@ -20,6 +21,9 @@ urlpatterns = [
         AddHoursManagerView.as_view(),
         name='add_hours_manager'),
     url(r'^create/(?P<job_id>\d+)$', ShiftCreateView.as_view(), name='create'),
+    url(r'^create_recurring/(?P<job_id>\d+)$',
+        RecurringShiftCreateView.as_view(),
+        name='create_recurring'),
     url(r'^cancel/(?P<shift_id>\d+)/(?P<volunteer_id>\d+)$',
         views.cancel,
         name='cancel'),
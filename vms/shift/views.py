@@ -10,7 +10,6 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.sites.shortcuts import get_current_site
 from django.core.exceptions import ObjectDoesNotExist
-from django.core.mail import send_mail
 from django.urls import reverse, reverse_lazy
 from django.http import Http404, HttpResponse, HttpResponseRedirect
 from django.shortcuts import render
@@ -20,45 +19,33 @@ from django.views.generic import TemplateView, DeleteView, ListView
 from django.views.generic.edit import FormView, UpdateView
 
 # local Django
+from administrator.utils import AdministratorLoginRequiredMixin
 from event.models import Event
 from job.models import Job
 from job.services import get_job_by_id
-from shift.forms import HoursForm, ShiftForm, EditForm
+from outbox.services import enqueue_mail
+from shift.forms import HoursForm, RecurringShiftForm, ShiftForm, EditForm
 from shift.models import Shift, EditRequest
 from shift.services import (get_shift_by_id, add_shift_hours,
                             cancel_shift_registration, clear_shift_hours,
                             get_future_shifts_by_volunteer_id,
                             edit_shift_hours, get_shift_slots_remaining,
-                            get_unlogged_shifts_by_volunteer_id,
                             get_logged_volunteers_by_shift_id, delete_shift,
                             get_volunteers_by_shift_id, get_volunteer_by_id,
-                            get_volunteer_shifts_with_hours,
+                            get_volunteer_dashboard,
                             get_shifts_ordered_by_date, register,
                             get_shifts_with_open_slots_for_volunteer,
-                            get_volunteer_shift_by_id, get_shifts_by_job_id)
+                            get_volunteer_shift_by_id, get_shifts_by_job_id,
+                            create_recurring_shifts)
 from volunteer.forms import SearchVolunteerForm
 from volunteer.models import Volunteer
-from volunteer.services import get_all_volunteers, search_volunteers
+from volunteer.services import (get_all_volunteers, search_volunteers,
+                                VOLUNTEER_ORDERING)
 from volunteer.utils import vol_id_check
+from vms.pagination import paginate_request
 from vms.utils import check_correct_volunteer
 
 
-class AdministratorLoginRequiredMixin(object):
-    @method_decorator(login_required)
-    def dispatch(self, request, *args, **kwargs):
-        user = request.user
-        admin = None
-        try:
-            admin = user.administrator
-        except ObjectDoesNotExist:
-            pass
-        if not admin:
-            return render(request, 'vms/no_admin_rights.html')
-        else:
-            return super(AdministratorLoginRequiredMixin, self).dispatch(
-                request, *args, **kwargs)
-
-
 class AddHoursView(LoginRequiredMixin, FormView):
     template_name = 'shift/add_hours.html'
     form_class = HoursForm
@@ -226,13 +213,10 @@ def cancel(request, shift_id, volunteer_id):
                             'shift_date': shift_object.date,
                         }
                     )
-                    try:
-                        send_mail(
-                            "Shift Cancelled", message,
-                            "messanger@localhost.com", [vol_email]
-                        )
-                    except Exception:
-                        raise Exception("There was an error in sending email.")
+                    enqueue_mail(
+                        "Shift Cancelled", message,
+                        "messanger@localhost.com", [vol_email]
+                    )
                     return HttpResponseRedirect(
                         reverse(
                             'shift:manage_volunteer_shifts',
@@ -329,6 +313,48 @@ class ShiftCreateView(AdministratorLoginRequiredMixin, FormView):
             })
 
 
+class RecurringShiftCreateView(AdministratorLoginRequiredMixin, FormView):
+    """
+    Creates the shifts of a job on chosen weekdays and times over a date
+    range in one go
+    """
+    template_name = 'shift/create_recurring.html'
+    form_class = RecurringShiftForm
+
+    def get_job(self):
+        if not hasattr(self, 'job'):
+            self.job = get_job_by_id(self.kwargs['job_id'])
+            if self.job is None:
+                raise Http404
+        return self.job
+
+    def get_form_kwargs(self):
+        kwargs = super(RecurringShiftCreateView, self).get_form_kwargs()
+        kwargs['job'] = self.get_job()
+        return kwargs
+
+    def get_context_data(self, **kwargs):
+        context = super(RecurringShiftCreateView,
+                        self).get_context_data(**kwargs)
+        job = self.get_job()
+        context['job_id'] = job.id
+        context['job'] = job
+        context['address'] = job.event.address
+        context['venue'] = job.event.venue
+        return context
+
+    def form_valid(self, form):
+        job = self.get_job()
+        count = create_recurring_shifts(
+            job, form.cleaned_data['dates'], form.cleaned_data['time_blocks'],
+            form.cleaned_data['max_volunteers'],
+            form.cleaned_data['address'], form.cleaned_data['venue'])
+        messages.add_message(self.request, messages.INFO,
+                             '{0} shifts created'.format(count))
+        return HttpResponseRedirect(
+            reverse('shift:list_shifts', args=(job.id, )))
+
+
 class ShiftDeleteView(AdministratorLoginRequiredMixin, DeleteView):
     model_form = Shift
     template_name = 'shift/delete.html'
@@ -463,16 +489,11 @@ class EditHoursView(LoginRequiredMixin, FormView):
                             'domain': site.domain,
                         }
                     )
-                    try:
-                        send_mail(
-                            "Edit request", message,
-                            "messanger@localhost.com",
-                            ["systerskeeper@gmail.com"]
-                        )
-                    except Exception:
-                        raise Exception(
-                            "There was an error in sending the email."
-                        )
+                    enqueue_mail(
+                        "Edit request", message,
+                        "messanger@localhost.com",
+                        ["systerskeeper@gmail.com"]
+                    )
                     volunteer_shift.edit_requested = True
                     volunteer_shift.save()
                     return HttpResponseRedirect(
@@ -552,13 +573,10 @@ class EditRequestManagerView(AdministratorLoginRequiredMixin, UpdateView):
                             'event': event
                         }
                     )
-                    try:
-                        send_mail(
-                            "Log Hours Edited", message,
-                            "messanger@localhost.com", [vol_email]
-                        )
-                    except Exception:
-                        raise Exception("There was an error in sending mail.")
+                    enqueue_mail(
+                        "Log Hours Edited", message,
+                        "messanger@localhost.com", [vol_email]
+                    )
                     return HttpResponseRedirect(
                         reverse(
                             'shift:manage_volunteer_shifts',
@@ -708,12 +726,12 @@ class ManageVolunteerShiftView(AdministratorLoginRequiredMixin, TemplateView):
             **kwargs)
         volunteer_id = self.kwargs['volunteer_id']
         context['volunteer'] = get_volunteer_by_id(volunteer_id)
-        context['upcoming_shift_list'] = \
-            get_future_shifts_by_volunteer_id(volunteer_id)
-        context['shift_list'] = \
-            get_unlogged_shifts_by_volunteer_id(volunteer_id)
+        dashboard = get_volunteer_dashboard(volunteer_id)
+        context['upcoming_shift_list'] = dashboard['upcoming_shift_list']
+        context['shift_list'] = dashboard['unlogged_shift_list']
         context['shift_list_with_hours'] = \
-            get_volunteer_shifts_with_hours(volunteer_id)
+            dashboard['logged_volunteer_shift_list']
+        context['total_hours'] = dashboard['total_hours']
         return context
 
 
@@ -766,16 +784,10 @@ def sign_up(request, shift_id, volunteer_id):
                                     'shift_date': shift_object.date,
                                 }
                             )
-                            try:
-                                send_mail(
-                                    "Shift Assigned", message,
-                                    "messanger@localhost.com", [vol_email],
-                                    fail_silently=False
-                                )
-                            except Exception:
-                                raise Exception(
-                                    "There was an error in sending email."
-                                )
+                            enqueue_mail(
+                                "Shift Assigned", message,
+                                "messanger@localhost.com", [vol_email]
+                            )
                             return HttpResponseRedirect(
                                 reverse(
                                     'shift:manage_volunteer_shifts',
@@ -815,10 +827,11 @@ class ViewHoursView(LoginRequiredMixin, FormView, TemplateView):
         context = super(ViewHoursView, self).get_context_data(**kwargs)
         volunteer_id = self.kwargs['volunteer_id']
         context['volunteer'] = get_volunteer_by_id(volunteer_id)
-        context['shift_list'] = \
-            get_unlogged_shifts_by_volunteer_id(volunteer_id)
+        dashboard = get_volunteer_dashboard(volunteer_id)
+        context['shift_list'] = dashboard['unlogged_shift_list']
         context['logged_volunteer_shift_list'] = \
-            get_volunteer_shifts_with_hours(volunteer_id)
+            dashboard['logged_volunteer_shift_list']
+        context['total_hours'] = dashboard['total_hours']
         context['init_date'] = timezone.now() - timedelta(days=7)
         return context
 
@@ -841,7 +854,10 @@ class VolunteerSearchView(AdministratorLoginRequiredMixin, FormView):
 
     def get_context_data(self, **kwargs):
         context = super(VolunteerSearchView, self).get_context_data(**kwargs)
-        context['volunteer_list'] = get_all_volunteers()
+        context['volunteer_list'] = paginate_request(
+            self.request, get_all_volunteers().select_related(
+                'city', 'state', 'country', 'organization'),
+            VOLUNTEER_ORDERING)
         context['has_searched'] = False
         return context
 
@@ -854,7 +870,11 @@ class VolunteerSearchView(AdministratorLoginRequiredMixin, FormView):
         organization = form.cleaned_data['organization']
 
         volunteer_list = search_volunteers(first_name, last_name, city, state,
-                                           country, organization)
+                                           country, organization, None, None)
+        volunteer_list = paginate_request(
+            self.request, volunteer_list.select_related(
+                'city', 'state', 'country', 'organization'),
+            VOLUNTEER_ORDERING)
         return render(self.request, 'shift/volunteer_search.html', {
             'form': form,
             'has_searched': True,
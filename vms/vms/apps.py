@@ -0,0 +1,31 @@
+# Django
+from django.apps import AppConfig, apps
+from django.db.models.signals import post_delete, post_migrate, post_save
+
+
+def create_trigram_indexes(sender, **kwargs):
+    from vms.trigram import create_trigram_indexes
+    create_trigram_indexes(sender.label)
+
+
+def invalidate_location_index(sender, **kwargs):
+    from vms.locations import invalidate_location_index
+    invalidate_location_index()
+
+
+class VmsConfig(AppConfig):
+    name = 'vms'
+
+    def ready(self):
+        # the FTS5 trigram tables of SQLite are created after the migration
+        # of the app of their table, the Postgres indexes by the migrations
+        # of this app
+        from vms.trigram import TRIGRAM_FIELDS
+        for app_label in {field[0] for field in TRIGRAM_FIELDS}:
+            post_migrate.connect(
+                create_trigram_indexes, sender=apps.get_app_config(app_label))
+
+        from cities_light.models import City, Country, Region
+        for model in (City, Country, Region):
+            post_save.connect(invalidate_location_index, sender=model)
+            post_delete.connect(invalidate_location_index, sender=model)
@@ -0,0 +1,374 @@
+# standard library
+import random
+from datetime import datetime, time, timedelta
+
+# Django
+from cities_light.models import City
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+# local Django
+from administrator.models import Administrator
+from event.feed import invalidate_event_feed
+from event.models import Event
+from job.models import Job
+from organization.models import Organization
+from shift.models import Report, ReportLine, Shift, VolunteerShift
+from shift.services import generate_report, get_total_hours_by
+from volunteer.models import Volunteer
+
+# synthetic organizations, administrators, volunteers, events, jobs,
+# shifts, sign ups and reports, inserted with bulk queries for load tests
+# and benchmarks
+
+# number of rows of each kind, the jobs per event, shifts per job and
+# shifts signed up for per volunteer, and the share of the volunteers with
+# logged shifts who reported them
+DATASET_SCALE = {
+    'organizations': 20,
+    'volunteers': 1000,
+    'events': 50,
+    'jobs': 5,
+    'shifts': 10,
+    'sign_ups': 5,
+    'report_share': 0.3,
+}
+
+# password of the generated administrators and volunteers
+DATASET_PASSWORD = 'dataset'
+
+# rows inserted per query, at most as many as the database takes
+DATASET_BATCH_SIZE = 1000
+
+FIRST_NAME_LIST = ['Ash', 'Misty', 'Brock', 'Gary', 'Dawn', 'May', 'Iris',
+                   'Serena', 'Clemont', 'Tracey', 'Cilan', 'Max', 'Lillie',
+                   'Kiawe', 'Lana', 'Sophocles', 'Mallow', 'Gladion']
+LAST_NAME_LIST = ['Ketchum', 'Waterflower', 'Harrison', 'Oak', 'Berlitz',
+                  'Maple', 'Sketchit', 'Yvonne', 'Meyer', 'Ivy', 'Kukui',
+                  'Birch', 'Rowan', 'Juniper', 'Sycamore', 'Elm']
+EVENT_NAME_LIST = ['Food Drive', 'Beach Cleanup', 'Coding Workshop',
+                   'Tree Planting', 'Charity Run', 'Book Fair',
+                   'Blood Donation Camp', 'Science Fair', 'Hackathon']
+JOB_NAME_LIST = ['Greeter', 'Cook', 'Driver', 'Mentor', 'Photographer',
+                 'Registration Desk', 'Setup Crew', 'First Aid', 'Cleanup']
+VENUE_LIST = ['Town Hall', 'Library', 'Community Center', 'City Park',
+              'School Gym', 'Riverside']
+
+# pending reports are the ones the administrators page through
+REPORT_STATUS_LIST = [0, 0, 0, 1, 2]
+
+
+def bulk_create(model, obj_list, batch_size=DATASET_BATCH_SIZE):
+    """
+    Inserts the objects with bulk_create, in batches no larger than the
+    database takes, which bulk_create does not check for a given size
+    """
+    fields = model._meta.concrete_fields
+    model.objects.bulk_create(obj_list, batch_size=min(
+        batch_size, max(connection.ops.bulk_batch_size(fields, obj_list), 1)))
+
+
+def bulk_create_with_ids(model, obj_list, batch_size=DATASET_BATCH_SIZE):
+    """
+    Inserts the objects with bulk_create and sets their ids, which not
+    every database returns for bulk inserts. The ids are read back as the
+    ones after the largest id before the insert, so nothing else should
+    insert into the table meanwhile.
+
+    :return: The objects
+    """
+    last_id = model.objects.aggregate(last_id=Max('pk'))['last_id'] or 0
+    bulk_create(model, obj_list, batch_size)
+    if obj_list and obj_list[0].pk is None:
+        id_list = model.objects.filter(pk__gt=last_id).order_by(
+            'pk').values_list('pk', flat=True)
+        for obj, pk in zip(obj_list, id_list):
+            obj.pk = pk
+    return obj_list
+
+
+def add_scale_arguments(parser):
+    """
+    Adds an option per count of DATASET_SCALE to the parser of a command
+    """
+    help_by_name = {
+        'organizations': 'Number of organizations, with an administrator each',
+        'volunteers': 'Number of volunteers',
+        'events': 'Number of events',
+        'jobs': 'Number of jobs per event',
+        'shifts': 'Number of shifts per job',
+        'sign_ups': 'Number of shifts each volunteer signs up for',
+        'report_share': 'Share of the volunteers who report their logged '
+                        'shifts',
+    }
+    for name, default in sorted(DATASET_SCALE.items()):
+        parser.add_argument(
+            '--{0}'.format(name.replace('_', '-')), type=type(default),
+            default=default, dest=name,
+            help='{0}, {1} if not given'.format(help_by_name[name], default))
+
+
+def get_scale(options):
+    """
+    :return: The counts of DATASET_SCALE given as options of a command
+    :raise: ValueError if a count is negative or the share is not between
+            0 and 1
+    """
+    scale = {name: options[name] for name in DATASET_SCALE}
+    if any(value < 0 for value in scale.values()):
+        raise ValueError('Counts should not be negative')
+    if scale['report_share'] > 1:
+        raise ValueError('The report share should be between 0 and 1')
+    return scale
+
+
+class DatasetGenerator(object):
+    """
+    Generates a dataset of the given scale. The same seed and scale give
+    the same rows, but for the dates, which are relative to today: half of
+    the events are over and half are upcoming. Past shifts are mostly
+    logged and some of the logged shifts are reported. The usernames and
+    emails start with the prefix, which has to be unused.
+    """
+
+    def __init__(self, prefix='dataset', seed=0,
+                 batch_size=DATASET_BATCH_SIZE, **scale):
+        """
+        :param scale: Counts overriding the ones of DATASET_SCALE
+        """
+        unknown = set(scale) - set(DATASET_SCALE)
+        if unknown:
+            raise ValueError(
+                'Unknown scale: {0}'.format(', '.join(sorted(unknown))))
+        self.scale = dict(DATASET_SCALE, **scale)
+        self.prefix = prefix
+        self.random = random.Random(seed)
+        self.batch_size = batch_size
+        self.today = timezone.now().date()
+
+        self.organization_list = []
+        self.administrator_list = []
+        self.volunteer_list = []
+        self.event_list = []
+        self.job_list = []
+        self.shift_list = []
+        self.volunteer_shift_list = []
+        self.report_list = []
+
+    def generate(self):
+        """
+        :return: The generator, with the lists of the created rows
+        :raise: ValueError if the prefix was used before
+        """
+        if User.objects.filter(
+                username__startswith='{0}-'.format(self.prefix)).exists():
+            raise ValueError(
+                'Users starting with {0} already exist'.format(self.prefix))
+
+        place_list = list(City.objects.select_related(
+            'region', 'country').order_by('id')[:50]) or [None]
+        password = make_password(DATASET_PASSWORD)
+        with transaction.atomic():
+            self.create_organizations()
+            self.create_administrators(password, place_list)
+            self.create_volunteers(password, place_list)
+            self.create_events(place_list)
+            self.create_jobs()
+            self.create_shifts()
+            self.create_volunteer_shifts()
+            self.create_reports()
+        # bulk queries send no signals
+        invalidate_event_feed()
+        return self
+
+    def get_counts(self):
+        """
+        :return: List of (name, number of rows) tuples
+        """
+        return [
+            ('organizations', len(self.organization_list)),
+            ('administrators', len(self.administrator_list)),
+            ('volunteers', len(self.volunteer_list)),
+            ('events', len(self.event_list)),
+            ('jobs', len(self.job_list)),
+            ('shifts', len(self.shift_list)),
+            ('volunteer shifts', len(self.volunteer_shift_list)),
+            ('reports', len(self.report_list)),
+        ]
+
+    def create_users(self, role, count, password):
+        user_list = [
+            User(username='{0}-{1}-{2}'.format(self.prefix, role, i),
+                 password=password,
+                 first_name=self.random.choice(FIRST_NAME_LIST),
+                 last_name=self.random.choice(LAST_NAME_LIST))
+            for i in range(count)
+        ]
+        for user in user_list:
+            user.email = '{0}@dataset.test'.format(user.username)
+        return bulk_create_with_ids(User, user_list, self.batch_size)
+
+    def get_person_fields(self, user, place):
+        return {
+            'user': user,
+            'first_name': user.first_name,
+            'last_name': user.last_name,
+            'email': user.email,
+            'address': '{0} Main Street'.format(self.random.randint(1, 999)),
+            'phone_number': '98{0:08d}'.format(
+                self.random.randint(0, 10 ** 8 - 1)),
+            'city': place,
+            'state': place.region if place else None,
+            'country': place.country if place else None,
+        }
+
+    def create_organizations(self):
+        self.organization_list = bulk_create_with_ids(Organization, [
+            Organization(name='{0} Org {1}'.format(self.prefix, i))
+            for i in range(self.scale['organizations'])
+        ], self.batch_size)
+
+    def create_administrators(self, password, place_list):
+        # one administrator per organization
+        user_list = self.create_users(
+            'admin', len(self.organization_list), password)
+        self.administrator_list = bulk_create_with_ids(Administrator, [
+            Administrator(
+                organization=organization,
+                **self.get_person_fields(user, self.random.choice(place_list)))
+            for user, organization in zip(user_list, self.organization_list)
+        ], self.batch_size)
+
+    def create_volunteers(self, password, place_list):
+        user_list = self.create_users(
+            'volunteer', self.scale['volunteers'], password)
+        volunteer_list = []
+        for user in user_list:
+            volunteer = Volunteer(
+                organization=(self.random.choice(self.organization_list)
+                              if self.organization_list else None),
+                reminder_days=self.random.randint(1, 7),
+                **self.get_person_fields(user, self.random.choice(place_list)))
+            # bulk_create does not call save, so the document is set here
+            volunteer.search_document = volunteer.get_search_document()
+            volunteer_list.append(volunteer)
+        self.volunteer_list = bulk_create_with_ids(
+            Volunteer, volunteer_list, self.batch_size)
+
+    def create_events(self, place_list):
+        event_list = []
+        for i in range(self.scale['events']):
+            place = self.random.choice(place_list)
+            start_date = self.today + timedelta(
+                days=self.random.randint(-365, 365))
+            event_list.append(Event(
+                name='{0} {1}'.format(self.random.choice(EVENT_NAME_LIST), i),
+                description='Generated event',
+                start_date=start_date,
+                end_date=start_date + timedelta(
+                    days=self.random.randint(0, 4)),
+                address='{0} Park Road'.format(self.random.randint(1, 999)),
+                venue=self.random.choice(VENUE_LIST),
+                city=place,
+                state=place.region if place else None,
+                country=place.country if place else None))
+        self.event_list = bulk_create_with_ids(
+            Event, event_list, self.batch_size)
+
+    def create_jobs(self):
+        self.job_list = bulk_create_with_ids(Job, [
+            Job(event=event, name=name, description='Generated job',
+                start_date=event.start_date, end_date=event.end_date)
+            for event in self.event_list
+            for name in self.random.sample(
+                JOB_NAME_LIST, min(self.scale['jobs'], len(JOB_NAME_LIST)))
+        ], self.batch_size)
+
+    def create_shifts(self):
+        shift_list = []
+        for job in self.job_list:
+            days = (job.end_date - job.start_date).days
+            for i in range(self.scale['shifts']):
+                start_hour = self.random.randint(8, 16)
+                shift = Shift(
+                    job=job,
+                    date=job.start_date + timedelta(
+                        days=self.random.randint(0, days)),
+                    start_time=time(start_hour),
+                    end_time=time(start_hour + self.random.randint(2, 6)),
+                    max_volunteers=self.random.randint(2, 10),
+                    address=job.event.address, venue=job.event.venue,
+                    city=job.event.city, state=job.event.state,
+                    country=job.event.country)
+                shift_list.append(shift)
+        self.shift_list = bulk_create_with_ids(
+            Shift, shift_list, self.batch_size)
+
+    def create_volunteer_shifts(self):
+        # volunteers sign up for shifts with open slots only
+        open_slot_list = [shift.max_volunteers for shift in self.shift_list]
+        volunteer_shift_list = []
+        for volunteer in self.volunteer_list:
+            reports = self.random.random() < self.scale['report_share']
+            open_index_list = [
+                index for index in self.random.sample(
+                    range(len(self.shift_list)),
+                    min(self.scale['sign_ups'] * 2, len(self.shift_list)))
+                if open_slot_list[index]
+            ][:self.scale['sign_ups']]
+            for index in open_index_list:
+                open_slot_list[index] -= 1
+                shift = self.shift_list[index]
+                volunteer_shift = VolunteerShift(
+                    volunteer=volunteer, shift=shift)
+                if shift.date < self.today and self.random.random() < 0.8:
+                    volunteer_shift.start_time = shift.start_time
+                    volunteer_shift.end_time = shift.end_time
+                    volunteer_shift.date_logged = timezone.make_aware(
+                        datetime.combine(shift.date, shift.end_time))
+                    volunteer_shift.report_status = reports
+                volunteer_shift_list.append(volunteer_shift)
+        self.volunteer_shift_list = bulk_create_with_ids(
+            VolunteerShift, volunteer_shift_list, self.batch_size)
+
+    def create_reports(self):
+        reported_by_volunteer = {}
+        for volunteer_shift in self.volunteer_shift_list:
+            if volunteer_shift.report_status:
+                reported_by_volunteer.setdefault(
+                    volunteer_shift.volunteer, []).append(volunteer_shift)
+
+        # the rows and totals are built as create_report builds them
+        hours_by_volunteer = get_total_hours_by(
+            'volunteer_id', report_status=True,
+            volunteer__user__username__startswith='{0}-'.format(self.prefix))
+        report_list = []
+        line_list = []
+        for volunteer, volunteer_shift_list in reported_by_volunteer.items():
+            row_list = generate_report(volunteer_shift_list)
+            report = Report(
+                volunteer=volunteer,
+                total_hrs=hours_by_volunteer[volunteer.pk],
+                confirm_status=self.random.choice(REPORT_STATUS_LIST),
+                date_submitted=max(
+                    row['date'] for row in row_list) + timedelta(days=1))
+            report_list.append(report)
+            line_list.append((report, volunteer_shift_list, row_list))
+        self.report_list = bulk_create_with_ids(
+            Report, report_list, self.batch_size)
+
+        through = Report.volunteer_shifts.through
+        bulk_create(through, [
+            through(report_id=report.pk, volunteershift_id=volunteer_shift.pk)
+            for report, volunteer_shift_list, row_list in line_list
+            for volunteer_shift in volunteer_shift_list
+        ], self.batch_size)
+        bulk_create(ReportLine, [
+            ReportLine(report_id=report.pk,
+                       volunteer_shift_id=volunteer_shift.pk, **row)
+            for report, volunteer_shift_list, row_list in line_list
+            for volunteer_shift, row in zip(volunteer_shift_list, row_list)
+        ], self.batch_size)
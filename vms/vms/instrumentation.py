@@ -0,0 +1,158 @@
+# standard library
+import json
+import logging
+import re
+import sys
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+# Django
+from django.conf import settings
+from django.db import connections
+
+# database work of each request, measured by SQLInstrumentationMiddleware
+# when SQL_INSTRUMENTATION is set
+
+# times a query has to repeat within a request to be reported as N+1
+N_PLUS_ONE_THRESHOLD = 5
+
+# most repeated queries written to the log line of a request
+MAX_REPORTED_QUERIES = 10
+
+logger = logging.getLogger('vms.sql')
+
+# literals and lists of literals, replaced to group the queries that only
+# differ in their parameters
+STRING_PATTERN = re.compile(r"'(?:[^']|'')*'")
+NUMBER_PATTERN = re.compile(r'\b\d+(?:\.\d+)?\b')
+LIST_PATTERN = re.compile(r'\((?:\s*(?:\?|%s)\s*,)+\s*(?:\?|%s)\s*\)')
+SPACE_PATTERN = re.compile(r'\s+')
+
+
+def get_fingerprint(sql):
+    """
+    :return: The query with its literals and parameter lists replaced by
+             placeholders
+    """
+    sql = STRING_PATTERN.sub('?', sql)
+    sql = NUMBER_PATTERN.sub('?', sql)
+    sql = LIST_PATTERN.sub('(...)', sql)
+    return SPACE_PATTERN.sub(' ', sql).strip()
+
+
+def is_project_file(filename):
+    """
+    :return: True if the file is a module of this project rather than of
+             Python, Django or another installed package
+    """
+    return (filename.startswith(settings.BASE_DIR) and
+            'site-packages' not in filename)
+
+
+def get_origin():
+    """
+    :return: module.function of the innermost services function in the
+             stack, or else of the innermost project function outside
+             this module, or None
+    """
+    project_origin = None
+    frame = sys._getframe(1)
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if module != __name__ and is_project_file(frame.f_code.co_filename):
+            origin = '{0}.{1}'.format(module, frame.f_code.co_name)
+            if module.endswith('services'):
+                return origin
+            if project_origin is None:
+                project_origin = origin
+        frame = frame.f_back
+    return project_origin
+
+
+class QueryRecorder(object):
+    """
+    Counts and times the queries run through it, as an execute wrapper of
+    the database connections
+    """
+
+    def __init__(self, threshold=N_PLUS_ONE_THRESHOLD):
+        self.threshold = threshold
+        self.count = 0
+        self.duration = 0
+        self.fingerprint_count = Counter()
+        self.origin_by_fingerprint = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            fingerprint = get_fingerprint(sql)
+            self.fingerprint_count[fingerprint] += 1
+            # the stack is only walked once a query repeats often enough
+            if self.fingerprint_count[fingerprint] == self.threshold:
+                self.origin_by_fingerprint[fingerprint] = get_origin()
+
+    def get_repeated_queries(self):
+        """
+        :return: List of dictionaries with the fingerprint, count and
+                 origin of the queries repeated at least threshold times,
+                 most repeated first
+        """
+        return [
+            {
+                'fingerprint': fingerprint,
+                'count': count,
+                'origin': self.origin_by_fingerprint.get(fingerprint),
+            }
+            for fingerprint, count in self.fingerprint_count.most_common()
+            if count >= self.threshold
+        ]
+
+
+class SQLInstrumentationMiddleware(object):
+    """
+    Records the number and total time of the queries of each request and
+    the queries it repeats, which usually are lazy loads in a loop. Writes
+    them to the vms.sql log as one JSON line and to the X-SQL-Queries,
+    X-SQL-Time and X-SQL-Repeated response headers. Queries run while a
+    streaming response is sent are not included.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder(getattr(
+            settings, 'SQL_N_PLUS_ONE_THRESHOLD', N_PLUS_ONE_THRESHOLD))
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        repeated_list = recorder.get_repeated_queries()
+        response['X-SQL-Queries'] = str(recorder.count)
+        response['X-SQL-Time'] = '{0:.2f}'.format(recorder.duration * 1000)
+        response['X-SQL-Repeated'] = str(len(repeated_list))
+
+        resolver_match = getattr(request, 'resolver_match', None)
+        record = {
+            'view': resolver_match.view_name if resolver_match else None,
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': recorder.count,
+            'sql_ms': round(recorder.duration * 1000, 2),
+            'total_ms': round(elapsed * 1000, 2),
+            'repeated': repeated_list[:MAX_REPORTED_QUERIES],
+        }
+        if repeated_list:
+            logger.warning(json.dumps(record))
+        else:
+            logger.info(json.dumps(record))
+        return response
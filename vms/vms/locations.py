@@ -0,0 +1,346 @@
+# standard library
+import bisect
+import hashlib
+import threading
+import time
+from collections import namedtuple
+
+# third party
+from unidecode import unidecode
+
+# Django
+from django.core.cache import cache
+from django.db import transaction
+from cities_light.models import City, Country, Region
+
+# countries, states and cities of the location dropdowns, read from the
+# cities_light tables once per process and answered from memory until
+# the tables change
+
+Location = namedtuple('Location', ['id', 'name'])
+
+# country, state and city model instances of a location picked in a form
+Place = namedtuple('Place', ['country', 'state', 'city'])
+
+# most cities suggested for a typed prefix
+CITY_SUGGESTION_LIMIT = 10
+
+# most places whose model instances are kept by an index
+PLACE_CACHE_SIZE = 1000
+
+# key of the version in the cache, which settings.CACHES shares between
+# the processes, changed on every write to the location tables so that the
+# other processes reload their index too
+VERSION_KEY = 'vms.locations.version'
+
+# seconds an index is used before the version is read from the cache
+# again, as reading it may cost a query
+VERSION_CHECK_INTERVAL = 5
+
+# seconds after which an index is reloaded, for writes the cache did not
+# carry to this process, e.g. with a per process cache backend
+INDEX_TIMEOUT = 60 * 60
+
+
+class LocationIndex(object):
+    """
+    Countries, states by country and cities by country and state, each
+    sorted by name, and the country and state of each state and city
+    """
+
+    def __init__(self, version=None):
+        self.version = version
+        self.loaded_at = self.checked_at = time.monotonic()
+        # model instances of the places resolved from this index
+        self.place_cache = {}
+        digest = hashlib.sha1()
+
+        self.country_list = []
+        self.country_ids_by_name = {}
+        # name of each country, state and city by id
+        self.country_names = {}
+        self.state_names = {}
+        self.city_names = {}
+        for country_id, name in Country.objects.order_by(
+                'name', 'id').values_list('id', 'name'):
+            self.country_list.append(Location(country_id, name))
+            self.country_ids_by_name.setdefault(name, country_id)
+            self.country_names[country_id] = name
+            digest.update('c{0}:{1};'.format(country_id, name).encode())
+        self.country_ids = set(self.country_ids_by_name.values())
+
+        self.states_by_country = {}
+        self.state_countries = {}
+        self.state_ids_by_name = {}
+        for region_id, name, country_id in Region.objects.order_by(
+                'name', 'id').values_list('id', 'name', 'country_id'):
+            self.state_names[region_id] = name
+            self.states_by_country.setdefault(country_id, []).append(
+                Location(region_id, name))
+            self.state_countries[region_id] = country_id
+            self.state_ids_by_name.setdefault((country_id, name), region_id)
+            digest.update('r{0}:{1}:{2};'.format(
+                region_id, name, country_id).encode())
+
+        self.cities_by_country = {}
+        self.cities_by_state = {}
+        # (country id, state id) of each city
+        self.city_parents = {}
+        # (city id, state id) rows of each country and city name
+        self.city_ids_by_name = {}
+        # sorted (normalized name, city, state name) rows for prefix lookups
+        self.city_keys_by_country = {}
+        self.city_keys_by_state = {}
+        for city_id, name, country_id, region_id in City.objects.order_by(
+                'name', 'id').values_list(
+                    'id', 'name', 'country_id', 'region_id'):
+            city = Location(city_id, name)
+            self.city_names[city_id] = name
+            self.cities_by_country.setdefault(country_id, []).append(city)
+            self.cities_by_state.setdefault(region_id, []).append(city)
+            self.city_parents[city_id] = (country_id, region_id)
+            self.city_ids_by_name.setdefault(
+                (country_id, name), []).append((city_id, region_id))
+            key = (normalize_name(name), city, self.state_names.get(region_id))
+            self.city_keys_by_country.setdefault(country_id, []).append(key)
+            self.city_keys_by_state.setdefault(region_id, []).append(key)
+            digest.update('t{0}:{1}:{2}:{3};'.format(
+                city_id, name, country_id, region_id).encode())
+
+        for key_list in (list(self.city_keys_by_country.values()) +
+                         list(self.city_keys_by_state.values())):
+            key_list.sort()
+
+        # the same rows give the same etag in every process
+        self.etag = digest.hexdigest()
+
+    def get_country_id(self, country):
+        """
+        :param country: Id or name of the country, as sent by a form
+        :return: Id of the country, or None if there is no such country
+        """
+        country_id = parse_id(country)
+        if country_id is None:
+            return self.country_ids_by_name.get(country)
+        if country_id in self.country_ids:
+            return country_id
+        return None
+
+    def get_state_id(self, country_id, state):
+        """
+        :param state: Id or name of a state of the country
+        :return: Id of the state, or None if the country has no such state
+        """
+        state_id = parse_id(state)
+        if state_id is None:
+            return self.state_ids_by_name.get((country_id, state))
+        if self.state_countries.get(state_id) == country_id:
+            return state_id
+        return None
+
+    def get_city_id(self, country_id, state_id, city):
+        """
+        :param state_id: Id of the state of the city, or None for any city
+                         of the country
+        :param city: Id or name of a city of the country and state
+        :return: Id of the city, or None if there is no such city or the
+                 name is shared by more than one
+        """
+        city_id = parse_id(city)
+        if city_id is None:
+            city_id_list = [
+                city_id for city_id, region_id in self.city_ids_by_name.get(
+                    (country_id, city), [])
+                if state_id is None or region_id == state_id]
+            if len(city_id_list) == 1:
+                return city_id_list[0]
+            return None
+        parents = self.city_parents.get(city_id)
+        if parents is not None and parents[0] == country_id and (
+                state_id is None or parents[1] == state_id):
+            return city_id
+        return None
+
+    def get_place_names(self, country_id, state_id=None, city_id=None):
+        """
+        :return: Place of the names of the country, state and city, empty
+                 for the missing ids
+        """
+        return Place(self.country_names.get(country_id, ''),
+                     self.state_names.get(state_id, ''),
+                     self.city_names.get(city_id, ''))
+
+    def get_states(self, country_id):
+        return self.states_by_country.get(country_id, [])
+
+    def get_cities(self, country_id, state_id=None):
+        """
+        :param state_id: Id of the state, or None for all cities of the
+                         country
+        """
+        if state_id is None:
+            return self.cities_by_country.get(country_id, [])
+        if self.state_countries.get(state_id) != country_id:
+            return []
+        return self.cities_by_state.get(state_id, [])
+
+    def suggest_cities(self, prefix, country_id, state_id=None,
+                       limit=CITY_SUGGESTION_LIMIT):
+        """
+        Finds the cities whose name starts with the prefix, ignoring case
+        and accents, with a binary search of the sorted names
+
+        :param state_id: Id of the state, or None for all cities of the
+                         country
+        :return: List of (city, state name) tuples sorted by name
+        """
+        if state_id is None:
+            key_list = self.city_keys_by_country.get(country_id, [])
+        elif self.state_countries.get(state_id) == country_id:
+            key_list = self.city_keys_by_state.get(state_id, [])
+        else:
+            key_list = []
+        prefix = normalize_name(prefix)
+        suggestion_list = []
+        if not prefix:
+            return suggestion_list
+        start = bisect.bisect_left(key_list, (prefix,))
+        for name, city, state in key_list[start:start + limit]:
+            if not name.startswith(prefix):
+                break
+            suggestion_list.append((city, state))
+        return suggestion_list
+
+    def get_place(self, country_id, state_id=None, city_id=None):
+        """
+        Loads the country, state and city of valid ids with one query, or
+        none for the places resolved before
+
+        :return: Place of model instances, None for the missing ids
+        """
+        key = (country_id, state_id, city_id)
+        place = self.place_cache.get(key)
+        if place is not None:
+            return place
+
+        place = Place(None, None, None)
+        if city_id is not None:
+            city = City.objects.select_related('region', 'country').filter(
+                pk=city_id).first()
+            if city is not None:
+                place = Place(city.country, city.region, city)
+        elif state_id is not None:
+            state = Region.objects.select_related('country').filter(
+                pk=state_id).first()
+            if state is not None:
+                place = Place(state.country, state, None)
+        elif country_id is not None:
+            place = Place(
+                Country.objects.filter(pk=country_id).first(), None, None)
+
+        if len(self.place_cache) >= PLACE_CACHE_SIZE:
+            self.place_cache.clear()
+        self.place_cache[key] = place
+        return place
+
+
+def parse_id(value):
+    """
+    :return: The id in a form value, or None if the value is a name
+    """
+    if isinstance(value, int):
+        return value
+    if value and value.isdigit():
+        return int(value)
+    return None
+
+
+def normalize_name(name):
+    """
+    Lower case ASCII form of a place name, e.g. "Zürich" gives "zurich"
+    """
+    return ' '.join(unidecode(name).lower().split())
+
+
+location_index = None
+location_index_lock = threading.Lock()
+
+
+def get_location_index():
+    """
+    Returns the location index of the process, loading it again when the
+    location tables changed or it timed out
+    """
+    global location_index
+    index = location_index
+    now = time.monotonic()
+    if index is not None and now - index.checked_at < VERSION_CHECK_INTERVAL:
+        return index
+    version = cache.get(VERSION_KEY)
+    if (index is not None and index.version == version and
+            now - index.loaded_at < INDEX_TIMEOUT):
+        index.checked_at = now
+        return index
+
+    with location_index_lock:
+        index = location_index
+        if (index is None or index.version != version or
+                time.monotonic() - index.loaded_at >= INDEX_TIMEOUT):
+            index = LocationIndex(version)
+            location_index = index
+    return index
+
+
+def invalidate_location_index():
+    """
+    Makes every process reload its location index. Connected to the saves
+    and deletes of the cities_light models, which include their import.
+    """
+    global location_index
+    location_index = None
+    # after the commit, so that no process reloads the old rows
+    transaction.on_commit(lambda: cache.set(VERSION_KEY, time.time(), None))
+
+
+def resolve_location(country, state=None, city=None):
+    """
+    Resolves the location picked in a form. The state has to be in the
+    country and the city in the country and state; the parts that are not
+    and the parts under them are left empty. Checked in the location index,
+    so only the instances of a place not resolved before are queried.
+
+    :param country: Id or name of the country
+    :param state: Id or name of the state, empty or '0' for none
+    :param city: Id or name of the city, a name shared by more than one
+                 city of the country and state is left empty
+    :return: Place of the country, state and city model instances
+    """
+    index = get_location_index()
+    country_id = index.get_country_id(country)
+    if country_id is None:
+        return Place(None, None, None)
+
+    state_id = None
+    if state and state != '0':
+        state_id = index.get_state_id(country_id, state)
+        if state_id is None:
+            return index.get_place(country_id)
+
+    city_id = None
+    if city and city != '0':
+        city_id = index.get_city_id(country_id, state_id, city)
+    return index.get_place(country_id, state_id, city_id)
+
+
+def resolve_posted_location(data):
+    """
+    Resolves the location posted by a form with the location dropdowns.
+    The city is taken from the id load_city.js sets when a suggestion is
+    picked, and from the typed name otherwise.
+
+    :param data: POST data of the request
+    :return: Place of the country, state and city model instances
+    """
+    return resolve_location(
+        data.get('country'), data.get('state'),
+        data.get('city_id') or data.get('city'))
@@ -0,0 +1,188 @@
+# standard library
+import json
+import time
+from collections import Counter
+from statistics import median
+
+# Django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+
+# local Django
+from vms.dataset import DatasetGenerator, add_scale_arguments, get_scale
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ('Requests the pages volunteers and administrators use most with '
+            'the test client on a generated dataset and reports the median '
+            'time and the queries of each. Compares them with a baseline '
+            'file when given. All rows are rolled back.')
+
+    def add_arguments(self, parser):
+        add_scale_arguments(parser)
+        parser.add_argument(
+            '--repeat', type=int, default=10, dest='repeat',
+            help='Number of timed requests per page')
+        parser.add_argument(
+            '--seed', type=int, default=0, dest='seed',
+            help='Seed of the random values of the dataset')
+        parser.add_argument(
+            '--baseline', dest='baseline',
+            help='JSON file of earlier results to compare with')
+        parser.add_argument(
+            '--save-baseline', action='store_true', dest='save_baseline',
+            help='Write the results to the baseline file instead')
+        parser.add_argument(
+            '--tolerance', type=float, default=0.25, dest='tolerance',
+            help='Share a page may be slower than its baseline before it '
+                 'counts as a regression')
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('Repeat should be at least 1')
+        if options['save_baseline'] and not options['baseline']:
+            raise CommandError('Give the baseline file to save to')
+        try:
+            scale = get_scale(options)
+        except ValueError as error:
+            raise CommandError(error)
+        if min(scale['volunteers'], scale['events'], scale['jobs'],
+               scale['shifts'], scale['organizations']) < 1:
+            raise CommandError('Every count should be at least 1')
+
+        baseline = None
+        if options['baseline'] and not options['save_baseline']:
+            try:
+                with open(options['baseline']) as baseline_file:
+                    baseline = json.load(baseline_file)
+            except (OSError, ValueError) as error:
+                raise CommandError(
+                    'Could not read the baseline: {0}'.format(error))
+            if baseline.get('scale') != scale:
+                self.stderr.write(
+                    'The baseline was measured at another scale: {0}'.format(
+                        baseline.get('scale')))
+
+        try:
+            with transaction.atomic():
+                result_by_name = self.run(
+                    scale, options['seed'], options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+        if options['save_baseline']:
+            with open(options['baseline'], 'w') as baseline_file:
+                json.dump({'scale': scale, 'views': result_by_name},
+                          baseline_file, indent=2, sort_keys=True)
+            self.stdout.write('Saved the baseline to {0}'.format(
+                options['baseline']))
+        elif baseline is not None:
+            regression_list = self.compare(
+                result_by_name, baseline.get('views', {}),
+                options['tolerance'])
+            if regression_list:
+                raise CommandError(
+                    'Regressed against the baseline: {0}'.format(
+                        ', '.join(regression_list)))
+
+    def run(self, scale, seed, repeat):
+        generator = DatasetGenerator(
+            'benchmark', seed, **scale).generate()
+        # the busiest volunteer, with the job that ends last
+        sign_up_count = Counter(
+            volunteer_shift.volunteer_id
+            for volunteer_shift in generator.volunteer_shift_list)
+        volunteer = max(
+            generator.volunteer_list,
+            key=lambda volunteer: sign_up_count[volunteer.pk])
+        job = max(generator.job_list, key=lambda job: job.end_date)
+        administrator = generator.administrator_list[0]
+
+        case_list = [
+            ('event:list_sign_up', volunteer.user, 'get',
+             reverse('event:list_sign_up', args=[volunteer.pk]), None),
+            ('shift:list_shifts_sign_up', volunteer.user, 'get',
+             reverse('shift:list_shifts_sign_up', args=[job.pk, volunteer.pk]),
+             None),
+            ('shift:view_hours', volunteer.user, 'get',
+             reverse('shift:view_hours', args=[volunteer.pk]), None),
+            ('volunteer:search', administrator.user, 'get',
+             reverse('volunteer:search'), None),
+            ('volunteer:search by name', administrator.user, 'post',
+             reverse('volunteer:search'), {'first_name': 'Ash'}),
+            ('administrator:report', administrator.user, 'get',
+             reverse('administrator:report'), None),
+        ]
+
+        self.stdout.write('{0:<28} {1:>12} {2:>8}'.format(
+            'page', 'median (ms)', 'queries'))
+        result_by_name = {}
+        client_by_user = {}
+        # the test client is answered as testserver
+        with override_settings(
+                ALLOWED_HOSTS=list(settings.ALLOWED_HOSTS) + ['testserver']):
+            for name, user, method, url, data in case_list:
+                if user not in client_by_user:
+                    client_by_user[user] = Client()
+                    client_by_user[user].force_login(user)
+                result_by_name[name] = self.measure(
+                    name, getattr(client_by_user[user], method), url, data,
+                    repeat)
+        return result_by_name
+
+    def measure(self, name, request, url, data, repeat):
+        query_count = [0]
+
+        def count_query(execute, sql, params, many, context):
+            query_count[0] += 1
+            return execute(sql, params, many, context)
+
+        # the first request fills the caches and checks the page works
+        response = request(url, data)
+        if response.status_code != 200:
+            raise CommandError('{0} answered with status {1}'.format(
+                name, response.status_code))
+
+        timing_list = []
+        for i in range(repeat):
+            query_count[0] = 0
+            with connection.execute_wrapper(count_query):
+                start = time.perf_counter()
+                request(url, data)
+                timing_list.append((time.perf_counter() - start) * 1000)
+        result = {
+            'median_ms': round(median(timing_list), 2),
+            'queries': query_count[0],
+        }
+        self.stdout.write('{0:<28} {1:>12.2f} {2:>8}'.format(
+            name, result['median_ms'], result['queries']))
+        return result
+
+    def compare(self, result_by_name, baseline_by_name, tolerance):
+        """
+        :return: Names of the pages slower than their baseline by more
+                 than the tolerance or with more queries
+        """
+        self.stdout.write('{0:<28} {1:>12} {2:>8} {3:>8}'.format(
+            'baseline', 'median (ms)', 'queries', 'change'))
+        regression_list = []
+        for name, result in result_by_name.items():
+            baseline = baseline_by_name.get(name)
+            if baseline is None:
+                self.stdout.write('{0:<28} {1:>12}'.format(name, 'none'))
+                continue
+            change = result['median_ms'] / baseline['median_ms'] - 1
+            self.stdout.write('{0:<28} {1:>12.2f} {2:>8} {3:>+7.0%}'.format(
+                name, baseline['median_ms'], baseline['queries'], change))
+            if (change > tolerance or
+                    result['queries'] > baseline['queries']):
+                regression_list.append(name)
+        return regression_list
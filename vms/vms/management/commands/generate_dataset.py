@@ -0,0 +1,46 @@
+# standard library
+import time
+
+# Django
+from django.core.management.base import BaseCommand, CommandError
+
+# local Django
+from vms.dataset import (DATASET_BATCH_SIZE, DATASET_PASSWORD,
+                         DatasetGenerator, add_scale_arguments, get_scale)
+
+
+class Command(BaseCommand):
+    help = ('Generates organizations, administrators, volunteers, events, '
+            'jobs, shifts, sign ups and reports with bulk inserts, for load '
+            'testing. The generated users log in with the password {0}.'
+            .format(DATASET_PASSWORD))
+
+    def add_arguments(self, parser):
+        add_scale_arguments(parser)
+        parser.add_argument(
+            '--prefix', default='dataset', dest='prefix',
+            help='Start of the generated usernames, which has to be unused')
+        parser.add_argument(
+            '--seed', type=int, default=0, dest='seed',
+            help='Seed of the random values')
+        parser.add_argument(
+            '--batch-size', type=int, default=DATASET_BATCH_SIZE,
+            dest='batch_size',
+            help='Number of rows inserted per query')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('Batch size should be at least 1')
+        try:
+            generator = DatasetGenerator(
+                options['prefix'], options['seed'], options['batch_size'],
+                **get_scale(options))
+            start = time.perf_counter()
+            generator.generate()
+        except ValueError as error:
+            raise CommandError(error)
+        elapsed = time.perf_counter() - start
+
+        for name, count in generator.get_counts():
+            self.stdout.write('{0:<18} {1:>10}'.format(name, count))
+        self.stdout.write('Generated in {0:.2f}s'.format(elapsed))
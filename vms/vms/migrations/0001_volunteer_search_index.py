@@ -0,0 +1,46 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Full text and trigram indexes of the volunteer search on Postgres. The
+    volunteer migrations are generated by makemigrations, so the indexes
+    live in this app, after the latest volunteer migration. SQLite gets an
+    FTS5 table from volunteer.search.create_search_index instead.
+    """
+
+    dependencies = [
+        ('cities_light', '__latest__'),
+        ('organization', '__latest__'),
+        ('volunteer', '__latest__'),
+    ]
+
+    operations = [
+        # kept when migrating back, as it may have been installed before by
+        # a superuser and other databases of the template share it
+        migrations.RunSQL(
+            "CREATE EXTENSION IF NOT EXISTS pg_trgm", migrations.RunSQL.noop),
+        # the documents of the volunteers saved before the field existed,
+        # as volunteer.search.get_search_document_expression builds them
+        migrations.RunSQL(
+            "UPDATE volunteer_volunteer SET search_document = "
+            "COALESCE(first_name, '') || ' ' || COALESCE(last_name, '') "
+            "|| ' ' || COALESCE((SELECT name FROM cities_light_city "
+            "WHERE id = city_id), '') "
+            "|| ' ' || COALESCE((SELECT name FROM cities_light_region "
+            "WHERE id = state_id), '') "
+            "|| ' ' || COALESCE((SELECT name FROM cities_light_country "
+            "WHERE id = country_id), '') "
+            "|| ' ' || COALESCE((SELECT name FROM organization_organization "
+            "WHERE id = organization_id), '')",
+            migrations.RunSQL.noop),
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS volunteer_search_tsv_idx "
+            "ON volunteer_volunteer "
+            "USING GIN (to_tsvector('simple', search_document))",
+            "DROP INDEX IF EXISTS volunteer_search_tsv_idx"),
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS volunteer_search_trgm_idx "
+            "ON volunteer_volunteer USING GIN (search_document gin_trgm_ops)",
+            "DROP INDEX IF EXISTS volunteer_search_trgm_idx"),
+    ]
@@ -0,0 +1,44 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Trigram indexes of the name columns of vms.trigram.TRIGRAM_FIELDS on
+    Postgres, which icontains lookups on UPPER(name) use. SQLite gets FTS5
+    tables from vms.trigram.create_trigram_indexes instead.
+    """
+
+    dependencies = [
+        ('cities_light', '__latest__'),
+        ('event', '__latest__'),
+        ('job', '__latest__'),
+        ('vms', '0001_volunteer_search_index'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS cities_light_city_name_trgm_idx "
+            "ON cities_light_city "
+            "USING GIN (UPPER(name::text) gin_trgm_ops)",
+            "DROP INDEX IF EXISTS cities_light_city_name_trgm_idx"),
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS cities_light_region_name_trgm_idx "
+            "ON cities_light_region "
+            "USING GIN (UPPER(name::text) gin_trgm_ops)",
+            "DROP INDEX IF EXISTS cities_light_region_name_trgm_idx"),
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS cities_light_country_name_trgm_idx "
+            "ON cities_light_country "
+            "USING GIN (UPPER(name::text) gin_trgm_ops)",
+            "DROP INDEX IF EXISTS cities_light_country_name_trgm_idx"),
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS event_event_name_trgm_idx "
+            "ON event_event "
+            "USING GIN (UPPER(name::text) gin_trgm_ops)",
+            "DROP INDEX IF EXISTS event_event_name_trgm_idx"),
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS job_job_name_trgm_idx "
+            "ON job_job "
+            "USING GIN (UPPER(name::text) gin_trgm_ops)",
+            "DROP INDEX IF EXISTS job_job_name_trgm_idx"),
+    ]
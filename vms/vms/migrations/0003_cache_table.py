@@ -0,0 +1,21 @@
+from django.core.management import call_command
+from django.db import migrations
+
+
+def create_cache_table(apps, schema_editor):
+    call_command('createcachetable', database=schema_editor.connection.alias)
+
+
+class Migration(migrations.Migration):
+    """
+    Table of the database cache of settings.CACHES, which the processes
+    serving the site share. Nothing is created for other cache backends.
+    """
+
+    dependencies = [
+        ('vms', '0002_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_cache_table, migrations.RunPython.noop),
+    ]
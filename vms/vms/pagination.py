@@ -0,0 +1,200 @@
+# standard library
+import base64
+import binascii
+import datetime
+import decimal
+import json
+
+# Django
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+# number of rows shown on a page of an admin list
+PAGE_SIZE = 50
+
+
+class KeysetPage(object):
+    """
+    One page of a keyset paginated queryset. It can be iterated like the
+    queryset and carries the cursors of the neighbouring pages.
+    """
+
+    def __init__(self, object_list, ordering, has_next, has_previous):
+        self.object_list = object_list
+        self.ordering = ordering
+        self.has_next = has_next
+        self.has_previous = has_previous
+        # set by paginate_request so that the page links repeat the query
+        self.cursor_param = 'cursor'
+        self.method = 'get'
+        self.params = []
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    @property
+    def has_other_pages(self):
+        return self.has_next or self.has_previous
+
+    @property
+    def next_cursor(self):
+        if self.has_next and self.object_list:
+            return encode_cursor(
+                'n', get_keys(self.object_list[-1], self.ordering))
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self.has_previous and self.object_list:
+            return encode_cursor(
+                'p', get_keys(self.object_list[0], self.ordering))
+        return None
+
+
+def get_field_name(ordering_field):
+    return ordering_field.lstrip('-')
+
+
+def get_keys(obj, ordering):
+    """
+    :param obj: Model instance, or dictionary of a values() queryset
+    """
+    keys = []
+    for field in ordering:
+        if isinstance(obj, dict):
+            keys.append(obj[get_field_name(field)])
+            continue
+        value = obj
+        for attribute in get_field_name(field).split('__'):
+            value = getattr(value, attribute)
+        keys.append(value)
+    return keys
+
+
+def get_model_field(model, field_name):
+    field = None
+    for name in field_name.split('__'):
+        field = model._meta.get_field(name)
+        if field.is_relation:
+            model = field.related_model
+    return field
+
+
+def encode_value(value):
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    return value
+
+
+def encode_cursor(direction, keys):
+    data = json.dumps([direction, [encode_value(key) for key in keys]])
+    return base64.urlsafe_b64encode(data.encode()).decode()
+
+
+def decode_cursor(cursor, model, ordering):
+    """
+    :return: Tuple of the direction and the sort keys of the cursor, or
+             None if the cursor is not valid for the ordering
+    """
+    try:
+        direction, keys = json.loads(
+            base64.urlsafe_b64decode(cursor.encode()).decode())
+        if direction not in ('n', 'p') or len(keys) != len(ordering):
+            return None
+        keys = [
+            get_model_field(model, get_field_name(field)).to_python(key)
+            for field, key in zip(ordering, keys)
+        ]
+    except (binascii.Error, TypeError, ValueError, ValidationError):
+        return None
+    return direction, keys
+
+
+def get_seek_filter(ordering, keys, forward):
+    """
+    Builds the filter for the rows after (or before) the given sort keys,
+    that is (a > x) | (a = x & b > y) | ... with the comparison flipped
+    for descending fields
+    """
+    seek_filter = Q()
+    for i, field in enumerate(ordering):
+        descending = field.startswith('-')
+        lookup = 'gt' if descending != forward else 'lt'
+        clause = Q(**{
+            '{0}__{1}'.format(get_field_name(field), lookup): keys[i]})
+        for previous_field, key in zip(ordering[:i], keys[:i]):
+            clause &= Q(**{get_field_name(previous_field): key})
+        seek_filter |= clause
+    return seek_filter
+
+
+def reverse_ordering(ordering):
+    return [
+        get_field_name(field) if field.startswith('-') else '-' + field
+        for field in ordering
+    ]
+
+
+def paginate(queryset, ordering, cursor=None, page_size=PAGE_SIZE):
+    """
+    Returns a page of the queryset sorted by ordering, starting after (or
+    ending before) the row the cursor points at. The cost of a page does
+    not depend on how far into the list it is, as the rows are found with
+    a filter on the sort keys instead of an offset.
+
+    :param ordering: Sequence of field names as for order_by, the last of
+                     which has to be unique, e.g. ('name', 'id')
+    :param cursor: next_cursor or previous_cursor of another page, or None
+                   for the first page
+    :return: KeysetPage
+    """
+    ordering = list(ordering)
+    decoded = None
+    if cursor:
+        decoded = decode_cursor(cursor, queryset.model, ordering)
+
+    if decoded is None:
+        object_list = list(queryset.order_by(*ordering)[:page_size + 1])
+        return KeysetPage(object_list[:page_size], ordering,
+                          len(object_list) > page_size, False)
+
+    direction, keys = decoded
+    if direction == 'n':
+        object_list = list(queryset.filter(
+            get_seek_filter(ordering, keys, True)).order_by(
+                *ordering)[:page_size + 1])
+        return KeysetPage(object_list[:page_size], ordering,
+                          len(object_list) > page_size, True)
+
+    object_list = list(queryset.filter(
+        get_seek_filter(ordering, keys, False)).order_by(
+            *reverse_ordering(ordering))[:page_size + 1])
+    has_previous = len(object_list) > page_size
+    object_list = object_list[:page_size]
+    object_list.reverse()
+    return KeysetPage(object_list, ordering, True, has_previous)
+
+
+def paginate_request(request, queryset, ordering, cursor_param='cursor',
+                     page_size=PAGE_SIZE):
+    """
+    Paginates the queryset with the cursor sent in the request. The page
+    keeps the other request parameters so that its links repeat a search.
+    """
+    data = request.POST if request.method == 'POST' else request.GET
+    page = paginate(queryset, ordering, data.get(cursor_param), page_size)
+    page.cursor_param = cursor_param
+    page.method = request.method.lower()
+    page.params = [
+        (key, value) for key in data for value in data.getlist(key)
+        if key not in (cursor_param, 'csrfmiddlewaretoken')
+    ]
+    return page
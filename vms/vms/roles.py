@@ -0,0 +1,44 @@
+# standard library
+from collections import namedtuple
+
+# Django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+# the volunteer and administrator of the logged in user, loaded with the
+# user by RoleBackend so that checking them costs no queries
+
+Role = namedtuple('Role', ['volunteer', 'administrator'])
+
+UserModel = get_user_model()
+
+
+class RoleBackend(ModelBackend):
+    """
+    Authenticates like ModelBackend, but loads the user of each request
+    with their volunteer and administrator in one joined query
+    """
+
+    def get_user(self, user_id):
+        try:
+            user = UserModel._default_manager.select_related(
+                'volunteer', 'administrator').get(pk=user_id)
+        except UserModel.DoesNotExist:
+            return None
+        return user if self.user_can_authenticate(user) else None
+
+
+def get_role(request):
+    """
+    :return: Role of the user of the request, cached on the request. Its
+             volunteer and administrator are None if the user is not one.
+    """
+    if not hasattr(request, '_cached_role'):
+        user = request.user
+        if user.is_authenticated:
+            request._cached_role = Role(
+                getattr(user, 'volunteer', None),
+                getattr(user, 'administrator', None))
+        else:
+            request._cached_role = Role(None, None)
+    return request._cached_role
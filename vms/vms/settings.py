@@ -34,6 +34,7 @@ INSTALLED_APPS = (
     'home',
     'job',
     'organization',
+    'outbox',
     'registration',
     'shift',
     'volunteer',
@@ -121,6 +122,24 @@ FILE_UPLOAD_PERMISSIONS = 0o740
 
 FILE_UPLOAD_DIRECTORY_PERMISSIONS = 0o740
 
+# the event feed and the location index keep their versions in the cache,
+# so every process serving the site has to share it. The database cache
+# needs no other service, its table is created by the vms migrations.
+CACHES = {
+    'default': {
+        'BACKEND': config(
+            'CACHE_BACKEND',
+            default='django.core.cache.backends.db.DatabaseCache'),
+        'LOCATION': config('CACHE_LOCATION', default='vms_cache'),
+    }
+}
+
+# users are loaded with their volunteer and administrator, which the
+# permission checks of the views use. ModelBackend loads the users of the
+# sessions started before RoleBackend was added.
+AUTHENTICATION_BACKENDS = ['vms.roles.RoleBackend',
+                           'django.contrib.auth.backends.ModelBackend']
+
 # If user fails to authenticate, then they are redirected to the view
 # specified in the reverse_lazy call
 LOGIN_URL = reverse_lazy('authentication:login_process')
@@ -134,6 +153,22 @@ if DEBUG:
     EMAIL_PORT = config('EMAIL_PORT', default=1025, cast=int)
     EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
+# meetup service the events of the meetup import are fetched from
+MEETUP_API_URL = config(
+    'MEETUP_API_URL',
+    default='http://127.0.0.1:8000/meetup/api/v1/request_meetup_data/')
+# seconds to wait for the meetup service to connect and to answer
+MEETUP_CONNECT_TIMEOUT = config('MEETUP_CONNECT_TIMEOUT', default=5, cast=float)
+MEETUP_READ_TIMEOUT = config('MEETUP_READ_TIMEOUT', default=30, cast=float)
+
+# logs the query count, SQL time and repeated queries of each request to the
+# vms.sql logger and the X-SQL-* response headers, for load testing
+SQL_INSTRUMENTATION = config('SQL_INSTRUMENTATION', default=False, cast=bool)
+# times a query has to repeat within a request to be reported as N+1
+SQL_N_PLUS_ONE_THRESHOLD = config('SQL_N_PLUS_ONE_THRESHOLD', default=5, cast=int)
+if SQL_INSTRUMENTATION:
+    MIDDLEWARE.append('vms.instrumentation.SQLInstrumentationMiddleware')
+
 LOGIN_REDIRECT_URL = reverse_lazy('home:index')
 RECOVER_ONLY_ACTIVE_USERS = False
 ACCOUNT_ACTIVATION_DAYS = 2
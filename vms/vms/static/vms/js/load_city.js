@@ -1,17 +1,58 @@
-/** Fetches cities belonging to selected state and country */
+/** Suggests the cities of the selected country and state as a name is typed,
+ *  and posts the id of the suggestion picked */
 $(document).ready(function() {
+    var request = null;
+    var timer = null;
     $("#select_state").change(function() {
-        var countryId = $("#select_country").val();
-        var stateId = $(this).val();
-        $.ajax({
-            url: CityUrl,
-            data: {
-                "country": countryId,
-                "state": stateId
-            },
-            success: function(cities) {
-                $("#select_city").html(cities);
-            }
+        $("#select_city").val("");
+        $("#select_city_id").val("");
+        $("#city_options").empty();
+    });
+    $("#select_city").on("input", function() {
+        var prefix = $(this).val();
+        // the id of the suggestion the text matches, names of cities in
+        // more than one state carry the state to tell them apart
+        var picked = $("#city_options option").filter(function() {
+            return $(this).val() === prefix;
         });
+        $("#select_city_id").val(picked.length ? picked.data("id") : "");
+        clearTimeout(timer);
+        if (!prefix || picked.length) {
+            if (!prefix) {
+                $("#city_options").empty();
+            }
+            return;
+        }
+        timer = setTimeout(function() {
+            if (request) {
+                request.abort();
+            }
+            request = $.ajax({
+                url: CityAutocompleteUrl,
+                data: {
+                    "country": $("#select_country").val(),
+                    "state": $("#select_state").val() || 0,
+                    "q": prefix
+                },
+                success: function(data) {
+                    var options = $("#city_options").empty();
+                    var count = {};
+                    $.each(data.cities, function(i, city) {
+                        count[city.name] = (count[city.name] || 0) + 1;
+                    });
+                    $.each(data.cities, function(i, city) {
+                        var value = city.name;
+                        if (count[city.name] > 1 && city.state) {
+                            value = city.name + ", " + city.state;
+                        }
+                        options.append($("<option>").attr("value", value)
+                                                    .attr("data-id", city.id));
+                        if (value === $("#select_city").val()) {
+                            $("#select_city_id").val(city.id);
+                        }
+                    });
+                }
+            });
+        }, 150);
     });
 });
@@ -8,18 +8,12 @@ $(document).ready(function() {
                 "country": countryId
             },
             success: function(statecheck) {
+                // the cities are suggested as the name is typed
+                $("#select_city").val("");
+                $("#select_city_id").val("");
+                $("#city_options").empty();
                 if (statecheck === false) {
-                    $.ajax({
-                        url: CityUrl,
-                        data: {
-                            "country": countryId,
-                            "state": 0
-                        },
-                        success: function(cities) {
-                            $("#select_city").html(cities);
-                           $("#select_state").empty(); 
-                        }
-                    });
+                    $("#select_state").empty();
                 } else if (statecheck === true) {
                     $.ajax({
                         url: StateUrl,
@@ -28,7 +22,6 @@ $(document).ready(function() {
                         },
                         success: function(states) {
                             $("#select_state").html(states);
-                            $("#select_city").empty();
                         }
                     });
                 }
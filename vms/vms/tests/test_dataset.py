@@ -0,0 +1,96 @@
+# standard library
+import json
+import os
+import tempfile
+from io import StringIO
+
+# Django
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db.models import Count, F
+from django.test import TestCase
+
+# local Django
+from shift.models import Report, ReportLine, Shift, VolunteerShift
+from vms.dataset import DATASET_PASSWORD, DatasetGenerator
+from volunteer.models import Volunteer
+
+SMALL_SCALE = {
+    'organizations': 3,
+    'volunteers': 30,
+    'events': 6,
+    'jobs': 2,
+    'shifts': 4,
+    'sign_ups': 3,
+    'report_share': 0.5,
+}
+
+
+class DatasetTest(TestCase):
+    """
+    Tests the generated dataset and the view benchmark run on it
+    """
+
+    def test_generate(self):
+        generator = DatasetGenerator(batch_size=7, **SMALL_SCALE).generate()
+        self.assertEqual(dict(generator.get_counts()), {
+            'organizations': 3,
+            'administrators': 3,
+            'volunteers': 30,
+            'events': 6,
+            'jobs': 12,
+            'shifts': 48,
+            'volunteer shifts': len(generator.volunteer_shift_list),
+            'reports': len(generator.report_list),
+        })
+        self.assertEqual(VolunteerShift.objects.count(),
+                         len(generator.volunteer_shift_list))
+        self.assertTrue(generator.report_list)
+
+        # the ids read back belong to the objects they were set on
+        volunteer = generator.volunteer_list[-1]
+        self.assertEqual(
+            Volunteer.objects.get(pk=volunteer.pk).email, volunteer.email)
+        self.assertEqual(volunteer.search_document,
+                         volunteer.get_search_document())
+        self.assertTrue(self.client.login(username=volunteer.user.username,
+                                          password=DATASET_PASSWORD))
+
+        self.assertFalse(Shift.objects.annotate(
+            sign_ups=Count('volunteershift')).filter(
+                sign_ups__gt=F('max_volunteers')).exists())
+        for report in Report.objects.all():
+            self.assertEqual(report.lines.count(),
+                             report.volunteer_shifts.count())
+        self.assertEqual(
+            ReportLine.objects.count(),
+            VolunteerShift.objects.filter(report_status=True).count())
+
+        with self.assertRaises(ValueError):
+            DatasetGenerator(**SMALL_SCALE).generate()
+        with self.assertRaises(ValueError):
+            DatasetGenerator(prefix='other', managers=1)
+
+    def test_benchmark_views(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        baseline_path = os.path.join(directory.name, 'baseline.json')
+        options = dict(
+            SMALL_SCALE, repeat=1, baseline=baseline_path, stdout=StringIO())
+
+        call_command('benchmark_views', save_baseline=True, **options)
+        with open(baseline_path) as baseline_file:
+            baseline = json.load(baseline_file)
+        self.assertEqual(baseline['scale'], SMALL_SCALE)
+        self.assertIn('shift:view_hours', baseline['views'])
+        self.assertGreater(
+            baseline['views']['shift:view_hours']['queries'], 0)
+        # the dataset is rolled back
+        self.assertFalse(Volunteer.objects.exists())
+
+        for result in baseline['views'].values():
+            result['queries'] -= 1
+        with open(baseline_path, 'w') as baseline_file:
+            json.dump(baseline, baseline_file)
+        with self.assertRaisesMessage(CommandError, 'shift:view_hours'):
+            call_command('benchmark_views', **options)
@@ -0,0 +1,81 @@
+# standard library
+import json
+
+# Django
+from django.conf import settings
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+# local Django
+from event.feed import invalidate_event_feed
+from shift.services import get_volunteer_dashboard
+from shift.utils import create_volunteer
+from vms.instrumentation import QueryRecorder, get_fingerprint
+
+INSTRUMENTED_MIDDLEWARE = settings.MIDDLEWARE + [
+    'vms.instrumentation.SQLInstrumentationMiddleware'
+]
+
+
+class SQLInstrumentationTest(TestCase):
+    """
+    Tests the query fingerprints, the detection of repeated queries and the
+    headers and log line of the instrumentation middleware
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.volunteer = create_volunteer()
+
+    def test_get_fingerprint(self):
+        self.assertEqual(
+            get_fingerprint(
+                "SELECT * FROM event_event WHERE id = 12 AND name = 'It''s'"),
+            'SELECT * FROM event_event WHERE id = ? AND name = ?')
+        self.assertEqual(
+            get_fingerprint('SELECT *\n  FROM job_job WHERE id IN (%s, %s, %s)'),
+            get_fingerprint('SELECT * FROM job_job WHERE id IN (%s, %s)'))
+
+    def test_query_recorder(self):
+        recorder = QueryRecorder(threshold=3)
+        with connection.execute_wrapper(recorder):
+            for i in range(3):
+                get_volunteer_dashboard(self.volunteer.id)
+            list(type(self.volunteer).objects.filter(id=self.volunteer.id))
+        self.assertEqual(recorder.count, 4)
+        self.assertGreater(recorder.duration, 0)
+
+        repeated_list = recorder.get_repeated_queries()
+        self.assertEqual(len(repeated_list), 1)
+        self.assertEqual(repeated_list[0]['count'], 3)
+        self.assertEqual(repeated_list[0]['origin'],
+                         'shift.services.get_volunteer_dashboard')
+
+    def test_middleware(self):
+        url = reverse('event:vola_api')
+        with override_settings(MIDDLEWARE=INSTRUMENTED_MIDDLEWARE):
+            with self.assertLogs('vms.sql', 'INFO') as logs:
+                response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(int(response['X-SQL-Queries']), 0)
+        self.assertGreaterEqual(float(response['X-SQL-Time']), 0)
+        self.assertEqual(response['X-SQL-Repeated'], '0')
+        self.assertEqual(logs.records[0].levelname, 'INFO')
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'event:vola_api')
+        self.assertEqual(record['path'], url)
+        self.assertEqual(record['status'], 200)
+        self.assertEqual(record['queries'], int(response['X-SQL-Queries']))
+
+        # every query is reported as repeated with a threshold of one
+        invalidate_event_feed()
+        with override_settings(MIDDLEWARE=INSTRUMENTED_MIDDLEWARE,
+                               SQL_N_PLUS_ONE_THRESHOLD=1):
+            with self.assertLogs('vms.sql', 'INFO') as logs:
+                response = self.client.get(url)
+        self.assertGreater(int(response['X-SQL-Repeated']), 0)
+        self.assertEqual(logs.records[0].levelname, 'WARNING')
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(len(record['repeated']),
+                         int(response['X-SQL-Repeated']))
@@ -0,0 +1,252 @@
+# Django
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+# local Django
+from cities_light.models import City, Country, Region
+from shift.utils import (create_city, create_country, create_other_city,
+                         create_second_city, create_second_country,
+                         create_second_state, create_state)
+from vms.locations import (VERSION_CHECK_INTERVAL, VERSION_KEY, Location,
+                           Place, get_location_index,
+                           invalidate_location_index, resolve_location,
+                           resolve_posted_location)
+
+
+class LocationIndexTest(TestCase):
+    """
+    Tests the in memory location index and the dropdown views answered
+    from it
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        create_country()
+        create_state()
+        cls.city = create_city()
+        cls.other_city = create_other_city()
+        create_second_country()
+        create_second_state()
+        create_second_city()
+        cls.accented_city = City.objects.create(
+            name_ascii='Ramnagar', slug='ramnagar', geoname_id=1258847,
+            alternate_names='', name='R\u0101mnagar',
+            region=cls.city.region, country=cls.city.country)
+
+    def setUp(self):
+        # rolled back rows of other tests may still be in the index
+        invalidate_location_index()
+
+    def tearDown(self):
+        invalidate_location_index()
+
+    def test_lookups(self):
+        index = get_location_index()
+        india = self.city.country_id
+        uttarakhand = self.city.region_id
+        self.assertEqual([country.name for country in index.country_list],
+                         ['India', 'United States'])
+        self.assertEqual([state.name for state in index.get_states(india)],
+                         ['Uttarakhand'])
+        self.assertEqual(index.get_states(None), [])
+        self.assertEqual(
+            [city.name for city in index.get_cities(india, uttarakhand)],
+            ['Mussoorie', 'Roorkee', 'R\u0101mnagar'])
+        self.assertEqual(
+            [city.name for city in index.get_cities(india)],
+            ['Mussoorie', 'Roorkee', 'R\u0101mnagar'])
+        washington = Region.objects.get(name='Washington').id
+        self.assertEqual(index.get_cities(india, washington), [])
+
+    def test_ids_and_names(self):
+        index = get_location_index()
+        india = self.city.country_id
+        uttarakhand = self.city.region_id
+        self.assertEqual(index.get_country_id('India'), india)
+        self.assertEqual(index.get_country_id(str(india)), india)
+        self.assertIsNone(index.get_country_id('Nowhere'))
+        self.assertIsNone(index.get_country_id('0'))
+        self.assertEqual(index.get_state_id(india, 'Uttarakhand'), uttarakhand)
+        self.assertIsNone(index.get_state_id(india, 'Washington'))
+        self.assertEqual(
+            index.get_city_id(india, uttarakhand, str(self.city.id)),
+            self.city.id)
+        self.assertEqual(
+            index.get_city_id(india, None, 'Roorkee'), self.city.id)
+        self.assertIsNone(index.get_city_id(india, None, 'Bothell'))
+
+    def test_loaded_once(self):
+        get_location_index()
+        with self.assertNumQueries(0):
+            get_location_index().get_cities(
+                self.city.country_id, self.city.region_id)
+
+    def test_invalidated_on_change(self):
+        index = get_location_index()
+        city = City.objects.get(pk=self.other_city.pk)
+        city.name = 'Dehradun'
+        city.save()
+
+        new_index = get_location_index()
+        self.assertNotEqual(new_index.etag, index.etag)
+        self.assertEqual(
+            [city.name for city in new_index.get_cities(city.country_id)],
+            ['Dehradun', 'Roorkee', 'R\u0101mnagar'])
+
+        Country.objects.filter(name='United States').delete()
+        self.assertEqual(
+            [country.name for country in get_location_index().country_list],
+            ['India'])
+
+    def test_invalidated_by_other_process(self):
+        index = get_location_index()
+        # the version another process set is read once the check is due
+        cache.set(VERSION_KEY, 'changed by another process', None)
+        self.assertIs(get_location_index(), index)
+        index.checked_at -= VERSION_CHECK_INTERVAL
+        self.assertIsNot(get_location_index(), index)
+
+    def test_suggest_cities(self):
+        index = get_location_index()
+        india = self.city.country_id
+        uttarakhand = self.city.region_id
+        accented_city = Location(self.accented_city.id, self.accented_city.name)
+        city = Location(self.city.id, self.city.name)
+        self.assertEqual(
+            index.suggest_cities('r', india),
+            [(accented_city, 'Uttarakhand'), (city, 'Uttarakhand')])
+        self.assertEqual(
+            index.suggest_cities(' RAM', india, uttarakhand),
+            [(accented_city, 'Uttarakhand')])
+        self.assertEqual(
+            index.suggest_cities('r', india, limit=1),
+            [(accented_city, 'Uttarakhand')])
+        washington = Region.objects.get(name='Washington').id
+        self.assertEqual(index.suggest_cities('r', india, washington), [])
+        self.assertEqual(index.suggest_cities('', india), [])
+        self.assertEqual(
+            [city.name for city, state in index.suggest_cities(
+                'b', index.get_country_id('United States'))], ['Bothell'])
+
+    def test_resolve_location(self):
+        country = self.city.country
+        state = self.city.region
+        self.assertEqual(
+            resolve_location(str(country.id), str(state.id),
+                             str(self.city.id)),
+            Place(country, state, self.city))
+        # the names of the old forms and of the typed city are resolved too
+        self.assertEqual(
+            resolve_location('India', 'Uttarakhand', 'Roorkee'),
+            Place(country, state, self.city))
+        # the state of a city picked without one is filled in
+        self.assertEqual(resolve_location(country.id, '0', 'Roorkee'),
+                         Place(country, state, self.city))
+        self.assertEqual(resolve_location(country.id, '0', ''),
+                         Place(country, None, None))
+        self.assertEqual(resolve_location(None, state.id, self.city.id),
+                         Place(None, None, None))
+
+    def test_resolve_location_checks_chain(self):
+        country = self.city.country
+        state = self.city.region
+        washington = Region.objects.get(name='Washington')
+        bothell = City.objects.get(name='Bothell')
+        # a state of another country leaves the state and city empty
+        self.assertEqual(
+            resolve_location(country.id, washington.id, self.city.id),
+            Place(country, None, None))
+        # a city of another country or state leaves the city empty
+        self.assertEqual(resolve_location(country.id, state.id, bothell.id),
+                         Place(country, state, None))
+        self.assertEqual(resolve_location('India', 'Uttarakhand', 'Bothell'),
+                         Place(country, state, None))
+
+    def test_resolve_shared_city_name(self):
+        country = self.city.country
+        state = self.city.region
+        other_state = Region.objects.create(
+            name_ascii='Haryana', slug='haryana', geoname_id=1270260,
+            alternate_names='', name='Haryana', country=country)
+        other_city = City.objects.create(
+            name_ascii='Roorkee', slug='roorkee-haryana', geoname_id=1,
+            alternate_names='', name='Roorkee', region=other_state,
+            country=country)
+
+        # a name of two cities is only taken within its state
+        self.assertEqual(resolve_location(country.id, '0', 'Roorkee'),
+                         Place(country, None, None))
+        self.assertEqual(resolve_location(country.id, state.id, 'Roorkee'),
+                         Place(country, state, self.city))
+
+        # the id set from the picked suggestion wins over the typed name
+        self.assertEqual(
+            resolve_posted_location({
+                'country': str(country.id), 'state': '0',
+                'city': 'Roorkee, Haryana', 'city_id': str(other_city.id)}),
+            Place(country, other_state, other_city))
+        self.assertEqual(
+            resolve_posted_location({
+                'country': str(country.id), 'state': str(state.id),
+                'city': 'Roorkee', 'city_id': ''}),
+            Place(country, state, self.city))
+
+    def test_resolve_location_queries(self):
+        get_location_index()
+        with self.assertNumQueries(1):
+            place = resolve_location(
+                self.city.country_id, self.city.region_id, self.city.id)
+            self.assertEqual(place.country.name, 'India')
+            self.assertEqual(place.state.name, 'Uttarakhand')
+        # resolved again from the cache of the index
+        with self.assertNumQueries(0):
+            resolve_location(
+                self.city.country_id, self.city.region_id, self.city.id)
+
+    def test_autocomplete_view(self):
+        response = self.client.get(
+            reverse('registration:autocomplete_cities'),
+            {'country': self.city.country_id, 'state': '0', 'q': 'ro'})
+        self.assertEqual(response.json(), {'cities': [{
+            'id': self.city.id, 'name': 'Roorkee', 'state': 'Uttarakhand'
+        }]})
+        self.assertTrue(response.has_header('ETag'))
+
+        response = self.client.get(
+            reverse('registration:autocomplete_cities'),
+            {'country': self.city.country_id, 'q': 'm', 'limit': 'x'})
+        self.assertEqual(
+            [city['name'] for city in response.json()['cities']],
+            ['Mussoorie'])
+
+    def test_views(self):
+        response = self.client.get(
+            reverse('registration:load_cities'),
+            {'country': self.city.country_id, 'state': self.city.region_id})
+        self.assertContains(
+            response, '<option value="{0}">'.format(self.city.id))
+        self.assertContains(
+            response, '<option value="{0}">'.format(self.other_city.id))
+        self.assertIn('max-age', response['Cache-Control'])
+
+        # an unchanged index answers a revalidation without a body
+        response = self.client.get(
+            reverse('registration:load_cities'),
+            {'country': self.city.country_id, 'state': '0'},
+            HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        response = self.client.get(
+            reverse('registration:load_cities'),
+            {'country': self.city.country_id, 'state': 'Washington'})
+        self.assertNotContains(response, 'Roorkee')
+
+        response = self.client.get(
+            reverse('registration:load_states'),
+            {'country': self.city.country_id})
+        self.assertContains(
+            response, '<option value="{0}">'.format(self.city.region_id))
+        response = self.client.get(
+            reverse('registration:check_states'), {'country': 'Nowhere'})
+        self.assertEqual(response.json(), False)
@@ -0,0 +1,86 @@
+# standard library
+from datetime import date, timedelta
+
+# Django
+from django.test import RequestFactory, TestCase
+
+# local Django
+from event.models import Event
+from vms.pagination import paginate, paginate_request
+
+
+class KeysetPaginationTest(TestCase):
+    """
+    Pages through events with repeated names and start dates to check that
+    every row is shown exactly once in both directions
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        for i in range(23):
+            Event.objects.create(
+                name='Event {0}'.format(i % 5),
+                start_date=date(2050, 1, 1) + timedelta(days=i % 3),
+                end_date=date(2050, 2, 1))
+
+    def get_all_pages(self, ordering, page_size):
+        page = paginate(Event.objects.all(), ordering, page_size=page_size)
+        page_list = [page]
+        while page.has_next:
+            page = paginate(
+                Event.objects.all(), ordering, page.next_cursor, page_size)
+            page_list.append(page)
+        return page_list
+
+    def test_forward(self):
+        ordering = ('name', 'id')
+        page_list = self.get_all_pages(ordering, 5)
+
+        self.assertEqual([len(page) for page in page_list], [5, 5, 5, 5, 3])
+        self.assertFalse(page_list[0].has_previous)
+        self.assertTrue(page_list[-1].has_previous)
+        self.assertEqual(
+            [event for page in page_list for event in page],
+            list(Event.objects.order_by(*ordering)))
+
+    def test_backward(self):
+        ordering = ('-start_date', 'name', '-id')
+        page_list = self.get_all_pages(ordering, 4)
+
+        page = page_list[-1]
+        for previous in reversed(page_list[:-1]):
+            page = paginate(
+                Event.objects.all(), ordering, page.previous_cursor, 4)
+            self.assertEqual(list(page), list(previous))
+            self.assertTrue(page.has_next)
+        self.assertFalse(page.has_previous)
+
+    def test_query_count(self):
+        page_list = self.get_all_pages(('name', 'id'), 5)
+        with self.assertNumQueries(1):
+            page = paginate(
+                Event.objects.all(), ('name', 'id'), page_list[3].next_cursor,
+                5)
+            self.assertEqual(len(page), 3)
+
+    def test_invalid_cursor(self):
+        for cursor in ('not a cursor', 'WyJuIiwgWzFdXQ=='):
+            page = paginate(Event.objects.all(), ('name', 'id'), cursor, 5)
+            self.assertEqual(
+                list(page), list(Event.objects.order_by('name', 'id')[:5]))
+
+    def test_paginate_request(self):
+        request = RequestFactory().post(
+            '/event/list/', {'name': 'Event', 'csrfmiddlewaretoken': 'x'})
+        page = paginate_request(
+            request, Event.objects.all(), ('name', 'id'), page_size=10)
+        self.assertEqual(page.method, 'post')
+        self.assertEqual(page.params, [('name', 'Event')])
+
+        request = RequestFactory().post(
+            '/event/list/', {'name': 'Event', 'cursor': page.next_cursor})
+        page = paginate_request(
+            request, Event.objects.all(), ('name', 'id'), page_size=10)
+        self.assertEqual(
+            list(page), list(Event.objects.order_by('name', 'id')[10:20]))
+        self.assertEqual(page.params, [('name', 'Event')])
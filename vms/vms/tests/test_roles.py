@@ -0,0 +1,115 @@
+# Django
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+# local Django
+from shift.utils import (create_admin, create_volunteer,
+                         create_volunteer_with_details)
+from vms.roles import RoleBackend, get_role
+from vms.utils import check_correct_volunteer_shift_sign_up
+from volunteer.utils import vol_id_check
+
+
+class RoleTest(TestCase):
+    """
+    Tests loading the role of a user with the user and the permission
+    checks built on it
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.volunteer = create_volunteer()
+        cls.other_volunteer = create_volunteer_with_details({
+            'username': 'othervolunteer',
+            'first_name': 'Other',
+            'last_name': 'Volunteer',
+            'address': 'address',
+            'city': None,
+            'state': None,
+            'country': None,
+            'phone_number': '9999999999',
+            'email': 'other@volunteer.com',
+        }, None)
+        cls.admin = create_admin()
+        User.objects.create_user(username='norole', password='norole')
+
+    def test_get_user(self):
+        backend = RoleBackend()
+        with self.assertNumQueries(1):
+            user = backend.get_user(self.volunteer.user_id)
+            request = RequestFactory().get('/')
+            request.user = user
+            role = get_role(request)
+        self.assertEqual(role.volunteer, self.volunteer)
+        self.assertIsNone(role.administrator)
+        self.assertIs(get_role(request), role)
+
+        with self.assertNumQueries(1):
+            user = backend.get_user(self.admin.user_id)
+            self.assertFalse(hasattr(user, 'volunteer'))
+            self.assertEqual(user.administrator, self.admin)
+        self.assertIsNone(backend.get_user(0))
+
+    def test_checks_without_queries(self):
+        view = check_correct_volunteer_shift_sign_up(vol_id_check(
+            lambda request, volunteer_id: HttpResponse(volunteer_id)))
+        request = RequestFactory().get('/')
+        request.user = RoleBackend().get_user(self.volunteer.user_id)
+        with self.assertNumQueries(0):
+            response = view(request, volunteer_id=str(self.volunteer.id))
+            self.assertEqual(response.status_code, 200)
+            response = view(
+                request, volunteer_id=str(self.other_volunteer.id))
+            self.assertEqual(response.status_code, 403)
+
+    def test_vol_id_check(self):
+        view = vol_id_check(
+            lambda request, volunteer_id: HttpResponse(volunteer_id))
+        backend = RoleBackend()
+        request = RequestFactory().get('/')
+        request.user = backend.get_user(self.admin.user_id)
+        response = view(request, volunteer_id=str(self.other_volunteer.id))
+        self.assertEqual(response.status_code, 200)
+
+        request = RequestFactory().get('/')
+        request.user = backend.get_user(self.volunteer.user_id)
+        response = view(request, volunteer_id=str(self.other_volunteer.id))
+        self.assertEqual(response.status_code, 403)
+
+        request = RequestFactory().get('/')
+        request.user = User.objects.get(username='norole')
+        response = view(request, volunteer_id=str(self.volunteer.id))
+        self.assertEqual(response.status_code, 403)
+
+    def test_views(self):
+        hours_url = reverse('shift:view_hours', args=[self.volunteer.id])
+        sign_up_url = reverse('event:list_sign_up', args=[self.volunteer.id])
+        job_url = reverse('job:create')
+
+        self.client.login(username='volunteer', password='volunteer')
+        self.assertEqual(self.client.get(hours_url).status_code, 200)
+        self.assertEqual(self.client.get(sign_up_url).status_code, 200)
+        self.assertEqual(self.client.get(reverse(
+            'shift:view_hours', args=[self.other_volunteer.id])).status_code,
+            403)
+        self.assertEqual(self.client.get(job_url).status_code, 403)
+
+        self.client.login(username='admin', password='admin')
+        self.assertEqual(self.client.get(hours_url).status_code, 403)
+        self.assertEqual(self.client.get(sign_up_url).status_code, 200)
+        self.assertEqual(self.client.get(job_url).status_code, 200)
+
+        self.client.login(username='norole', password='norole')
+        self.assertEqual(self.client.get(hours_url).status_code, 404)
+        self.assertEqual(self.client.get(job_url).status_code, 403)
+
+    def test_sessions_of_model_backend(self):
+        # sessions started before RoleBackend was added are kept
+        self.client.force_login(
+            self.volunteer.user,
+            backend='django.contrib.auth.backends.ModelBackend')
+        response = self.client.get(
+            reverse('shift:view_hours', args=[self.volunteer.id]))
+        self.assertEqual(response.status_code, 200)
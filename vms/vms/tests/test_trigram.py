@@ -0,0 +1,125 @@
+# Django
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+# local Django
+from event.models import Event
+from event.services import search_events
+from job.models import Job
+from job.services import search_jobs
+from shift.utils import (create_city, create_country, create_event_with_details,
+                         create_job_with_details, create_state)
+from vms.trigram import filter_contains, has_sqlite_trigram
+
+
+class TrigramSearchTest(TestCase):
+    """
+    Tests that the trigram lookups find the same rows as icontains and that
+    the event and job searches combine all of their filters
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        create_country()
+        create_state()
+        cls.city = create_city()
+        cls.event_list = []
+        for name, start_date in (("Open Source Event", "2012-10-22"),
+                                 ("Python Sprint", "2012-11-10"),
+                                 ("Open Data Day", "2013-03-02"),
+                                 ("100% Volunteer_Day", "2013-05-01")):
+            event = create_event_with_details({
+                'name': name,
+                'start_date': start_date,
+                'end_date': "2013-12-30",
+                'description': "event-description",
+                'address': "event-address",
+                'venue': "event-venue"
+            })
+            cls.event_list.append(event)
+        cls.event_list[0].city = cls.city
+        cls.event_list[0].save()
+
+        cls.job_list = []
+        for event, name in ((cls.event_list[0], "Software Developer"),
+                            (cls.event_list[0], "Software Tester"),
+                            (cls.event_list[1], "Sprint Developer"),
+                            (cls.event_list[2], "Data Analyst")):
+            cls.job_list.append(create_job_with_details({
+                'name': name,
+                'start_date': event.start_date,
+                'end_date': "2013-12-30",
+                'description': "job-description",
+                'event': event
+            }))
+
+    def assertSameAsIcontains(self, queryset, lookup, text):
+        self.assertEqual(
+            set(filter_contains(queryset, lookup, text)),
+            set(queryset.filter(**{lookup + '__icontains': text})), text)
+
+    def test_same_as_icontains(self):
+        for text in ('open', 'OPEN sou', 'data', 'sprint', 'a', 'Op',
+                     '100%', 'r_d', '_Day', 'no match', 'éèü'):
+            self.assertSameAsIcontains(Event.objects.all(), 'name', text)
+        for text in ('roor', 'ROORKEE', 'kee', 'xyz'):
+            self.assertSameAsIcontains(Event.objects.all(), 'city__name', text)
+            self.assertSameAsIcontains(
+                Job.objects.all(), 'event__city__name', text)
+        self.assertSameAsIcontains(Job.objects.all(), 'event__name', 'open')
+
+    def test_uses_index(self):
+        if not has_sqlite_trigram():
+            self.skipTest('trigram indexes are queried directly on SQLite')
+        with CaptureQueriesContext(connection) as context:
+            list(filter_contains(Event.objects.all(), 'name', 'sprint'))
+        self.assertIn('event_event_name_trgm', context.captured_queries[0]['sql'])
+
+    def test_index_follows_changes(self):
+        event = Event.objects.get(pk=self.event_list[1].pk)
+        event.name = 'Python Meetup'
+        event.save()
+        self.assertEqual(
+            list(filter_contains(Event.objects.all(), 'name', 'meetup')),
+            [event])
+        self.assertEqual(
+            list(filter_contains(Event.objects.all(), 'name', 'sprint')), [])
+
+        Event.objects.filter(pk=self.event_list[2].pk).delete()
+        self.assertEqual(
+            list(filter_contains(Event.objects.all(), 'name', 'data')), [])
+
+    def test_search_events_combines_filters(self):
+        # the date filter used to replace the name filter
+        self.assertEqual(
+            list(search_events('open', '2012-10-01', '2012-12-31', None,
+                               None, None, None)),
+            [self.event_list[0]])
+        self.assertEqual(
+            list(search_events('open', None, '2012-12-31', 'roorkee',
+                               None, None, None)),
+            [self.event_list[0]])
+
+        # an event with two matching jobs is found once
+        self.assertEqual(
+            list(search_events(None, None, None, None, None, None,
+                               'software')),
+            [self.event_list[0]])
+        self.assertEqual(
+            set(search_events(None, '2012-01-01', None, None, None, None,
+                              'developer')),
+            {self.event_list[0], self.event_list[1]})
+
+    def test_search_jobs_combines_filters(self):
+        self.assertEqual(
+            set(search_jobs('developer', '2012-10-01', '2012-10-31', None,
+                            None, None, None)),
+            {self.job_list[0]})
+        self.assertEqual(
+            set(search_jobs('software', None, None, 'roorkee', None, None,
+                            'open source')),
+            {self.job_list[0], self.job_list[1]})
+        self.assertEqual(
+            list(search_jobs('analyst', '2012-10-01', '2012-10-31', None,
+                             None, None, None)), [])
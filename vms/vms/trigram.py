@@ -0,0 +1,139 @@
+# standard library
+import sqlite3
+
+# Django
+from django.apps import apps
+from django.db import connection
+from django.db.models.expressions import RawSQL
+
+# name columns searched by substring, as (app label, model name, field
+# name). Each gets a trigram index: a GIN index on the upper case text on
+# Postgres, which icontains lookups use as they are and the migrations of
+# the vms app create, and an FTS5 table with the trigram tokenizer on
+# SQLite, which filter_contains queries.
+TRIGRAM_FIELDS = [
+    ('cities_light', 'City', 'name'),
+    ('cities_light', 'Region', 'name'),
+    ('cities_light', 'Country', 'name'),
+    ('event', 'Event', 'name'),
+    ('job', 'Job', 'name'),
+]
+
+# shortest text a trigram index can look up
+MIN_LENGTH = 3
+
+
+def get_index_name(model, field):
+    return '{0}_{1}_trgm'.format(model._meta.db_table, field.column)
+
+
+def get_trigram_fields():
+    """
+    Yields the model and field of each trigram index whose table exists
+    """
+    table_list = connection.introspection.table_names()
+    for app_label, model_name, field_name in TRIGRAM_FIELDS:
+        model = apps.get_model(app_label, model_name)
+        if model._meta.db_table in table_list:
+            yield model, model._meta.get_field(field_name)
+
+
+def has_sqlite_trigram():
+    # the trigram tokenizer of FTS5 came with SQLite 3.34
+    return (connection.vendor == 'sqlite' and
+            sqlite3.sqlite_version_info >= (3, 34, 0))
+
+
+def create_sqlite_index(cursor, model, field):
+    index_name = get_index_name(model, field)
+    cursor.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+        [index_name])
+    if cursor.fetchone() is not None:
+        return False
+
+    table = model._meta.db_table
+    column = field.column
+    pk_column = model._meta.pk.column
+    format_kwargs = {
+        'index': index_name, 'table': table, 'column': column,
+        'pk': pk_column
+    }
+    for sql in [
+        "CREATE VIRTUAL TABLE {index} USING fts5({column}, "
+        "content='{table}', content_rowid='{pk}', tokenize='trigram')",
+        "CREATE TRIGGER {index}_insert AFTER INSERT ON {table} BEGIN "
+        "INSERT INTO {index}(rowid, {column}) VALUES (new.{pk}, new.{column}); "
+        "END",
+        "CREATE TRIGGER {index}_delete AFTER DELETE ON {table} BEGIN "
+        "INSERT INTO {index}({index}, rowid, {column}) "
+        "VALUES ('delete', old.{pk}, old.{column}); END",
+        "CREATE TRIGGER {index}_update AFTER UPDATE OF {column} ON {table} "
+        "BEGIN "
+        "INSERT INTO {index}({index}, rowid, {column}) "
+        "VALUES ('delete', old.{pk}, old.{column}); "
+        "INSERT INTO {index}(rowid, {column}) VALUES (new.{pk}, new.{column}); "
+        "END",
+        "INSERT INTO {index}({index}) VALUES ('rebuild')",
+    ]:
+        cursor.execute(sql.format(**format_kwargs))
+    return True
+
+
+def create_trigram_indexes(app_label):
+    """
+    Creates the FTS5 trigram tables of the app on SQLite that do not exist
+    yet
+    """
+    if not has_sqlite_trigram():
+        return
+    with connection.cursor() as cursor:
+        for model, field in get_trigram_fields():
+            if model._meta.app_label == app_label:
+                create_sqlite_index(cursor, model, field)
+
+
+class MatchSubquery(RawSQL):
+    """
+    Select of the ids matched in a trigram index, for the right hand side
+    of an __in lookup, which puts the parentheses around it itself
+    """
+
+    def as_sql(self, compiler, connection):
+        return self.sql, self.params
+
+
+def get_field(model, lookup):
+    """
+    :return: Tuple of the model and the field at the end of the lookup
+    """
+    field = None
+    for name in lookup.split('__'):
+        if field is not None:
+            model = field.related_model
+        field = model._meta.get_field(name)
+    return model, field
+
+
+def filter_contains(queryset, lookup, text):
+    """
+    Filters the queryset like queryset.filter(<lookup>__icontains=text),
+    answered from the trigram index of the field when the database needs
+    it to be queried directly
+
+    :param lookup: Field name, which can span relations, e.g. 'city__name'
+    """
+    model, field = get_field(queryset.model, lookup)
+    if (not has_sqlite_trigram() or len(text) < MIN_LENGTH or
+            (model._meta.app_label, model.__name__, field.name)
+            not in TRIGRAM_FIELDS):
+        return queryset.filter(**{lookup + '__icontains': text})
+
+    match_list = MatchSubquery(
+        'SELECT rowid FROM {0} WHERE {0} MATCH %s'.format(
+            get_index_name(model, field)),
+        # a phrase of the trigram tokenizer matches any substring
+        ['"{0}"'.format(text.replace('"', '""'))])
+    relation = lookup.rpartition('__')[0]
+    return queryset.filter(**{
+        (relation + '__in' if relation else 'pk__in'): match_list})
@@ -6,56 +6,43 @@ from django.http import Http404
 from django.shortcuts import render
 
 # local Django
-from volunteer.models import Volunteer
+from vms.roles import get_role
 
 
 def check_correct_volunteer(func):
+    """
+    Lets volunteers see the pages of their own volunteer id only
+    """
     @wraps(func)
     def wrapped_view(request, **kwargs):
-        req_volunteer = getattr(request.user, "volunteer",
-                                hasattr(request.user, "administrator"))
+        role = get_role(request)
         volunteer_id = kwargs['volunteer_id']
-        if not req_volunteer:
+        if role.volunteer is None and role.administrator is None:
             raise Http404
-        elif req_volunteer is not True:
-            try:
-                volunteer = Volunteer.objects.get(id=volunteer_id)
-            except Volunteer.DoesNotExist:
-                return render(
-                    request, "vms/no_volunteer_rights.html", status=403)
-            if volunteer.id == req_volunteer.id:
-                return func(request, volunteer_id=volunteer_id)
-            else:
-                return render(
-                    request, "vms/no_volunteer_rights.html", status=403)
-        else:
-            return render(request, "vms/no_volunteer_rights.html", status=403)
+        if (role.volunteer is not None and
+                role.volunteer.id == int(volunteer_id)):
+            return func(request, volunteer_id=volunteer_id)
+        return render(request, "vms/no_volunteer_rights.html", status=403)
 
     return wrapped_view
 
 
 def check_correct_volunteer_shift_sign_up(func):
+    """
+    Lets volunteers see the pages of their own volunteer id only and
+    administrators see the pages of any volunteer
+    """
     @wraps(func)
     def wrapped_view(request, **kwargs):
-        req_volunteer = getattr(request.user, "volunteer",
-                                hasattr(request.user, "administrator"))
+        role = get_role(request)
         volunteer_id = kwargs['volunteer_id']
-        if req_volunteer is True:
-            return func(request, volunteer_id=volunteer_id)
-        if not req_volunteer:
-            raise Http404
-        elif req_volunteer is not True:
-            try:
-                volunteer = Volunteer.objects.get(id=volunteer_id)
-            except Volunteer.DoesNotExist:
-                return render(
-                    request, "vms/no_volunteer_rights.html", status=403)
-            if volunteer.id == req_volunteer.id:
+        if role.volunteer is not None:
+            if role.volunteer.id == int(volunteer_id):
                 return func(request, volunteer_id=volunteer_id)
-            else:
-                return render(
-                    request, "vms/no_volunteer_rights.html", status=403)
-        else:
-            return render(request, "vms/no_volunteer_rights.html", status=403)
+            return render(
+                request, "vms/no_volunteer_rights.html", status=403)
+        if role.administrator is not None:
+            return func(request, volunteer_id=volunteer_id)
+        raise Http404
 
     return wrapped_view
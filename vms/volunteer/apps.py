@@ -0,0 +1,43 @@
+# Django
+from django.apps import AppConfig
+from django.db.models.signals import post_migrate, post_save
+
+
+def create_search_index(sender, **kwargs):
+    from volunteer.search import create_search_index
+    create_search_index()
+
+
+def update_organization_volunteers(sender, instance, created, **kwargs):
+    if not created:
+        from volunteer.search import update_search_documents
+        update_search_documents(instance.volunteer_set.all())
+
+
+def update_place_volunteers(sender, instance, created, **kwargs):
+    if not created:
+        from volunteer.models import Volunteer
+        from volunteer.search import update_search_documents
+        # the field of the volunteers the place of the sender is kept in
+        field_name = {
+            'city': 'city_id',
+            'region': 'state_id',
+            'country': 'country_id',
+        }[sender._meta.model_name]
+        update_search_documents(
+            Volunteer.objects.filter(**{field_name: instance.pk}))
+
+
+class VolunteerConfig(AppConfig):
+    name = 'volunteer'
+
+    def ready(self):
+        from cities_light.models import City, Country, Region
+        from organization.models import Organization
+        # the FTS5 table of SQLite, the Postgres indexes are created by the
+        # migrations of the vms app
+        post_migrate.connect(create_search_index, sender=self)
+        post_save.connect(update_organization_volunteers, sender=Organization)
+        # the search documents carry the names of the places too
+        for model in (City, Country, Region):
+            post_save.connect(update_place_volunteers, sender=model)
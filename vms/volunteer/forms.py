@@ -21,6 +21,8 @@ class ReportForm(forms.Form):
 
 
 class SearchVolunteerForm(forms.Form):
+    # free text matched against names and places, see volunteer/search.py
+    query = forms.CharField(max_length=100, required=False)
     first_name = forms.RegexField(
         regex=r'^[(A-Z)|(a-z)|(\s)|(\-)]+$', max_length=30, required=False)
     last_name = forms.RegexField(
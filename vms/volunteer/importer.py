@@ -0,0 +1,264 @@
+# standard library
+import csv
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+# Django
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
+
+# local Django
+from organization.models import Organization
+from registration.forms import PASSWORD_ERROR, is_strong_password
+from registration.phone_validate import is_valid_phone
+from vms.locations import resolve_location
+from volunteer.models import Volunteer
+
+# bulk import of volunteers from a CSV file with a header row, validated
+# and inserted a batch of rows at a time
+
+REQUIRED_COLUMNS = ('username', 'first_name', 'last_name', 'email',
+                    'phone_number', 'address')
+OPTIONAL_COLUMNS = ('password', 'country', 'state', 'city', 'organization')
+
+# rows validated and inserted together
+IMPORT_BATCH_SIZE = 500
+
+# volunteer fields not checked by clean_fields, as they are either set by
+# the import after the check or resolved from the index and lookups
+UNCHECKED_FIELDS = ['user', 'city', 'state', 'country', 'organization',
+                    'search_document']
+
+RowError = namedtuple('RowError', ['line', 'username', 'message'])
+
+
+def read_csv(csv_file):
+    """
+    Reads the rows of a CSV file one at a time
+
+    :param csv_file: Text file opened with newline=''
+    :return: Iterator of (line number, row dictionary) tuples
+    :raise: ValueError if a required column is missing
+    """
+    reader = csv.DictReader(csv_file)
+    missing = [
+        column for column in REQUIRED_COLUMNS
+        if column not in (reader.fieldnames or [])
+    ]
+    if missing:
+        raise ValueError(
+            'Missing columns: {0}'.format(', '.join(missing)))
+    for row in reader:
+        yield reader.line_num, {
+            key: (value or '').strip() for key, value in row.items() if key
+        }
+
+
+class VolunteerImporter(object):
+    """
+    Creates the volunteers of CSV rows in batches. Each batch is checked
+    with a few queries for all of its rows, its passwords are hashed in a
+    process pool and its users and volunteers are inserted with
+    bulk_create in one transaction. Rows that do not pass are reported in
+    error_list and not imported, the other rows are.
+    """
+
+    def __init__(self, organization=None, batch_size=IMPORT_BATCH_SIZE,
+                 workers=1):
+        """
+        :param organization: Organization of the rows without one
+        :param workers: Number of processes hashing passwords, 1 to hash
+                        them in this process
+        """
+        self.organization = organization
+        self.batch_size = batch_size
+        self.workers = workers
+        self.created = 0
+        self.error_list = []
+        self.username_set = set()
+        self.email_set = set()
+        self.organization_by_name = {}
+        self.executor = None
+
+    def run(self, row_list):
+        """
+        :param row_list: Iterable of (line number, row dictionary) tuples,
+                         e.g. from read_csv
+        :return: The importer, with the created count and error_list
+        """
+        if self.workers > 1:
+            self.executor = ProcessPoolExecutor(self.workers)
+        try:
+            batch = []
+            for line, row in row_list:
+                batch.append((line, row))
+                if len(batch) >= self.batch_size:
+                    self.import_batch(batch)
+                    batch = []
+            if batch:
+                self.import_batch(batch)
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown()
+                self.executor = None
+        return self
+
+    def add_error(self, line, row, message):
+        self.error_list.append(RowError(line, row.get('username', ''), message))
+
+    def clean_row(self, line, row):
+        """
+        Checks a row without querying the database, but for the cached
+        location index
+
+        :return: Tuple of the unsaved user and volunteer and the password,
+                 or None if the row has errors
+        """
+        missing = [column for column in REQUIRED_COLUMNS if not row.get(column)]
+        if missing:
+            self.add_error(line, row, 'Missing values: {0}'.format(
+                ', '.join(missing)))
+            return None
+
+        message_list = []
+        username = row['username']
+        email = row['email']
+        if username in self.username_set:
+            message_list.append('Username appears more than once')
+        if email.lower() in self.email_set:
+            message_list.append('Email appears more than once')
+        self.username_set.add(username)
+        self.email_set.add(email.lower())
+
+        password = row.get('password') or None
+        if password is not None and not is_strong_password(password):
+            message_list.append(PASSWORD_ERROR)
+
+        place = resolve_location(
+            row.get('country'), row.get('state'), row.get('city'))
+        for column, value in zip(('country', 'state', 'city'), place):
+            if row.get(column) and value is None:
+                message_list.append('Unknown {0}: {1}'.format(
+                    column, row[column]))
+        if (place.country is not None and
+                not is_valid_phone(place.country.code2, row['phone_number'])):
+            message_list.append(
+                "This phone number isn't valid for the selected country")
+
+        user = User(username=username, email=email,
+                    first_name=row['first_name'], last_name=row['last_name'])
+        volunteer = Volunteer(
+            first_name=row['first_name'], last_name=row['last_name'],
+            email=email, phone_number=row['phone_number'],
+            address=row['address'], country=place.country, state=place.state,
+            city=place.city)
+        for instance, exclude in ((user, ['password']),
+                                  (volunteer, UNCHECKED_FIELDS)):
+            try:
+                instance.clean_fields(exclude=exclude)
+            except ValidationError as error:
+                for field, field_error_list in error.message_dict.items():
+                    message_list.extend(
+                        '{0}: {1}'.format(field, message)
+                        for message in field_error_list)
+
+        if message_list:
+            self.add_error(line, row, '; '.join(message_list))
+            return None
+        return user, volunteer, password
+
+    def load_organizations(self, name_list):
+        name_list = [
+            name for name in name_list
+            if name not in self.organization_by_name
+        ]
+        for organization in Organization.objects.filter(name__in=name_list):
+            self.organization_by_name[organization.name] = organization
+
+    def hash_passwords(self, password_list):
+        """
+        :return: List of hashes, an unusable password for a missing one
+        """
+        if self.executor is None:
+            return [make_password(password) for password in password_list]
+        return list(self.executor.map(
+            make_password, password_list,
+            chunksize=max(1, len(password_list) // (self.workers * 4))))
+
+    def import_batch(self, batch):
+        cleaned_list = []
+        for line, row in batch:
+            cleaned = self.clean_row(line, row)
+            if cleaned is not None:
+                cleaned_list.append((line, row) + cleaned)
+
+        # unique values taken before, checked for the whole batch at once
+        taken_usernames = set(User.objects.filter(
+            username__in=[user.username for line, row, user, volunteer,
+                          password in cleaned_list]).values_list(
+                              'username', flat=True))
+        taken_emails = set(email.lower() for email in Volunteer.objects.filter(
+            email__in=[volunteer.email for line, row, user, volunteer,
+                       password in cleaned_list]).values_list(
+                           'email', flat=True))
+        self.load_organizations(
+            [row['organization'] for line, row, user, volunteer, password
+             in cleaned_list if row.get('organization')])
+
+        valid_list = []
+        for line, row, user, volunteer, password in cleaned_list:
+            message_list = []
+            if user.username in taken_usernames:
+                message_list.append('Username is already taken')
+            if volunteer.email.lower() in taken_emails:
+                message_list.append('Email is already registered')
+            if row.get('organization'):
+                volunteer.organization = self.organization_by_name.get(
+                    row['organization'])
+                if volunteer.organization is None:
+                    message_list.append('Unknown organization: {0}'.format(
+                        row['organization']))
+            else:
+                volunteer.organization = self.organization
+            if message_list:
+                self.add_error(line, row, '; '.join(message_list))
+            else:
+                valid_list.append((line, row, user, volunteer, password))
+        if not valid_list:
+            return
+
+        for (line, row, user, volunteer, password), password_hash in zip(
+                valid_list, self.hash_passwords(
+                    [password for line, row, user, volunteer, password
+                     in valid_list])):
+            user.password = password_hash
+
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create(
+                    [user for line, row, user, volunteer, password
+                     in valid_list])
+                # not every database returns the ids of bulk inserts
+                user_id_by_username = dict(User.objects.filter(
+                    username__in=[user.username for line, row, user,
+                                  volunteer, password in valid_list]
+                ).values_list('username', 'id'))
+                volunteer_list = []
+                for line, row, user, volunteer, password in valid_list:
+                    volunteer.user_id = user_id_by_username[user.username]
+                    # bulk_create does not call save, so the document is
+                    # set here
+                    volunteer.search_document = (
+                        volunteer.get_search_document())
+                    volunteer_list.append(volunteer)
+                Volunteer.objects.bulk_create(volunteer_list)
+        except IntegrityError:
+            # rows taken by another signup since the batch was checked
+            for line, row, user, volunteer, password in valid_list:
+                self.add_error(
+                    line, row, 'Not imported, as the batch of the row '
+                    'conflicted with rows saved meanwhile')
+            return
+        self.created += len(valid_list)
@@ -0,0 +1,114 @@
+# standard library
+import time
+from statistics import median
+
+# Django
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+# local Django
+from organization.models import Organization
+from volunteer.models import Volunteer
+from volunteer.search import search_volunteers_by_text
+from volunteer.services import search_volunteers
+
+FIRST_NAME_LIST = ['Ash', 'Misty', 'Brock', 'Gary', 'Dawn', 'May', 'Iris',
+                   'Serena', 'Clemont', 'Tracey', 'Cilan', 'Max']
+LAST_NAME_LIST = ['Ketchum', 'Waterflower', 'Harrison', 'Oak', 'Berlitz',
+                  'Maple', 'Sketchit', 'Yvonne', 'Meyer', 'Ivy']
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = ('Compares the substring and the full text volunteer search while '
+            'the volunteer table grows. All rows are rolled back.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sizes', default='10000,100000,500000', dest='sizes',
+            help='Comma separated volunteer table sizes to measure at')
+        parser.add_argument(
+            '--repeat', type=int, default=5, dest='repeat',
+            help='Number of timed runs per query and size')
+        parser.add_argument(
+            '--batch-size', type=int, default=5000, dest='batch_size',
+            help='Number of volunteers inserted per query while seeding')
+
+    def handle(self, *args, **options):
+        try:
+            size_list = sorted(
+                int(size) for size in options['sizes'].split(','))
+        except ValueError:
+            raise CommandError('Sizes should be comma separated numbers')
+        if options['repeat'] < 1 or options['batch_size'] < 1:
+            raise CommandError('Repeat and batch size should be at least 1')
+
+        try:
+            with transaction.atomic():
+                self.run(size_list, options['repeat'], options['batch_size'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, size_list, repeat, batch_size):
+        # the searches look for the Ashes of one of the organizations
+        org_list = [Organization.objects.create(name='Benchmark Pallet')] + [
+            Organization.objects.create(name='Benchmark Org {0}'.format(i))
+            for i in range(199)
+        ]
+
+        self.stdout.write('{0:>10} {1:>16} {2:>16}'.format(
+            'volunteers', 'substring (ms)', 'full text (ms)'))
+        count = Volunteer.objects.count()
+        for size in size_list:
+            while count < size:
+                number = min(batch_size, size - count)
+                self.create_volunteers(count, number, org_list)
+                count += number
+            self.stdout.write('{0:>10} {1:>16.2f} {2:>16.2f}'.format(
+                size,
+                self.measure(
+                    lambda: search_volunteers(
+                        'Ash', None, None, None, None, 'Pallet', None,
+                        None).order_by('first_name', 'last_name', 'id')[:50],
+                    repeat),
+                self.measure(
+                    lambda: search_volunteers_by_text('ash pallet'),
+                    repeat)))
+
+    @staticmethod
+    def create_volunteers(start, number, org_list):
+        username_list = [
+            'benchmark-volunteer-{0}'.format(start + i) for i in range(number)
+        ]
+        User.objects.bulk_create(
+            [User(username=username) for username in username_list])
+        user_id_list = User.objects.filter(
+            username__in=username_list).values_list('id', flat=True)
+
+        volunteer_list = []
+        for i, user_id in enumerate(user_id_list, start):
+            volunteer = Volunteer(
+                user_id=user_id,
+                first_name=FIRST_NAME_LIST[i % len(FIRST_NAME_LIST)],
+                last_name=LAST_NAME_LIST[i // 7 % len(LAST_NAME_LIST)],
+                address='address', phone_number='9999999999',
+                email='volunteer{0}@benchmark.test'.format(i),
+                organization=org_list[i % len(org_list)])
+            # bulk_create does not call save, so the document is set here
+            volunteer.search_document = volunteer.get_search_document()
+            volunteer_list.append(volunteer)
+        Volunteer.objects.bulk_create(volunteer_list)
+
+    @staticmethod
+    def measure(function, repeat):
+        timing_list = []
+        for i in range(repeat):
+            start = time.perf_counter()
+            list(function())
+            timing_list.append((time.perf_counter() - start) * 1000)
+        return median(timing_list)
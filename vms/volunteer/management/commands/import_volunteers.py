@@ -0,0 +1,71 @@
+# standard library
+import csv
+import os
+import time
+
+# Django
+from django.core.management.base import BaseCommand, CommandError
+
+# local Django
+from organization.models import Organization
+from volunteer.importer import (IMPORT_BATCH_SIZE, OPTIONAL_COLUMNS,
+                                REQUIRED_COLUMNS, VolunteerImporter, read_csv)
+
+
+class Command(BaseCommand):
+    help = ('Imports volunteers from a CSV file with the columns {0} and '
+            'optionally {1}. Rows with errors are reported and skipped, the '
+            'other rows are imported.'.format(
+                ', '.join(REQUIRED_COLUMNS), ', '.join(OPTIONAL_COLUMNS)))
+
+    def add_arguments(self, parser):
+        parser.add_argument('csv_path', help='CSV file to import')
+        parser.add_argument(
+            '--organization', dest='organization',
+            help='Name of the organization of the rows without one')
+        parser.add_argument(
+            '--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+            dest='batch_size',
+            help='Number of rows checked and inserted together')
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count() or 1,
+            dest='workers',
+            help='Number of processes hashing the passwords')
+        parser.add_argument(
+            '--report', dest='report',
+            help='CSV file to write the rows with errors to')
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1 or options['workers'] < 1:
+            raise CommandError('Batch size and workers should be at least 1')
+        organization = None
+        if options['organization']:
+            try:
+                organization = Organization.objects.get(
+                    name=options['organization'])
+            except Organization.DoesNotExist:
+                raise CommandError('Unknown organization: {0}'.format(
+                    options['organization']))
+
+        importer = VolunteerImporter(
+            organization, options['batch_size'], options['workers'])
+        start = time.perf_counter()
+        try:
+            with open(options['csv_path'], encoding='utf-8-sig',
+                      newline='') as csv_file:
+                importer.run(read_csv(csv_file))
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+        elapsed = time.perf_counter() - start
+
+        if options['report']:
+            with open(options['report'], 'w', newline='') as report_file:
+                writer = csv.writer(report_file)
+                writer.writerow(['line', 'username', 'error'])
+                writer.writerows(importer.error_list)
+        else:
+            for error in importer.error_list:
+                self.stderr.write('Line {0} ({1}): {2}'.format(*error))
+        self.stdout.write(
+            'Imported {0} volunteers with {1} rows skipped in {2:.2f} '
+            's'.format(importer.created, len(importer.error_list), elapsed))
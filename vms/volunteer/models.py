@@ -7,6 +7,14 @@ from cities_light.models import City, Country, Region
 
 # local Django
 from organization.models import Organization
+from vms.locations import get_location_index
+
+# attributes of a volunteer its search document is built from
+SEARCH_DOCUMENT_FIELDS = ('first_name', 'last_name', 'city_id', 'state_id',
+                          'country_id', 'organization_id')
+
+# names of the foreign keys among them, as update_fields may give them
+SEARCH_DOCUMENT_FIELD_NAMES = ('city', 'state', 'country', 'organization')
 
 
 class Volunteer(models.Model):
@@ -79,7 +87,53 @@ class Volunteer(models.Model):
         blank=True)
 
     user = models.OneToOneField(User, on_delete=models.CASCADE)
+    # names and places of the volunteer in one text, indexed for the full
+    # text search in volunteer/search.py
+    search_document = models.TextField(blank=True, default='', editable=False)
 
     def __str__(self):
         return '{0} {1}'.format(self.first_name, self.last_name)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        volunteer = super(Volunteer, cls).from_db(db, field_names, values)
+        volunteer._search_document_values = (
+            volunteer.get_search_document_values())
+        return volunteer
+
+    def get_search_document_values(self):
+        """
+        :return: Values of the fields the search document is built from,
+                 without loading the deferred ones
+        """
+        return tuple(self.__dict__.get(field_name)
+                     for field_name in SEARCH_DOCUMENT_FIELDS)
+
+    def get_search_document(self):
+        """
+        Builds the same text as volunteer.search.get_search_document_expression,
+        with the place names from the location index
+        """
+        place = get_location_index().get_place_names(
+            self.country_id, self.state_id, self.city_id)
+        part_list = [self.first_name, self.last_name,
+                     place.city, place.state, place.country]
+        part_list.append(self.organization.name if self.organization_id else '')
+        return ' '.join(part_list)
+
+    def save(self, *args, **kwargs):
+        # the document is built again only when the fields it is built
+        # from changed since the volunteer was loaded or saved
+        values = self.get_search_document_values()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and not set(update_fields) & set(
+                SEARCH_DOCUMENT_FIELDS + SEARCH_DOCUMENT_FIELD_NAMES):
+            values = getattr(self, '_search_document_values', None)
+        elif values != getattr(self, '_search_document_values', None):
+            self.search_document = self.get_search_document()
+            if update_fields is not None:
+                kwargs['update_fields'] = (
+                    set(update_fields) | {'search_document'})
+        super(Volunteer, self).save(*args, **kwargs)
+        self._search_document_values = values
+
@@ -0,0 +1,154 @@
+# standard library
+import re
+
+# Django
+from django.db import connection
+from django.db.models import CharField, OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce, Concat
+from cities_light.models import City, Country, Region
+
+# local Django
+from organization.models import Organization
+from volunteer.models import Volunteer
+
+# full text search over Volunteer.search_document. Postgres matches the
+# document with a tsvector index and a trigram index for misspellings,
+# which the migrations of the vms app create, SQLite with an FTS5 table
+# that triggers keep in sync with the volunteer table, and other databases
+# fall back to a substring match.
+
+SQLITE_FTS_TABLE = 'volunteer_volunteer_fts'
+
+SQLITE_INDEX_SQL = [
+    "CREATE VIRTUAL TABLE {fts} USING fts5("
+    "search_document, content='volunteer_volunteer', content_rowid='id')",
+    "CREATE TRIGGER {fts}_insert AFTER INSERT ON volunteer_volunteer BEGIN "
+    "INSERT INTO {fts}(rowid, search_document) "
+    "VALUES (new.id, new.search_document); END",
+    "CREATE TRIGGER {fts}_delete AFTER DELETE ON volunteer_volunteer BEGIN "
+    "INSERT INTO {fts}({fts}, rowid, search_document) "
+    "VALUES ('delete', old.id, old.search_document); END",
+    "CREATE TRIGGER {fts}_update AFTER UPDATE OF search_document "
+    "ON volunteer_volunteer BEGIN "
+    "INSERT INTO {fts}({fts}, rowid, search_document) "
+    "VALUES ('delete', old.id, old.search_document); "
+    "INSERT INTO {fts}(rowid, search_document) "
+    "VALUES (new.id, new.search_document); END",
+]
+
+POSTGRES_TSVECTOR = (
+    "to_tsvector('simple', \"volunteer_volunteer\".\"search_document\")")
+
+# number of volunteers returned by a ranked search
+SEARCH_LIMIT = 50
+
+
+def get_search_terms(text):
+    """
+    Splits the search text into words, which also drops any characters
+    that have a meaning in the query syntax of the databases
+    """
+    return re.findall(r'\w+', text.lower())
+
+
+def get_search_document_expression():
+    """
+    Expression for the search document of a volunteer, the database side
+    of Volunteer.get_search_document
+    """
+    part_list = [Coalesce('first_name', Value('')), Value(' '),
+                 Coalesce('last_name', Value(''))]
+    for model, field_name in ((City, 'city'), (Region, 'state'),
+                              (Country, 'country'),
+                              (Organization, 'organization')):
+        name = Subquery(
+            model.objects.filter(pk=OuterRef(field_name)).values('name')[:1],
+            output_field=CharField())
+        part_list.extend([Value(' '), Coalesce(name, Value(''))])
+    return Concat(*part_list, output_field=TextField())
+
+
+def update_search_documents(queryset=None):
+    """
+    Rebuilds the search document of the volunteers in one query, e.g.
+    after an organization was renamed
+    """
+    if queryset is None:
+        queryset = Volunteer.objects.all()
+    return queryset.update(search_document=get_search_document_expression())
+
+
+def has_search_index():
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' "
+            "AND name = %s", [SQLITE_FTS_TABLE])
+        return cursor.fetchone() is not None
+
+
+def create_search_index():
+    """
+    Creates the FTS5 table of the search on SQLite if it does not exist
+    yet and fills it with the documents of the existing volunteers. The
+    Postgres indexes are created by the migrations of the vms app.
+    """
+    if connection.vendor != 'sqlite' or has_search_index():
+        return False
+
+    update_search_documents()
+    with connection.cursor() as cursor:
+        for sql in SQLITE_INDEX_SQL:
+            cursor.execute(sql.format(fts=SQLITE_FTS_TABLE))
+        cursor.execute(
+            "INSERT INTO {fts}({fts}) VALUES ('rebuild')".format(
+                fts=SQLITE_FTS_TABLE))
+    return True
+
+
+def search_volunteers_by_text(text, queryset=None, limit=SEARCH_LIMIT):
+    """
+    Full text search of volunteers by name, city, state, country and
+    organization. Every word of the text has to match the start of a word
+    in the search document, e.g. "ash pal" finds Ash Ketchum of Pallet Org.
+
+    :param queryset: Volunteers to search in, all if None
+    :return: List of the best matching volunteers, best first
+    """
+    if queryset is None:
+        queryset = Volunteer.objects.all()
+    term_list = get_search_terms(text)
+    if not term_list:
+        return []
+
+    if connection.vendor == 'sqlite':
+        queryset = queryset.extra(
+            select={'search_rank': '-{0}.rank'.format(SQLITE_FTS_TABLE)},
+            tables=[SQLITE_FTS_TABLE],
+            where=[
+                '{0}.rowid = volunteer_volunteer.id'.format(SQLITE_FTS_TABLE),
+                '{0} MATCH %s'.format(SQLITE_FTS_TABLE)
+            ],
+            params=[' '.join('"{0}"*'.format(term) for term in term_list)])
+    elif connection.vendor == 'postgresql':
+        tsquery = ' & '.join('{0}:*'.format(term) for term in term_list)
+        text = ' '.join(term_list)
+        queryset = queryset.extra(
+            select={
+                'search_rank':
+                "ts_rank({0}, to_tsquery('simple', %s)) + "
+                "word_similarity(%s, \"volunteer_volunteer\"."
+                "\"search_document\")".format(POSTGRES_TSVECTOR)
+            },
+            select_params=[tsquery, text],
+            where=[
+                "({0} @@ to_tsquery('simple', %s) OR "
+                "%s <%% \"volunteer_volunteer\".\"search_document\")".format(
+                    POSTGRES_TSVECTOR)
+            ],
+            params=[tsquery, text])
+    else:
+        for term in term_list:
+            queryset = queryset.filter(search_document__icontains=term)
+        return list(queryset.order_by('first_name', 'last_name', 'id')[:limit])
+
+    return list(queryset.order_by('-search_rank', 'id')[:limit])
@@ -37,6 +37,10 @@ def delete_volunteer_resume(volunteer_id):
     return result
 
 
+# sort keys of the volunteer lists, the id keeps the order stable
+VOLUNTEER_ORDERING = ('first_name', 'last_name', 'id')
+
+
 def get_all_volunteers():
 
     volunteer_list = Volunteer.objects.all()
@@ -0,0 +1,201 @@
+# standard library
+import io
+import os
+import tempfile
+
+# Django
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+# local Django
+from shift.utils import (create_admin_with_details, create_city,
+                         create_country, create_organization_with_details,
+                         create_state, create_volunteer_with_details)
+from vms.locations import invalidate_location_index
+from volunteer.importer import VolunteerImporter, read_csv
+from volunteer.models import Volunteer
+
+CSV_HEADER = ('username,first_name,last_name,email,phone_number,address,'
+              'password,country,state,city,organization\n')
+
+
+def get_csv_file(*line_list):
+    return io.StringIO(CSV_HEADER + ''.join(
+        line + '\n' for line in line_list), newline='')
+
+
+class VolunteerImportTest(TestCase):
+    """
+    Tests the bulk import of volunteers from a csv file
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        create_country()
+        create_state()
+        create_city()
+        cls.organization = create_organization_with_details('Import Org')
+        create_organization_with_details('Other Import Org')
+        create_volunteer_with_details({
+            'username': 'takenvolunteer',
+            'first_name': "Taken",
+            'last_name': "Volunteer",
+            'address': "Pallet Town",
+            'city': None,
+            'state': None,
+            'country': None,
+            'phone_number': "2374983247",
+            'email': "taken@test.com"
+        }, cls.organization)
+        create_admin_with_details({
+            'username': 'importadmin',
+            'password': 'importadmin',
+            'first_name': 'Import',
+            'last_name': 'Admin',
+            'email': 'importadmin@test.com',
+            'address': 'admin-address',
+            'city': None,
+            'state': None,
+            'country': None,
+            'phone_number': '9999999999',
+            'organization': 'Import Admin Org'
+        })
+
+    def setUp(self):
+        invalidate_location_index()
+
+    def tearDown(self):
+        invalidate_location_index()
+
+    def test_import(self):
+        importer = VolunteerImporter(self.organization).run(read_csv(
+            get_csv_file(
+                'ash,Ash,Ketchum,ash@test.com,9876543210,Pallet Town,'
+                'pikachu@1,India,Uttarakhand,Roorkee,Other Import Org',
+                'misty,Misty,Waterflower,misty@test.com,2374983247,'
+                'Cerulean City,,,,,')))
+        self.assertEqual(importer.created, 2)
+        self.assertEqual(importer.error_list, [])
+
+        ash = Volunteer.objects.select_related(
+            'user', 'country', 'state', 'city', 'organization').get(
+                user__username='ash')
+        self.assertEqual(
+            (ash.country.name, ash.state.name, ash.city.name,
+             ash.organization.name),
+            ('India', 'Uttarakhand', 'Roorkee', 'Other Import Org'))
+        self.assertTrue(ash.user.check_password('pikachu@1'))
+        self.assertIn('Ketchum', ash.search_document)
+
+        misty = Volunteer.objects.select_related('user').get(
+            user__username='misty')
+        self.assertEqual(misty.organization, self.organization)
+        self.assertIsNone(misty.country)
+        self.assertFalse(misty.user.has_usable_password())
+
+    def test_errors(self):
+        importer = VolunteerImporter().run(read_csv(get_csv_file(
+            'takenvolunteer,Ash,Ketchum,ash@test.com,2374983247,Pallet Town,'
+            ',,,,',
+            'brock,Brock,Harrison,taken@test.com,2374983247,Pewter City,'
+            ',,,,',
+            'gary,Gary,Oak,gary@test.com,2374983247,Pallet Town,short,,,,',
+            'dawn,Dawn,Berlitz,dawn@test.com,12345,Twinleaf Town,,India,'
+            'Kanto,,',
+            'may,May,Maple,not-an-email,2374983247,Petalburg,,,,,',
+            'iris,Iris,Ivy,iris@test.com,2374983247,Opelucid,,,,,'
+            'Unknown Org',
+            'max,,Maple,max@test.com,2374983247,Petalburg,,,,,',
+            'serena,Serena,Yvonne,serena@test.com,2374983247,Vaniville,'
+            ',,,,',
+            'serena,Serena,Yvonne,SERENA@test.com,2374983247,Vaniville,'
+            ',,,,')))
+        self.assertEqual(importer.created, 1)
+        self.assertEqual(
+            [(error.line, error.username) for error in importer.error_list],
+            [(4, 'gary'), (5, 'dawn'), (6, 'may'), (8, 'max'),
+             (10, 'serena'), (2, 'takenvolunteer'), (3, 'brock'),
+             (7, 'iris')])
+        message_by_line = {
+            error.line: error.message for error in importer.error_list
+        }
+        self.assertEqual(message_by_line[2], 'Username is already taken')
+        self.assertIn('Email is already registered', message_by_line[3])
+        self.assertIn('Password must have', message_by_line[4])
+        self.assertIn('Unknown state: Kanto', message_by_line[5])
+        self.assertIn("phone number isn't valid", message_by_line[5])
+        self.assertIn('email', message_by_line[6])
+        self.assertEqual(message_by_line[7], 'Unknown organization: Unknown Org')
+        self.assertEqual(message_by_line[8], 'Missing values: first_name')
+        self.assertIn('Username appears more than once', message_by_line[10])
+        self.assertIn('Email appears more than once', message_by_line[10])
+        self.assertEqual(
+            list(User.objects.filter(username='serena').values_list(
+                'email', flat=True)), ['serena@test.com'])
+
+        with self.assertRaises(ValueError):
+            list(read_csv(io.StringIO('username,email\nash,ash@test.com\n')))
+
+    def test_queries(self):
+        line_list = [
+            'volunteer{0},First,Last,volunteer{0}@test.com,9876543210,'
+            'Address,,India,,,Other Import Org'.format(i) for i in range(50)
+        ]
+        importer = VolunteerImporter()
+        # warms the location index and the organizations of the importer
+        importer.run(read_csv(get_csv_file(line_list[0])))
+        # usernames, emails, users, user ids and volunteers, with the
+        # savepoint of the batch
+        with self.assertNumQueries(7):
+            importer.run(read_csv(get_csv_file(*line_list[1:])))
+        self.assertEqual(importer.created, 50)
+        self.assertEqual(Volunteer.objects.filter(
+            country__name='India').count(), 50)
+
+    def test_command(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        csv_path = os.path.join(directory.name, 'volunteers.csv')
+        report_path = os.path.join(directory.name, 'report.csv')
+        with open(csv_path, 'w', newline='') as csv_file:
+            csv_file.write(get_csv_file(
+                'ash,Ash,Ketchum,ash@test.com,2374983247,Pallet Town,,,,,',
+                'takenvolunteer,Taken,Volunteer,other@test.com,2374983247,'
+                'Pallet Town,,,,,').getvalue())
+        out = io.StringIO()
+        call_command('import_volunteers', csv_path, organization='Import Org',
+                     workers=1, report=report_path, stdout=out)
+        self.assertIn('Imported 1 volunteers with 1 rows skipped',
+                      out.getvalue())
+        self.assertEqual(
+            Volunteer.objects.get(user__username='ash').organization,
+            self.organization)
+        with open(report_path) as report_file:
+            self.assertIn('3,takenvolunteer,Username is already taken',
+                          report_file.read())
+
+    def test_view(self):
+        url = reverse('administrator:import_volunteers')
+        self.client.login(username='importadmin', password='importadmin')
+        self.assertEqual(self.client.get(url).status_code, 200)
+        upload = SimpleUploadedFile('volunteers.csv', get_csv_file(
+            'ash,Ash,Ketchum,ash@test.com,2374983247,Pallet Town,,,,,',
+            'misty,Misty,Waterflower,misty@test.com,2374983247,'
+            'Cerulean City,,,,,Unknown Org').getvalue().encode('utf-8'))
+        response = self.client.post(
+            url, {'csv_file': upload, 'organization': self.organization.id})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['importer'].created, 1)
+        self.assertContains(response, 'Unknown organization: Unknown Org')
+        self.assertTrue(Volunteer.objects.filter(
+            user__username='ash', organization=self.organization).exists())
+
+        upload = SimpleUploadedFile('volunteers.csv', b'username\nash\n')
+        response = self.client.post(url, {'csv_file': upload})
+        self.assertIn('csv_file', response.context['form'].errors)
+
+        self.client.login(username='takenvolunteer', password='volunteer')
+        self.assertNotEqual(self.client.get(url).status_code, 200)
@@ -0,0 +1,176 @@
+# Django
+from django.test import TestCase
+from django.urls import reverse
+
+# local Django
+from organization.models import Organization
+from shift.utils import (create_admin_with_details, create_city,
+                         create_country, create_organization_with_details,
+                         create_state, create_volunteer_with_details)
+from volunteer.models import Volunteer
+from volunteer.search import (create_search_index, search_volunteers_by_text,
+                              update_search_documents)
+
+
+class VolunteerSearchTest(TestCase):
+    """
+    Tests that the search document and the full text index follow the
+    volunteers and that matches are ranked
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.org = create_organization_with_details('Pallet Org')
+        cls.other_org = create_organization_with_details('Kanto League')
+        cls.ash = cls.create_volunteer('ash', 'Ash', 'Ketchum', cls.org)
+        cls.misty = cls.create_volunteer(
+            'misty', 'Misty', 'Waterflower', cls.other_org)
+        cls.brock = cls.create_volunteer(
+            'brock', 'Brock', 'Harrison', cls.other_org)
+        cls.ashley = cls.create_volunteer(
+            'ashley', 'Ashley', 'Ash', cls.other_org)
+
+    @staticmethod
+    def create_volunteer(username, first_name, last_name, org):
+        return create_volunteer_with_details({
+            'username': username,
+            'first_name': first_name,
+            'last_name': last_name,
+            'address': "Pallet Town",
+            'city': None,
+            'state': None,
+            'country': None,
+            'phone_number': "2374983247",
+            'email': "{0}@pokemon.com".format(username)
+        }, org)
+
+    def test_search_document(self):
+        self.assertEqual(self.ash.search_document, 'Ash Ketchum    Pallet Org')
+        update_search_documents()
+        self.ash.refresh_from_db()
+        self.assertEqual(self.ash.search_document, 'Ash Ketchum    Pallet Org')
+
+    def test_search_document_on_save(self):
+        create_country()
+        create_state()
+        city = create_city()
+        misty = Volunteer.objects.get(pk=self.misty.pk)
+        # only the update, as no field of the document changed
+        misty.phone_number = '9999999999'
+        with self.assertNumQueries(1):
+            misty.save()
+
+        # the place names come from the location index
+        misty.city = city
+        misty.state = city.region
+        misty.country = city.country
+        misty.save()
+        with self.assertNumQueries(1):
+            misty.last_name = 'Cerulean'
+            misty.save()
+        self.assertEqual(
+            misty.search_document,
+            'Misty Cerulean Roorkee Uttarakhand India Kanto League')
+        self.assertEqual(misty.search_document,
+                         Volunteer.objects.get(pk=misty.pk).search_document)
+
+        # the document is left as it was when its fields are not saved
+        misty.first_name = 'Kasumi'
+        misty.save(update_fields=['phone_number'])
+        self.assertNotIn('Kasumi', Volunteer.objects.get(
+            pk=misty.pk).search_document)
+        misty.save(update_fields=['first_name'])
+        self.assertIn('Kasumi', Volunteer.objects.get(
+            pk=misty.pk).search_document)
+
+    def test_prefix_and_terms(self):
+        self.assertEqual(search_volunteers_by_text('wat'), [self.misty])
+        self.assertEqual(search_volunteers_by_text('KANTO harr'), [self.brock])
+        self.assertEqual(
+            set(search_volunteers_by_text('kanto')),
+            {self.misty, self.brock, self.ashley})
+        self.assertEqual(search_volunteers_by_text('ketchum kanto'), [])
+
+    def test_ranking(self):
+        # Ashley Ash matches twice, Ash Ketchum once
+        self.assertEqual(
+            search_volunteers_by_text('ash'), [self.ashley, self.ash])
+
+    def test_queryset_and_limit(self):
+        self.assertEqual(
+            search_volunteers_by_text(
+                'ash', Volunteer.objects.filter(organization=self.org)),
+            [self.ash])
+        self.assertEqual(len(search_volunteers_by_text('kanto', limit=2)), 2)
+
+    def test_query_syntax_is_ignored(self):
+        self.assertEqual(search_volunteers_by_text('"*^:()'), [])
+        self.assertEqual(
+            search_volunteers_by_text('misty OR - "brock'), [])
+        self.assertEqual(search_volunteers_by_text('Misty*'), [self.misty])
+
+    def test_index_follows_changes(self):
+        # the changes are made on copies as the test data is shared
+        misty = Volunteer.objects.get(pk=self.misty.pk)
+        misty.last_name = 'Cerulean'
+        misty.save(update_fields=['last_name'])
+        self.assertEqual(search_volunteers_by_text('waterflower'), [])
+        self.assertEqual(search_volunteers_by_text('cerulean'), [self.misty])
+
+        org = Organization.objects.get(pk=self.other_org.pk)
+        org.name = 'Johto League'
+        org.save()
+        self.assertEqual(
+            set(search_volunteers_by_text('johto')),
+            {self.misty, self.brock, self.ashley})
+        self.assertEqual(search_volunteers_by_text('kanto'), [])
+
+        Volunteer.objects.get(pk=self.brock.pk).delete()
+        self.assertEqual(search_volunteers_by_text('harrison'), [])
+
+    def test_index_follows_place_renames(self):
+        create_country()
+        create_state()
+        city = create_city()
+        misty = Volunteer.objects.get(pk=self.misty.pk)
+        misty.city = city
+        misty.state = city.region
+        misty.country = city.country
+        misty.save()
+        self.assertEqual(search_volunteers_by_text('roorkee'), [self.misty])
+
+        city.name = 'Rurki'
+        city.save()
+        self.assertEqual(search_volunteers_by_text('roorkee'), [])
+        self.assertEqual(search_volunteers_by_text('rurki'), [self.misty])
+
+        state = city.region
+        state.name = 'Uttaranchal'
+        state.save()
+        self.assertEqual(
+            search_volunteers_by_text('uttaranchal'), [self.misty])
+
+    def test_create_search_index_once(self):
+        # the index is created when the test database is migrated
+        self.assertFalse(create_search_index())
+
+    def test_search_view(self):
+        create_admin_with_details({
+            'username': 'searchadmin',
+            'password': 'searchadmin',
+            'first_name': 'Search',
+            'last_name': 'Admin',
+            'email': 'searchadmin@pokemon.com',
+            'address': 'admin-address',
+            'city': None,
+            'state': None,
+            'country': None,
+            'phone_number': '9999999999',
+            'organization': 'Search Admin Org'
+        })
+        self.client.login(username='searchadmin', password='searchadmin')
+        response = self.client.post(
+            reverse('volunteer:search'),
+            {'query': 'ash', 'organization': 'Kanto League'})
+        self.assertEqual(
+            list(response.context['search_result_list']), [self.ashley])
@@ -3,14 +3,12 @@ import os
 
 # third party
 from braces.views import LoginRequiredMixin
-from cities_light.models import Country, Region, City
 
 # Django
 from django.conf import settings
 from django.contrib.auth.decorators import login_required
 from wsgiref.util import FileWrapper
 from django.urls import reverse, reverse_lazy
-from django.core.exceptions import ObjectDoesNotExist
 from django.http import Http404, HttpResponse, HttpResponseRedirect
 from django.shortcuts import render
 from django.views.generic.detail import DetailView
@@ -25,15 +23,17 @@ from job.services import get_signed_up_jobs_for_volunteer
 from organization.services import (create_organization, get_organization_by_id,
                                    get_organizations_ordered_by_name)
 from shift.models import Report
-from shift.services import (calculate_total_report_hours, get_volunteer_shifts,
-                            generate_report)
+from shift.services import create_report, get_volunteer_shifts
 from volunteer.forms import ReportForm, SearchVolunteerForm, VolunteerForm
 from volunteer.models import Volunteer
+from volunteer.search import search_volunteers_by_text
 from volunteer.services import (delete_volunteer_resume, search_volunteers,
                                 get_volunteer_resume_file_url, has_resume_file,
-                                get_volunteer_by_id)
+                                get_volunteer_by_id, VOLUNTEER_ORDERING)
 from volunteer.validation import validate_file
 from volunteer.utils import vol_id_check
+from vms.locations import get_location_index, resolve_posted_location
+from vms.pagination import paginate_request
 from vms.utils import check_correct_volunteer
 
 
@@ -130,17 +130,11 @@ class VolunteerUpdateView(LoginRequiredMixin, UpdateView, FormView):
         volunteer = get_volunteer_by_id(volunteer_id)
         organization_list = get_organizations_ordered_by_name()
         context['organization_list'] = organization_list
-        country_list = Country.objects.all()
-        if volunteer.country:
-            country = volunteer.country
-            state_list = Region.objects.filter(country=country)
-            context['state_list'] = state_list
-        if volunteer.state:
-            state = volunteer.state
-            city_list = City.objects.filter(region=state)
-            context['city_list'] = city_list
+        index = get_location_index()
+        if volunteer.country_id:
+            context['state_list'] = index.get_states(volunteer.country_id)
         context['organization_list'] = organization_list
-        context['country_list'] = country_list
+        context['country_list'] = index.country_list
         return context
 
     def get_object(self, queryset=None):
@@ -172,24 +166,10 @@ class VolunteerUpdateView(LoginRequiredMixin, UpdateView, FormView):
                     })
 
         volunteer_to_edit = form.save(commit=False)
-        try:
-            country_name = self.request.POST.get('country')
-            country = Country.objects.get(name=country_name)
-        except ObjectDoesNotExist:
-            country = None
-        volunteer_to_edit.country = country
-        try:
-            state_name = self.request.POST.get('state')
-            state = Region.objects.get(name=state_name)
-        except ObjectDoesNotExist:
-            state = None
-        volunteer_to_edit.state = state
-        try:
-            city_name = self.request.POST.get('city')
-            city = City.objects.get(name=city_name)
-        except ObjectDoesNotExist:
-            city = None
-        volunteer_to_edit.city = city
+        place = resolve_posted_location(self.request.POST)
+        volunteer_to_edit.country = place.country
+        volunteer_to_edit.state = place.state
+        volunteer_to_edit.city = place.city
         organization_id = self.request.POST.get('organization_name')
         organization = get_organization_by_id(organization_id)
         if organization:
@@ -287,16 +267,11 @@ class ShowReportListView(LoginRequiredMixin, ListView):
             start_date, end_date
         )
         if volunteer_shift_list:
-            report_list = generate_report(volunteer_shift_list)
-            total_hours = calculate_total_report_hours(report_list)
-            report = Report.objects.create(
-                total_hrs=total_hours, volunteer=volunteer
-            )
-            report.volunteer_shifts.add(*volunteer_shift_list)
-            report.save()
+            report, report_list = create_report(
+                volunteer, volunteer_shift_list)
             return render(request, 'volunteer/report.html', {
                           'report_list': report_list,
-                          'total_hours': total_hours,
+                          'total_hours': report.total_hrs,
                           'notification': True,
                           'job_list': job_list,
                           'event_list': event_list,
@@ -326,9 +301,18 @@ def search(request):
             organization = form.cleaned_data['organization']
             event = form.cleaned_data['event']
             job = form.cleaned_data['job']
+            query = form.cleaned_data['query']
             search_result_list = search_volunteers(
                 first_name, last_name, city, state, country, organization,
-                event, job)
+                event, job).select_related(
+                    'city', 'state', 'country', 'organization')
+            if query:
+                # ranked results are shown as a single page of best matches
+                search_result_list = search_volunteers_by_text(
+                    query, search_result_list)
+            else:
+                search_result_list = paginate_request(
+                    request, search_result_list, VOLUNTEER_ORDERING)
             return render(
                 request, 'volunteer/search.html', {
                     'organizations_list': organizations_list,